@@ -0,0 +1,88 @@
+"""
+Payload size and serialization time of the chart formats.
+
+Builds a synthetic raw price series, checks that the columnar encoding
+round-trips to the same points, then compares JSON and columnar bodies
+(size, encode time, and gzip/brotli size and time) at 1k, 10k and 100k points.
+
+Run from the backend directory:
+    python -m benchmarks.bench_chart_format
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import chart_schemas as schemas
+from utils.chart_encoding import brotli, compress, encode_chart, orjson, run_length_decode
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_chart(n: int, rng: np.random.Generator) -> schemas.EnhancedChartData:
+    start = datetime(2026, 1, 1)
+    offsets = np.cumsum(rng.integers(60, 600, n))
+    prices = np.round(np.maximum(5.0, 150 + np.cumsum(rng.normal(0, 1.0, n))), 2)
+    sources = np.where(np.arange(n) // 500 % 2 == 0, "ticketmaster", "scraper")
+    outliers = rng.random(n) < 0.01
+    points = [
+        schemas.PriceDataPoint(
+            date=start + timedelta(seconds=int(offset)),
+            price=float(price),
+            data_source=str(source),
+            is_outlier=bool(outlier),
+        )
+        for offset, price, source, outlier in zip(offsets, prices, sources, outliers)
+    ]
+    statistics = schemas.ChartStatistics(
+        current_price=points[-1].price, average_price=float(prices.mean()), min_price=float(prices.min()),
+        max_price=float(prices.max()), price_trend="stable", recommendation="monitor", volatility=0.0,
+    )
+    return schemas.EnhancedChartData(
+        historical_prices=points, predictions=[], milestones=[], similar_events=[],
+        buy_windows=[], statistics=statistics,
+    )
+
+
+def check(chart: schemas.EnhancedChartData):
+    decoded = json.loads(encode_chart(chart, "columnar"))["historical_prices"]
+    points = chart.historical_prices
+    assert decoded["timestamp"] == [int((p.date - datetime(1970, 1, 1)).total_seconds()) for p in points]
+    assert decoded["price"] == [p.price for p in points]
+    assert run_length_decode(decoded["data_source"]) == [p.data_source for p in points]
+    assert run_length_decode(decoded["is_outlier"]) == [p.is_outlier for p in points]
+    print(f"OK: columnar round-trips {len(points)} points")
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = np.random.default_rng(42)
+    check(make_chart(2_000, rng))
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    print(f"orjson: {'yes' if orjson is not None else 'no (stdlib json)'}, brotli: {'yes' if brotli is not None else 'no'}")
+
+    for n in SIZES:
+        chart = make_chart(n, rng)
+        print(f"\n{n:,} points")
+        for format in ("json", "columnar"):
+            body = encode_chart(chart, format)
+            elapsed = _time(lambda: encode_chart(chart, format))
+            parts = [f"{len(body) / 1024:8.1f} KB  encode {elapsed * 1000:7.2f} ms"]
+            for encoding in encodings:
+                compressed, _ = compress(body, encoding)
+                # Cached bodies are compressed again on every response
+                compress_time = _time(lambda: compress(body, encoding))
+                parts.append(f"{encoding} {len(compressed) / 1024:7.1f} KB in {compress_time * 1000:7.2f} ms")
+            print(f"  {format:>8}: " + "  |  ".join(parts))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+sklearn Pipeline.predict vs the NumPy-compiled model (ml/compiled_model.py).
+
+Fits the training pipeline on synthetic seed data, compiles it, and checks
+that CompiledModel.predict returns exactly what model.predict returns on
+random rows, including missing values, None and categories unseen in
+training, for the point model and the interval (quantile) models. Then
+compares scoring time at 1, 100 and 10k rows: the pipeline on a
+DataFrame, the compiled model on plain column lists as the API passes
+them.
+
+Run from the backend directory:
+    python -m benchmarks.bench_compiled_model
+"""
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ml.compiled_model import CompiledModel, compile_pipeline
+from ml.data_schema import CATEGORICAL_FEATURES, FEATURES, NUMERIC_FEATURES
+from ml.seed_data import build_seed_frame
+from ml.train_price_model import QUANTILES, build_pipeline
+
+SIZES = [1, 100, 10_000]
+
+
+def make_rows(n: int, rng: np.random.Generator, seed_frame: pd.DataFrame) -> dict:
+    """
+    Rows resampled from the seed data, with some values knocked out or
+    replaced by categories the model never saw.
+    """
+    columns = {}
+    picks = rng.integers(0, len(seed_frame), n)
+    for feature in NUMERIC_FEATURES:
+        values = seed_frame[feature].to_numpy(dtype=np.float64)[picks] * rng.uniform(0.5, 1.5, n)
+        values[rng.random(n) < 0.1] = np.nan
+        columns[feature] = values.tolist()
+    for feature in CATEGORICAL_FEATURES:
+        values = seed_frame[feature].to_numpy(dtype=object)[picks]
+        draw = rng.random(n)
+        values[draw < 0.05] = np.nan
+        values[(draw >= 0.05) & (draw < 0.08)] = "never seen"
+        if feature == "city":
+            values[(draw >= 0.08) & (draw < 0.1)] = None
+        columns[feature] = values.tolist()
+    return columns
+
+
+def fit(seed_frame: pd.DataFrame, quantile=None):
+    model = build_pipeline(quantile)
+    model.fit(seed_frame[FEATURES], np.log1p(seed_frame["observed_market_price_mid"]))
+    return model
+
+
+def check(model, compiled: CompiledModel, columns: dict, label: str):
+    expected = model.predict(pd.DataFrame(columns, columns=FEATURES))
+    actual = compiled.predict(columns)
+    assert np.array_equal(expected, actual), f"{label}: max abs diff {np.max(np.abs(expected - actual))}"
+    print(f"OK: compiled {label} predictions identical to model.predict for {len(expected)} rows")
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    # sklearn warns on every transform about the all-missing seed column
+    warnings.filterwarnings("ignore", category=UserWarning)
+    rng = np.random.default_rng(42)
+    seed_frame = build_seed_frame(2000)
+    model = fit(seed_frame)
+    compiled = CompiledModel(*compile_pipeline(model))
+    rows = make_rows(5_000, rng, seed_frame)
+    check(model, compiled, rows, "point model")
+    for name, alpha in QUANTILES.items():
+        quantile_model = fit(seed_frame, alpha)
+        check(quantile_model, CompiledModel(*compile_pipeline(quantile_model)), rows, f"{name} quantile")
+
+    for n in SIZES:
+        columns = make_rows(n, rng, seed_frame)
+        pipeline = _time(lambda: model.predict(pd.DataFrame(columns, columns=FEATURES)))
+        numpy_only = _time(lambda: compiled.predict(columns))
+        print(f"{n:>7,} rows: model.predict {pipeline * 1000:8.2f} ms ({n / pipeline:9.0f}/s)"
+              f"  compiled {numpy_only * 1000:8.2f} ms ({n / numpy_only:9.0f}/s)  {pipeline / numpy_only:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
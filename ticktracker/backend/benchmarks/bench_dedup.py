@@ -0,0 +1,147 @@
+"""
+Benchmark and equivalence check for utils.dedup against the original
+pairwise deduplication loop from search_all_events.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dedup
+"""
+import difflib
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import schemas
+from utils import dedup
+
+ARTISTS = [
+    "Taylor Swift", "Beyonce", "Coldplay", "Drake", "Billie Eilish", "Metallica",
+    "Bad Bunny", "Olivia Rodrigo", "The Weeknd", "Ed Sheeran", "SZA", "Lizzo",
+    "Hamilton", "Wicked", "Six", "The Lion King", "Chicago Symphony Orchestra",
+    "Lakers vs Warriors", "Knicks vs Bulls", "Yankees vs Red Sox",
+]
+SUFFIXES = ["", " - The Tour", ": Live", " (Touring)", " World Tour 2026", " the Musical", " Live in Concert"]
+VENUES = [
+    ("Madison Square Garden", ["Madison Square Garden", "MSG - Madison Square Garden", "Madison Sq Garden"]),
+    ("United Center", ["United Center", "The United Center"]),
+    ("Crypto.com Arena", ["Crypto.com Arena", "Cryptocom Arena", "Crypto Arena"]),
+    ("Chase Center", ["Chase Center", "Chase Ctr"]),
+    ("Gershwin Theatre", ["Gershwin Theatre", "Gershwin Theater"]),
+]
+SOURCES = ["seatgeek", "ticketmaster", "eventbrite"]
+
+FIXED_CASES = [
+    ("Six", "Gershwin Theatre"), ("Six the Musical", "Gershwin Theatre"),
+    ("Six", "Unknown Venue"), ("SIX (Touring)", "Unknown Venue"),
+    ("Taylor Swift | The Eras Tour", "Madison Square Garden"),
+    ("Taylor Swift - The Eras Tour", "MSG"), ("Taylor Swift: The Eras Tour", "Unknown Venue"),
+    ("(Touring)", "Unknown Venue"), ("", "Unknown Venue"), ("A", "X"), ("AB", "Y"), ("BA", "Y"),
+]
+
+
+def legacy_deduplicate(all_events: List[schemas.Event]) -> List[schemas.Event]:
+    """
+    The original O(n^2) loop, kept verbatim as the reference implementation.
+    """
+    unique_events = []
+
+    def normalize_string(s: str) -> str:
+        s = s.lower()
+        s = re.sub(r'\(.*?\)', '', s)
+        s = re.sub(r'[^a-z0-9\s]', '', s)
+        return s.strip()
+
+    def are_duplicates(e1: schemas.Event, e2: schemas.Event) -> bool:
+        d1 = e1.date.strftime("%Y-%m-%d")
+        d2 = e2.date.strftime("%Y-%m-%d")
+        if d1 != d2:
+            return False
+        n1 = normalize_string(e1.name)
+        n2 = normalize_string(e2.name)
+        v1 = normalize_string(e1.venue)
+        v2 = normalize_string(e2.venue)
+        venue_match = (v1 == v2) or (v1 in v2) or (v2 in v1) or (difflib.SequenceMatcher(None, v1, v2).ratio() > 0.8)
+        if venue_match:
+            if n1 in n2 or n2 in n1:
+                return True
+            if difflib.SequenceMatcher(None, n1, n2).ratio() > 0.6:
+                return True
+        if n1 == n2:
+            return True
+        if difflib.SequenceMatcher(None, n1, n2).ratio() > 0.85:
+            return True
+        return False
+
+    for event in all_events:
+        if not any(are_duplicates(event, existing) for existing in unique_events):
+            unique_events.append(event)
+    return unique_events
+
+
+def _event(i: int, name: str, venue: str, date: datetime, source: str) -> schemas.Event:
+    return schemas.Event(
+        id=f"{source[:2]}_{i}", name=name, venue=venue, city="Test City", date=date,
+        price_low=None, price_high=None, url=f"https://example.com/{i}", source=source,
+        created_at=datetime(2026, 1, 1),
+    )
+
+
+def make_fixture(n: int, days: int, seed: int = 7) -> List[schemas.Event]:
+    """
+    Deterministic merged-provider result set: every logical event is listed by
+    one to three providers with slightly different names and venue spellings.
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 3, 1, 19, 30)
+    events = []
+    i = 0
+    while len(events) < n:
+        artist = rng.choice(ARTISTS)
+        base_name = artist + rng.choice(SUFFIXES)
+        _, spellings = rng.choice(VENUES)
+        date = start + timedelta(days=rng.randrange(days), hours=rng.choice([0, 1, 3]))
+        for source in rng.sample(SOURCES, rng.randint(1, 3)):
+            name = base_name if rng.random() < 0.6 else artist + rng.choice(SUFFIXES)
+            venue = rng.choice(spellings) if rng.random() < 0.8 else "Unknown Venue"
+            events.append(_event(i, name, venue, date, source))
+            i += 1
+    for name, venue in FIXED_CASES:
+        events.append(_event(i, name, venue, start, "ticketmaster"))
+        i += 1
+    rng.shuffle(events)
+    return events[:n + len(FIXED_CASES)]
+
+
+def _timed(fn, events):
+    started = time.perf_counter()
+    result = fn(list(events))
+    return result, time.perf_counter() - started
+
+
+def main():
+    print("Equivalence check against the original algorithm")
+    for n, days in [(150, 30), (500, 60), (1000, 120), (1500, 10), (2000, 540)]:
+        events = make_fixture(n, days)
+        expected, legacy_time = _timed(legacy_deduplicate, events)
+        actual, engine_time = _timed(dedup.deduplicate, events)
+        same = [e.id for e in expected] == [e.id for e in actual]
+        print(f"  n={len(events):>5} days={days:>3}  kept={len(actual):>5}  "
+              f"legacy={legacy_time * 1000:8.1f}ms  engine={engine_time * 1000:7.1f}ms  "
+              f"speedup={legacy_time / engine_time:6.1f}x  identical={same}")
+        if not same:
+            raise SystemExit("Dedup engine diverged from the original algorithm")
+
+    print("Scaling (engine only)")
+    for n in [1000, 5000, 10000, 20000]:
+        events = make_fixture(n, 540)
+        index = dedup.DedupIndex()
+        started = time.perf_counter()
+        kept = sum(1 for e in events if index.add(e))
+        elapsed = time.perf_counter() - started
+        print(f"  n={len(events):>6}  kept={kept:>6}  {elapsed * 1000:8.1f}ms  "
+              f"difflib calls={index.comparisons}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Correctness check and timings for services.downsampling.
+
+Checks the NumPy LTTB against a straightforward pure-Python implementation
+and that outliers and milestone neighbours survive, then times LTTB and
+min/max downsampling of 10k, 1M and 5M points to 1,000.
+
+Run from the backend directory:
+    python -m benchmarks.bench_downsampling
+"""
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from services.downsampling import downsample_indices, lttb, minmax
+
+SIZES = [10_000, 1_000_000, 5_000_000]
+MAX_POINTS = 1_000
+
+
+def reference_lttb(x, y, n_out):
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(np.floor(1 + i * every))
+        hi = int(np.floor(1 + (i + 1) * every))
+        if i == n_out - 3:
+            nx, ny = x[n - 1], y[n - 1]
+        else:
+            nlo, nhi = hi, int(np.floor(1 + (i + 2) * every))
+            nx, ny = sum(x[nlo:nhi]) / (nhi - nlo), sum(y[nlo:nhi]) / (nhi - nlo)
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - nx) * (y[j] - y[a]) - (x[a] - x[j]) * (ny - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def make_series(n: int, rng: np.random.Generator):
+    x = 1.7e9 + np.cumsum(rng.uniform(30, 90, n))
+    y = np.maximum(5.0, 150 + np.cumsum(rng.normal(0, 1.0, n)))
+    return x, y
+
+
+def check(rng: np.random.Generator):
+    for n, n_out in [(50, 10), (10_000, 300), (12_345, 1_000)]:
+        x, y = make_series(n, rng)
+        assert np.array_equal(lttb(x, y, n_out), reference_lttb(x.tolist(), y.tolist(), n_out)), (n, n_out)
+        kept = minmax(x, y, n_out)
+        assert len(kept) <= n_out and kept[0] == 0 and kept[-1] == n - 1
+
+    x, y = make_series(100_000, rng)
+    dates = [datetime(1970, 1, 1) + timedelta(seconds=float(v)) for v in x]
+    outlier = rng.random(len(x)) < 0.001
+    milestones = [dates[20_000] + timedelta(seconds=5), dates[70_000] + timedelta(seconds=5)]
+    for method in ("lttb", "minmax"):
+        kept = downsample_indices(dates, y, outlier, MAX_POINTS, milestones, method)
+        assert len(kept) <= MAX_POINTS + 4, len(kept)
+        assert set(np.flatnonzero(outlier)) <= set(kept)
+        assert {20_000, 20_001, 70_000, 70_001} <= set(kept)
+    print("OK: LTTB matches the reference; outliers and milestone neighbours are kept")
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = np.random.default_rng(42)
+    check(rng)
+    for n in SIZES:
+        x, y = make_series(n, rng)
+        print(f"{n:>10,} -> {MAX_POINTS:,}: lttb {_time(lambda: lttb(x, y, MAX_POINTS)) * 1000:8.2f} ms"
+              f"  minmax {_time(lambda: minmax(x, y, MAX_POINTS)) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Per-event vs batched price prediction.
+
+Checks that predict_prices_for_events returns exactly what the original
+single-event path returns (single_row_prediction: scalar heuristics and a
+one-row DataFrame per model), then compares throughput at 1, 100 and 10k
+events. If the saved model can't be loaded in this
+environment, the training pipeline is fitted on synthetic seed data first.
+
+Run from the backend directory:
+    python -m benchmarks.bench_price_model
+"""
+import random
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import schemas
+from ml import price_model
+from ml.data_schema import FEATURES
+from ml.registry import registry
+from ml.seed_data import build_seed_frame
+from utils import pricing_heuristics
+
+SIZES = [1, 100, 10_000]
+PER_EVENT_SAMPLE = 1_000
+
+NAMES = ["Lakers vs Bulls", "Summer Music Festival", "Hamilton", "City Symphony Orchestra",
+         "World Tour Live", "Comedy Night", "NFL Preseason", "Jazz in the Park"]
+CITIES = ["New York", "Chicago", "Houston", "Phoenix", "Los Angeles", "Denver"]
+SOURCES = ["ticketmaster", "eventbrite", "seatgeek"]
+
+
+def ensure_model():
+    if price_model.get_price_model() is not None:
+        print("Using saved model")
+        return
+    from ml.train_price_model import build_pipeline
+    df = build_seed_frame(2000)
+    model = build_pipeline()
+    model.fit(df[FEATURES], np.log1p(df["observed_market_price_mid"]))
+    registry.use(model, "seed")
+    print("Saved model unavailable; fitted the training pipeline on seed data")
+
+
+def make_events(n: int, rng: random.Random):
+    now = datetime.utcnow()
+    events = []
+    for i in range(n):
+        low = round(rng.uniform(20, 300), 2) if rng.random() < 0.8 else None
+        events.append(schemas.Event(
+            id=f"evt_{i}",
+            name=f"{rng.choice(NAMES)} {i}",
+            venue="Venue",
+            city=rng.choice(CITIES),
+            date=now + timedelta(days=rng.randint(1, 300), hours=rng.randint(0, 23)),
+            price_low=low,
+            price_high=round(low * 1.8, 2) if low else None,
+            url="https://example.com",
+            source=rng.choice(SOURCES),
+            created_at=now,
+        ))
+    return events
+
+
+def single_row_prediction(event, live, now: datetime) -> dict:
+    """
+    The pre-batching prediction path, kept as the reference: heuristics from
+    compute_heuristic_price and one one-row DataFrame per model.
+    """
+    import pandas as pd
+    heuristic_data = pricing_heuristics.compute_heuristic_price(event, now)
+    heuristic_mid = heuristic_data["heuristic_mid"]
+    days_to_event = pricing_heuristics.compute_days_to_event(event.date, now)
+
+    result = None
+    source, model_version = "heuristic_only", None
+    if live is not None:
+        venue_capacity = getattr(event, "venue_capacity", None)
+        features = pd.DataFrame({
+            "days_to_event_at_observation": [days_to_event],
+            "venue_capacity": [venue_capacity if venue_capacity else np.nan],
+            "heuristic_mid": [heuristic_mid],
+            "ticketmaster_min_price": [event.price_low if event.source == "ticketmaster" else np.nan],
+            "ticketmaster_max_price": [event.price_high if event.source == "ticketmaster" else np.nan],
+            "eventbrite_min_tier_price": [event.price_low if event.source == "eventbrite" else np.nan],
+            "event_type": [pricing_heuristics.classify_event_type(event)],
+            "city": [event.city],
+            "country": ["US"],
+            "weekday": [event.date.weekday()],
+            "demand_signal": ["unknown"],
+        }, columns=FEATURES)
+        ml_mid = np.expm1(live.model.predict(features)[0])
+        ml_low = ml_high = None
+        confidence = price_model.DEFAULT_CONFIDENCE
+        if "lower" in live.quantiles and "upper" in live.quantiles:
+            ml_low = np.expm1(live.quantiles["lower"].predict(features)[0])
+            ml_high = np.expm1(live.quantiles["upper"].predict(features)[0])
+            confidence = price_model.interval_confidence(np.array([ml_low]), np.array([ml_mid]), np.array([ml_high]))[0]
+        result = price_model.blend_prices(heuristic_mid, ml_mid, float(confidence), ml_low, ml_high)
+        source, model_version = "ml+heuristic", live.version
+    if result is None:
+        result = {"final_low": heuristic_data["heuristic_low"], "final_high": heuristic_data["heuristic_high"],
+                  "final_mid": heuristic_mid, "confidence": 0.0}
+
+    recommendation = price_model.get_buy_recommendation(days_to_event, result["confidence"] / 100.0, event.price_low, result["final_mid"])
+    return {
+        "event_id": event.id,
+        "pred_low_price": result["final_low"],
+        "pred_high_price": result["final_high"],
+        "pred_mid_price": result["final_mid"],
+        "confidence": result["confidence"],
+        "source": source,
+        "model_version": model_version,
+        "buy_recommendation": recommendation,
+        "heuristic_details": heuristic_data,
+    }
+
+
+def check(events):
+    now = datetime.now(timezone.utc)
+    live = price_model.get_live_model()
+    batched = price_model.predict_prices_for_events(events, now)
+    single = [single_row_prediction(event, live, now) for event in events]
+    assert batched == single
+    sources = {result["source"] for result in batched}
+    print(f"OK: batched results identical to the single-row path for {len(events)} events ({', '.join(sources)})")
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    # sklearn warns on every transform about the all-missing seed column
+    warnings.filterwarnings("ignore", category=UserWarning)
+    rng = random.Random(42)
+    ensure_model()
+    check(make_events(500, rng))
+
+    for n in SIZES:
+        events = make_events(n, rng)
+        # The per-event loop is linear; time it on a sample of large batches and scale up
+        sample = events[:PER_EVENT_SAMPLE]
+        per_event = _time(lambda: [price_model.predict_price_for_event(event) for event in sample]) * n / len(sample)
+        batched = _time(lambda: price_model.predict_prices_for_events(events))
+        print(f"{n:>7,} events: per-event {per_event * 1000:9.2f} ms ({n / per_event:9.0f}/s)"
+              f"  batched {batched * 1000:8.2f} ms ({n / batched:9.0f}/s)  {per_event / batched:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark and correctness check for services.price_statistics.
+
+Checks the segment-reduction results against straightforward per-series
+NumPy/SciPy computations, then times a single series at 1k, 100k and 1M
+points and a 1M-point batch split over many events.
+
+Run from the backend directory:
+    python -m benchmarks.bench_price_statistics
+"""
+import time
+
+import numpy as np
+from scipy import stats as scipy_stats
+
+from services.price_statistics import (
+    PERCENTILES, ROLLING_WINDOW_DAYS, SECONDS_PER_DAY, compute_statistics_batch,
+)
+
+SIZES = [1_000, 100_000, 1_000_000]
+BATCH_POINTS = 1_000_000
+BATCH_EVENTS = [1_000, 10_000]
+
+
+def make_series(n: int, rng: np.random.Generator):
+    # Observations every ~5 minutes with jitter, prices as a positive random walk
+    ts = 1.7e9 + np.cumsum(rng.uniform(60, 540, n))
+    prices = np.maximum(5.0, 150 + np.cumsum(rng.normal(0.01, 1.0, n)))
+    return ts, prices
+
+
+def make_batch(total: int, events: int, rng: np.random.Generator):
+    sizes = rng.multinomial(total - events, np.ones(events) / events) + 1
+    group_ids = np.repeat(np.arange(events), sizes)
+    ts_parts, price_parts = zip(*(make_series(size, rng) for size in sizes))
+    return group_ids, np.concatenate(ts_parts), np.concatenate(price_parts)
+
+
+def reference(ts: np.ndarray, prices: np.ndarray) -> dict:
+    days = (ts - ts[0]) / SECONDS_PER_DAY
+    fit = scipy_stats.linregress(days, prices)
+    returns = np.diff(np.log(prices))
+    per_day = np.sqrt(SECONDS_PER_DAY / ((ts[-1] - ts[0]) / (len(ts) - 1)))
+    peak = np.maximum.accumulate(prices)
+    window = prices[ts >= ts[-1] - ROLLING_WINDOW_DAYS * SECONDS_PER_DAY]
+    result = {
+        "mean": prices.mean(),
+        "std": prices.std(),
+        "slope_per_day": fit.slope,
+        "p_value": fit.pvalue,
+        "r_squared": fit.rvalue ** 2,
+        "volatility": returns.std(ddof=1) * per_day,
+        "max_drawdown": (prices / peak - 1).min(),
+        "rolling_min": window.min(),
+        "rolling_max": window.max(),
+    }
+    for q in PERCENTILES:
+        result[f"p{q}"] = np.percentile(prices, q)
+    return result
+
+
+def check(rng: np.random.Generator):
+    group_ids, ts, prices = make_batch(20_000, 50, rng)
+    batch = compute_statistics_batch(group_ids, ts, prices)
+    for i, group in enumerate(batch["group"]):
+        mask = group_ids == group
+        expected = reference(ts[mask], prices[mask])
+        for key, value in expected.items():
+            # p-values are tiny for strong trends; compare those in log space
+            actual = batch[key][i]
+            if key == "p_value":
+                assert np.isclose(np.log10(max(actual, 1e-300)), np.log10(max(value, 1e-300)), rtol=1e-6, atol=1e-6), (group, key, actual, value)
+            else:
+                assert np.isclose(actual, value, rtol=1e-8, atol=1e-9), (group, key, actual, value)
+    print(f"OK: batch results match per-series reference for {len(batch['group'])} events")
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = np.random.default_rng(42)
+    check(rng)
+
+    print("\nsingle series")
+    for n in SIZES:
+        ts, prices = make_series(n, rng)
+        group_ids = np.zeros(n, dtype=np.int64)
+        elapsed = _time(lambda: compute_statistics_batch(group_ids, ts, prices))
+        ref = _time(lambda: reference(ts, prices))
+        print(f"  {n:>9,} points: {elapsed * 1000:8.2f} ms  (per-series reference {ref * 1000:8.2f} ms)")
+
+    print(f"\nbatch of {BATCH_POINTS:,} points")
+    for events in BATCH_EVENTS:
+        group_ids, ts, prices = make_batch(BATCH_POINTS, events, rng)
+        elapsed = _time(lambda: compute_statistics_batch(group_ids, ts, prices))
+        starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+        bounds = list(zip(starts, np.r_[starts[1:], len(group_ids)]))
+        loop = _time(lambda: [reference(ts[a:b], prices[a:b]) for a, b in bounds], repeat=1)
+        print(f"  {events:>6,} events: {elapsed * 1000:8.2f} ms  (per-event loop {loop * 1000:9.2f} ms, {loop / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
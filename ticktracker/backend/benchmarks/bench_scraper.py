@@ -0,0 +1,75 @@
+"""
+Benchmark and equivalence check for utils.scraper.parse_price_from_html
+against the original BeautifulSoup parsing, on the saved event pages in
+benchmarks/fixtures.
+
+Run from the backend directory:
+    python -m benchmarks.bench_scraper
+"""
+import json
+import os
+import time
+
+from utils.scraper import extract_price_from_offers, extract_prices_from_text, parse_price_from_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+ITERATIONS = 50
+
+
+def legacy_parse(html: str):
+    # Parsing half of the original scrape_event_price, unchanged
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'lxml')
+
+    scripts = soup.find_all('script', type='application/ld+json')
+    for script in scripts:
+        try:
+            data = json.loads(script.string)
+            if isinstance(data, list):
+                items = data
+            else:
+                items = [data]
+
+            for item in items:
+                if item.get('@type') == 'Event':
+                    offers = item.get('offers')
+                    if offers:
+                        return extract_price_from_offers(offers)
+        except:
+            continue
+
+    og_desc = soup.find("meta", property="og:description")
+    if og_desc:
+        content = og_desc.get("content", "")
+        prices = extract_prices_from_text(content)
+        if prices:
+            return prices
+
+    return None, None
+
+
+def _time(fn, html: str) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(html)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    names = sorted(n for n in os.listdir(FIXTURES_DIR) if n.endswith(".html"))
+    print(f"{'fixture':<22} {'size':>8} {'legacy ms':>10} {'fast ms':>9} {'speedup':>8}  result")
+    for name in names:
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            html = f.read()
+
+        expected = legacy_parse(html)
+        actual = parse_price_from_html(html)
+        assert actual == expected, f"{name}: {actual} != {expected}"
+
+        legacy = _time(legacy_parse, html)
+        fast = _time(parse_price_from_html, html)
+        print(f"{name:<22} {len(html):>8} {legacy * 1000:>10.2f} {fast * 1000:>9.3f} {legacy / fast:>7.0f}x  {actual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark for services.similarity: index build and k-nearest-neighbour
+queries over 100k synthetic events, with a float64 brute-force check of
+the returned neighbours.
+
+Run from the backend directory:
+    python -m benchmarks.bench_similarity
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.similarity import SimilarityIndex, extract_features
+
+N_EVENTS = 100_000
+K = 10
+BATCH_QUERIES = 5_000
+CHECK_QUERIES = 50
+
+NAMES = [
+    "Taylor Swift | The Eras Tour", "Coldplay Live", "Lakers vs Warriors NBA", "Yankees vs Red Sox MLB",
+    "Hamilton", "Wicked the Musical", "Chicago Symphony Orchestra", "Lollapalooza Festival",
+    "Comedy Night", "Jazz at the Blue Note", "NFL Preseason: Bears vs Packers", "Metallica World Tour",
+]
+
+
+def make_events(n: int, rng: random.Random):
+    now = datetime(2026, 10, 1)
+    cities = [f"City {i}" for i in range(300)]
+    venues = {city: [f"{city} Venue {j}" for j in range(rng.randint(2, 12))] for city in cities}
+    events = []
+    for i in range(n):
+        city = rng.choice(cities)
+        price = rng.lognormvariate(4.3, 0.6) if rng.random() > 0.2 else None
+        events.append(SimpleNamespace(
+            id=f"ev_{i}", name=rng.choice(NAMES), city=city, venue=rng.choice(venues[city]),
+            date=now + timedelta(days=rng.randint(0, 365), hours=rng.randint(0, 23)),
+            price_low=price, price_median=None,
+        ))
+    return events, now
+
+
+def brute_force(index: SimilarityIndex, row: int, k: int):
+    matrix = index.matrix.astype(np.float64)
+    dist = np.sqrt(((matrix - matrix[row]) ** 2).sum(axis=1))
+    dist[row] = np.inf
+    return np.sort(dist)[:k]
+
+
+def main():
+    rng = random.Random(7)
+    events, now = make_events(N_EVENTS, rng)
+
+    start = time.perf_counter()
+    features = [extract_features(e, now) for e in events]
+    features_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SimilarityIndex(features)
+    build_time = time.perf_counter() - start
+    print(f"{N_EVENTS:,} events: features {features_time:.2f}s, index build {build_time:.2f}s "
+          f"({index.matrix.shape[1]} dims, {index.matrix.nbytes / 1e6:.1f} MB)")
+
+    ids = [e.id for e in events]
+    sample = rng.sample(ids, CHECK_QUERIES)
+    results = index.query(sample, K)
+    for event_id in sample:
+        row = index._row[event_id]
+        expected = brute_force(index, row, K)
+        got = np.array([1.0 / n.score - 1.0 for n in results[event_id]])
+        assert np.allclose(got, expected, atol=1e-2), (event_id, got, expected)
+    print(f"OK: top-{K} distances match float64 brute force for {CHECK_QUERIES} queries")
+
+    start = time.perf_counter()
+    index.query([ids[0]], K)
+    single = time.perf_counter() - start
+
+    batch_ids = rng.sample(ids, BATCH_QUERIES)
+    start = time.perf_counter()
+    index.query(batch_ids, K)
+    batch = time.perf_counter() - start
+    print(f"single query: {single * 1000:.1f} ms")
+    print(f"{BATCH_QUERIES:,} queries: {batch:.2f}s ({batch / BATCH_QUERIES * 1000:.2f} ms/query); "
+          f"all {N_EVENTS:,} events ≈ {batch / BATCH_QUERIES * N_EVENTS:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any
 from datetime import datetime
+from settings import settings
 
 class PriceDataPoint(BaseModel):
     date: datetime
@@ -8,6 +9,12 @@ class PriceDataPoint(BaseModel):
     confidence: Optional[float] = None
     data_source: Optional[str] = None
     is_outlier: bool = False
+    # Set when the point is an hourly/daily rollup; `price` is then the bucket's close
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    mean: Optional[float] = None
+    count: Optional[int] = None
 
 class PredictionDataPoint(BaseModel):
     date: datetime
@@ -36,7 +43,16 @@ class ChartStatistics(BaseModel):
     current_price: Optional[float]
     price_trend: str
     recommendation: str
-    volatility: float
+    volatility: float  # daily realized volatility of log returns
+    # Computed from the returned history (services/price_statistics.py); None without enough points
+    trend_slope_per_day: Optional[float] = None
+    trend_p_value: Optional[float] = None
+    trend_r_squared: Optional[float] = None
+    rolling_min: Optional[float] = None  # trailing 7 days
+    rolling_max: Optional[float] = None
+    max_drawdown: Optional[float] = None  # fraction below the running peak, e.g. -0.12
+    current_drawdown: Optional[float] = None
+    percentile_bands: Optional[Dict[str, float]] = None  # p10, p25, p50, p75, p90
 
 class EnhancedChartData(BaseModel):
     historical_prices: List[PriceDataPoint]
@@ -45,6 +61,12 @@ class EnhancedChartData(BaseModel):
     similar_events: List[SimilarEvent]
     buy_windows: List[BuyWindow]
     statistics: ChartStatistics
+    resolution: str = "raw"  # "raw" | "hour" | "day"
+
+class ChartDataBatchRequest(BaseModel):
+    event_ids: List[str]
+    time_range: str = 'all'
+    max_points: Optional[int] = Field(None, ge=3, le=settings.CHART_MAX_POINTS_LIMIT)  # downsample each history to at most this many points
 
 class MilestoneResponse(BaseModel):
     milestones: List[Milestone]
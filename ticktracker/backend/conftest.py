@@ -0,0 +1,9 @@
+"""
+Shared pytest setup. Loaded before any test module, so the app's settings
+and engines are created against a throwaway database, never the dev one.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="ticktracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
@@ -1,7 +1,6 @@
 from database import engine
-from models import Base
-import models # Make sure models are imported so they are registered with Base
+from migrations import run_migrations
 
 print("Creating database tables...")
-Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 print("Tables created successfully.")
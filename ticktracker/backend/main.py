@@ -1,14 +1,26 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
-import models, schemas, database, settings
-from utils import fetch_events, price_cleaner
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import models, schemas, database, settings, migrations
+from utils import fetch_events, price_cleaner, http_client, scraper
+from utils.search_cache import search_cache, make_search_key
+from utils.time_range import parse_time_range, apply_time_window
+from utils.chart_cache import chart_cache
+from utils.prediction_cache import prediction_cache
 
-from ml import train, train_price_model, price_model
+from ml import price_model
+from ml.registry import registry as model_registry
+from ml.jobs import JobConflict, TrainingJobs
 
-models.Base.metadata.create_all(bind=database.engine)
+migrations.run_migrations(database.engine)
 
 import os
 import sys
@@ -16,8 +28,34 @@ import sys
 # ... existing imports ...
 from fastapi import Request
 from routers import enhanced_charts
+from services.event_store import EventStore
+from services.event_search import EventSearch
+from services.downsampling import downsample
+from services.event_loader import EventLoader, parse_include
+from services.price_scheduler import scheduler as price_scheduler
+from services.prediction_store import PredictionStore
 
-app = FastAPI(title=settings.settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared keep-alive HTTP clients for the provider fetchers and scraper
+    await http_client.startup()
+    # Load the price model now rather than on the first prediction, and pick up new versions as they're trained
+    await asyncio.to_thread(model_registry.load)
+    model_registry.start_watching(settings.settings.ML_MODEL_WATCH_SECONDS)
+    # Optional in-process price ingestion; can also run as its own worker
+    if settings.settings.PRICE_SCHEDULER_ENABLED:
+        price_scheduler.start()
+    try:
+        yield
+    finally:
+        await price_scheduler.stop()
+        await model_registry.stop_watching()
+        training_jobs.shutdown()
+        await scraper.pool.shutdown()
+        await http_client.shutdown()
+        await database.async_engine.dispose()
+
+app = FastAPI(title=settings.settings.PROJECT_NAME, lifespan=lifespan)
 
 app.include_router(enhanced_charts.router)
 port = os.getenv("PORT", "8000")
@@ -40,87 +78,183 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Search-Providers"],
 )
 
 @app.get("/")
 def read_root():
     return {"message": "TickTracker API is running"}
 
+def _in_price_range(event_data: schemas.Event, min_price: Optional[float], max_price: Optional[float]) -> bool:
+    if min_price is not None and event_data.price_low is not None and event_data.price_low < min_price:
+        return False
+    if max_price is not None and event_data.price_low is not None and event_data.price_low > max_price:
+        return False
+    return True
+
+PROVIDERS_HEADER = "X-Search-Providers"
+
+def _format_providers(providers: dict) -> str:
+    return ", ".join(f"{name}={status}" for name, status in providers.items())
+
+def _save_events(db: Session, events: List[schemas.Event]):
+    # Save to DB to ensure we have them for details/history.
+    # One bulk upsert per search; changed real prices are appended to PriceHistory.
+    EventStore(db).upsert_events(events)
+
 @app.get("/events/search", response_model=List[schemas.Event])
 async def search_events(
+    response: Response,
     query: Optional[str] = None,
     location: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
-    # 1. Fetch from external APIs (Ticketmaster, Eventbrite)
-    # This should ideally be a background task or cached, but for now we call directly
-    # to ensure we have fresh data for the search.
-    # In a real prod app, we'd search our DB first, then fetch external if needed.
-    
-    # For this implementation, we'll fetch and merge.
-    external_events = await fetch_events.search_all_events(query, location, start_date, end_date)
+    # 1. Search our own DB first (full-text index, filters in SQL).
+    # If we already track enough fresh matches, skip the providers entirely.
+    local = await db.run_sync(
+        lambda session: EventSearch(session).search(query, location, start_date, end_date, min_price, max_price)
+    )
+    if local.fresh:
+        response.headers[PROVIDERS_HEADER] = "local=ok"
+        return local.events
+
+    # 2. Otherwise fetch from external APIs (Ticketmaster, Eventbrite, SeatGeek).
+    # Identical searches share a cached (or in-flight) upstream result.
+    cache_key = make_search_key(query, location, start_date, end_date)
+    search_result = await search_cache.get_or_fetch(
+        cache_key,
+        lambda: fetch_events.search_all_events_detailed(query, location, start_date, end_date),
+        cacheable=fetch_events.SearchResult.any_provider_answered,
+    )
+    external_events = search_result.events
+    # Tell the client which providers contributed (ok / partial / timeout / error / skipped / disabled)
+    response.headers[PROVIDERS_HEADER] = _format_providers(search_result.providers)
     
-    # 2. Save/Update in DB (Deduplication happens here or in fetch_events)
+    # 3. Save/Update in DB (Deduplication happens here or in fetch_events)
     # fetch_events should handle deduplication logic before returning
     
     # Filter by price if needed (since APIs might not support strict price filtering)
-    filtered_events = []
-    for event_data in external_events:
-        if min_price is not None and event_data.price_low is not None and event_data.price_low < min_price:
-            continue
-        if max_price is not None and event_data.price_low is not None and event_data.price_low > max_price:
-            continue
-        filtered_events.append(event_data)
-
-    # Save to DB to ensure we have them for details/history
-    # This is a simplified "upsert" logic
-    for event in filtered_events:
-        db_event = db.query(models.Event).filter(models.Event.id == event.id).first()
-        if not db_event:
-            db_event = models.Event(**event.model_dump())
-            db.add(db_event)
-        else:
-            # Update fields if needed
-            pass
-    db.commit()
+    filtered_events = [e for e in external_events if _in_price_range(e, min_price, max_price)]
+
+    await db.run_sync(_save_events, filtered_events)
     
     return filtered_events
 
+@app.get("/events/search/stream")
+async def search_events_stream(
+    query: Optional[str] = None,
+    location: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+):
+    """
+    Streams deduplicated search results as NDJSON while provider pages are still arriving.
+    Each line is {"type": "event", "event": {...}}; the last line is
+    {"type": "done", "count": n, "providers": {name: status}}.
+    """
+    async def ndjson_lines():
+        emitted = []
+        providers = {}
+        async for event in fetch_events.stream_all_events(query, location, start_date, end_date, providers):
+            if not _in_price_range(event, min_price, max_price):
+                continue
+            emitted.append(event)
+            yield json.dumps({"type": "event", "event": event.model_dump(mode="json")}) + "\n"
+
+        # The request-scoped session is gone by now, so persist with our own
+        async with database.AsyncSessionLocal() as db:
+            await db.run_sync(_save_events, emitted)
+        yield json.dumps({"type": "done", "count": len(emitted), "providers": providers}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {"search": search_cache.stats(), "chart": chart_cache.stats(), "prediction": prediction_cache.stats()}
+
+@app.get("/providers/status")
+def providers_status():
+    return {name: breaker.stats() for name, breaker in fetch_events.breakers.items()}
+
+@app.get("/scheduler/status")
+def scheduler_status():
+    return price_scheduler.stats()
+
 @app.get("/events/{event_id}", response_model=schemas.EventDetail)
-def get_event(event_id: str, db: Session = Depends(database.get_db)):
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+async def get_event(
+    event_id: str,
+    include: Optional[str] = Query(None, description="Comma-separated relations: price_history (default), milestones, predictions, similar_events"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    try:
+        relations = parse_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # One query for the event plus one per requested relation, each capped per event
+    event = await db.run_sync(lambda session: EventLoader(session).get(event_id, relations))
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 @app.get("/price-history/{event_id}", response_model=List[schemas.PriceHistory])
-def get_price_history(event_id: str, db: Session = Depends(database.get_db)):
-    history = db.query(models.PriceHistory).filter(models.PriceHistory.event_id == event_id).all()
+async def get_price_history(
+    event_id: str,
+    time_range: str = 'all',
+    max_points: Optional[int] = Query(None, ge=3, le=settings.settings.CHART_MAX_POINTS_LIMIT, description="Downsample to at most this many points"),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    try:
+        window = parse_time_range(time_range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    stmt = select(models.PriceHistory).where(models.PriceHistory.event_id == event_id)
+    stmt = apply_time_window(stmt, models.PriceHistory.timestamp, window)\
+        .order_by(models.PriceHistory.timestamp.asc())
+    history = (await db.execute(stmt)).scalars().all()
+    if max_points and len(history) > max_points:
+        # Keep the points either side of each milestone
+        milestone_dates = (await db.execute(
+            select(models.EventMilestone.milestone_date)
+            .where(models.EventMilestone.event_id == event_id, models.EventMilestone.milestone_date.isnot(None))
+        )).scalars().all()
+        history = downsample(history, max_points, milestone_dates, date_attr="timestamp")
     return history
 
+def _cached_prediction(event: models.Event):
+    db = database.SessionLocal()
+    try:
+        return PredictionStore(db).get_predictions([event])[0]
+    finally:
+        db.close()
+
 @app.get("/predict/{event_id}", response_model=schemas.Prediction)
-def predict_price(event_id: str, db: Session = Depends(database.get_db)):
+async def predict_price(event_id: str, db: AsyncSession = Depends(database.get_async_db)):
     # Use the real prediction logic (ML + Heuristic blend)
     # This keeps the app honest - no more fake 85% confidence
     try:
         # First, we need the event object. For now we reconstruct a minimal one or fetch from DB
         # Ideally this endpoint should probably read the event from DB first
-        event = db.query(models.Event).filter(models.Event.id == event_id).first()
+        event = await db.get(models.Event, event_id)
         if not event:
              raise HTTPException(status_code=404, detail="Event not found for prediction")
              
         # Convert DB model to Schema if needed, or pass DB model if compatible
         # Our predict_price_for_event expects an object with attributes.
         
-        prediction_result = price_model.predict_price_for_event(event)
+        # Cached per event, model version, day and price; misses run the
+        # model, which is CPU-bound, so the lookup stays off the event loop
+        prediction_result = await asyncio.to_thread(_cached_prediction, event)
         
         return {
             "prediction": prediction_result["buy_recommendation"].split(" ")[0].lower(), # "buy", "wait", "monitor"
             "confidence": float(prediction_result["confidence"]) / 100.0,
+            "model_version": prediction_result["model_version"],
             "next_7_days_projection": [
                  prediction_result["pred_mid_price"] * (1 + (i * 0.01)) for i in range(7) # Placeholder projection based on mid price
             ]
@@ -131,13 +265,24 @@ def predict_price(event_id: str, db: Session = Depends(database.get_db)):
         return {
             "prediction": "monitor",
             "confidence": 0.0,
+            "model_version": None,
             "next_7_days_projection": []
         }
 
-@app.post("/ml/train")
+# Training runs in a worker process; the registry swaps in a new price model once it's saved
+training_jobs = TrainingJobs(on_success=lambda job: model_registry.load() if job.get("model_version") else None)
+
+def _start_training_job(kind: str) -> Response:
+    try:
+        job = training_jobs.submit(kind)
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "job_id": e.running_job_id})
+    content = {"message": "Training started", "job_id": job["id"], "status_url": f"/ml/jobs/{job['id']}"}
+    return Response(content=json.dumps(content), status_code=202, media_type="application/json")
+
+@app.post("/ml/train", status_code=202)
 def train_model():
-    train.train_model()
-    return {"message": "Training started"}
+    return _start_training_job("basic")
 
 @app.post("/ml/predict_price")
 def predict_price_api(event: schemas.Event):
@@ -146,21 +291,53 @@ def predict_price_api(event: schemas.Event):
     """
     return price_model.predict_price_for_event(event)
 
-@app.post("/ml/train_price_model")
+@app.post("/ml/predict_price/batch")
+def predict_price_batch_api(request: schemas.PricePredictionBatchRequest):
+    """
+    Predict prices for many events with one model call; results are in request order.
+    """
+    if len(request.events) > settings.settings.ML_PREDICT_BATCH_MAX_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.settings.ML_PREDICT_BATCH_MAX_EVENTS} events per request")
+    return {"predictions": price_model.predict_prices_for_events(request.events)}
+
+@app.post("/ml/train_price_model", status_code=202)
 def train_price_model_api():
     """
-    Trigger training of the price prediction model.
+    Start training the price prediction model in the background; poll
+    /ml/jobs/{job_id} for progress, metrics and the new model version.
     """
-    # In a real app, this should be a background task
-    try:
-        train_price_model.train_model()
-        return {"message": "Price model training completed successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+    return _start_training_job("price_model")
+
+@app.get("/ml/jobs/{job_id}")
+def get_training_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/ml/models")
+def list_models():
+    """
+    Live price model and every stored version.
+    """
+    return {"live": model_registry.status(), "versions": model_registry.versions()}
+
+@app.post("/ml/models/reload")
+def reload_model(version: Optional[str] = None):
+    """
+    Reload the current model version, or make `version` current first (e.g. to roll back).
+    """
+    if version is not None:
+        try:
+            model_registry.activate(version)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    model_registry.load(force=True)
+    return model_registry.status()
 
 @app.post("/events/{event_id}/report-price", response_model=schemas.UserPriceReport)
-def report_price(event_id: str, report: schemas.PriceReportCreate, db: Session = Depends(database.get_db)):
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+async def report_price(event_id: str, report: schemas.PriceReportCreate, db: AsyncSession = Depends(database.get_async_db)):
+    event = await db.get(models.Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
         
@@ -184,7 +361,7 @@ def report_price(event_id: str, report: schemas.PriceReportCreate, db: Session =
         source_url=report.source_url
     )
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
+    await db.refresh(db_report)
     
     return db_report
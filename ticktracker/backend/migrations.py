@@ -0,0 +1,69 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from database import Base
+import models  # Make sure models are imported so they are registered with Base
+
+# create_all() only creates missing tables. Columns added to existing tables
+# since the first release are listed here and added with ALTER TABLE.
+ADDED_COLUMNS = {
+    "events": {
+        "updated_at": "TIMESTAMP",
+    },
+    "prediction_history": {
+        # Older rows keep NULL here, which the unique index on it never treats as a duplicate
+        "input_price_key": "VARCHAR",
+    },
+}
+
+
+def _add_missing_columns(engine: Engine):
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue
+            present = {c["name"] for c in inspector.get_columns(table)}
+            for column, ddl_type in columns.items():
+                if column not in present:
+                    print(f"Migration: adding {table}.{column}")
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+
+def _create_missing_indexes(engine: Engine):
+    # create_all() only adds indexes together with a new table, so indexes
+    # declared on existing tables are created here
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        present = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in present:
+                print(f"Migration: creating index {index.name}")
+                index.create(bind=engine)
+
+
+def _backfill_rollups(engine: Engine):
+    from sqlalchemy.orm import Session
+    from services.price_rollups import PriceRollups
+    with Session(bind=engine) as db:
+        written = PriceRollups(db).rebuild()
+    if written:
+        print(f"Migration: backfilled {written} price rollups")
+
+
+def run_migrations(engine: Engine):
+    """
+    Brings an existing database up to the current schema. Safe to run on
+    every startup: each step checks what is already there.
+    """
+    had_rollups = inspect(engine).has_table("price_rollups")
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _create_missing_indexes(engine)
+
+    if not had_rollups:
+        _backfill_rollups(engine)
+
+    from services.event_search import ensure_search_index
+    ensure_search_index(engine)
@@ -0,0 +1,219 @@
+"""
+Compiled form of the fitted price-model pipeline.
+
+compile_pipeline() flattens the ColumnTransformer (median imputer + scaler
+for numeric features, constant imputer + one-hot for categorical ones) and
+the GradientBoostingRegressor into plain arrays. CompiledModel scores rows
+from those arrays with NumPy only, so API workers need neither pandas nor
+sklearn at request time. Results match Pipeline.predict exactly: trees are
+evaluated on float32 features and summed stage by stage, as sklearn does.
+
+Export a stored registry version that predates compiled artifacts:
+    python -m ml.compiled_model <version>
+"""
+import json
+import os
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# A compiled model is stored as <name>.npz (arrays) + <name>.json (spec)
+COMPILED_NAME = "compiled"
+
+# Bumped when the array layout changes; older exports are then ignored
+FORMAT_VERSION = 1
+
+# Rows scored per block in CompiledModel.predict
+BLOCK_ROWS = 1024
+
+
+def compile_pipeline(pipeline) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Returns (spec, arrays) for a fitted pipeline as built by
+    train_price_model.build_pipeline(). Raises ValueError for
+    configurations the compiled path doesn't reproduce.
+    """
+    preprocessor = pipeline.named_steps["preprocessor"]
+    regressor = pipeline.named_steps["regressor"]
+    transformers = {name: (steps, columns) for name, steps, columns in preprocessor.transformers_}
+    num_steps, numeric = transformers["num"]
+    cat_steps, categorical = transformers["cat"]
+
+    # Numeric: median imputation, then standardization. Columns with no
+    # observed values in training are dropped by the imputer.
+    imputer = num_steps.named_steps["imputer"]
+    scaler = num_steps.named_steps["scaler"]
+    if imputer.keep_empty_features:
+        raise ValueError("Compiling imputers with keep_empty_features is not supported")
+    kept = ~np.isnan(imputer.statistics_)
+    n_kept = int(kept.sum())
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_kept)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_kept)
+
+    # Categorical: constant fill for missing values, then one-hot with unknowns ignored
+    cat_imputer = cat_steps.named_steps["imputer"]
+    onehot = cat_steps.named_steps["onehot"]
+    if onehot.drop is not None or getattr(onehot, "_infrequent_enabled", False) or onehot.handle_unknown != "ignore":
+        raise ValueError("Compiling one-hot encoders with drop, infrequent categories or strict unknowns is not supported")
+
+    # Trees: every node of every stage, concatenated; children are global node indices
+    trees = [estimator.tree_ for estimator in regressor.estimators_[:, 0]]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])[:-1]
+    left = np.concatenate([np.where(t.children_left >= 0, t.children_left + o, -1) for t, o in zip(trees, offsets)])
+    right = np.concatenate([np.where(t.children_right >= 0, t.children_right + o, -1) for t, o in zip(trees, offsets)])
+
+    init = regressor.init_
+    if init == "zero":
+        init_value = 0.0
+    elif hasattr(init, "constant_"):
+        init_value = float(np.ravel(init.constant_)[0])
+    else:
+        raise ValueError(f"Compiling a {type(init).__name__} init estimator is not supported")
+
+    spec = {
+        "format_version": FORMAT_VERSION,
+        "numeric_features": [f for f, k in zip(numeric, kept) if k],
+        "categorical_features": list(categorical),
+        "categorical_fill": cat_imputer.fill_value,
+        "categories": [[_json_value(c) for c in categories] for categories in onehot.categories_],
+        "learning_rate": float(regressor.learning_rate),
+        "init": init_value,
+        "max_depth": int(max(tree.max_depth for tree in trees)),
+    }
+    arrays = {
+        "impute": imputer.statistics_[kept].astype(np.float64),
+        "mean": np.asarray(mean, dtype=np.float64),
+        "scale": np.asarray(scale, dtype=np.float64),
+        "roots": offsets.astype(np.int64),
+        "left": left.astype(np.int64),
+        "right": right.astype(np.int64),
+        "feature": np.concatenate([t.feature for t in trees]).astype(np.int64),
+        "threshold": np.concatenate([t.threshold for t in trees]).astype(np.float64),
+        "value": np.concatenate([t.value[:, 0, 0] for t in trees]).astype(np.float64),
+    }
+    return spec, arrays
+
+
+def _json_value(value):
+    # Categories come out of sklearn as numpy scalars inside object arrays
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def save_compiled(directory: str, spec: Dict[str, Any], arrays: Dict[str, np.ndarray], name: str = COMPILED_NAME):
+    np.savez(os.path.join(directory, f"{name}.npz"), **arrays)
+    with open(os.path.join(directory, f"{name}.json"), "w") as f:
+        json.dump(spec, f, indent=2)
+
+
+def load_compiled(directory: str, name: str = COMPILED_NAME) -> Optional["CompiledModel"]:
+    """
+    The compiled model stored in a registry version directory, or None if
+    there is none (or it's from an incompatible exporter).
+    """
+    spec_path = os.path.join(directory, f"{name}.json")
+    arrays_path = os.path.join(directory, f"{name}.npz")
+    if not (os.path.exists(spec_path) and os.path.exists(arrays_path)):
+        return None
+    with open(spec_path) as f:
+        spec = json.load(f)
+    if spec.get("format_version") != FORMAT_VERSION:
+        return None
+    with np.load(arrays_path) as data:
+        arrays = {name: data[name] for name in data.files}
+    return CompiledModel(spec, arrays)
+
+
+class CompiledModel:
+    """
+    NumPy-only scorer for a compiled pipeline. predict() takes a mapping of
+    feature name -> column (a dict of lists or a DataFrame) and returns the
+    pipeline's raw predictions (log price for the price model).
+    """
+
+    def __init__(self, spec: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.spec = spec
+        self.numeric_features: List[str] = spec["numeric_features"]
+        self.categorical_features: List[str] = spec["categorical_features"]
+        self.fill = spec["categorical_fill"]
+        self.learning_rate = spec["learning_rate"]
+        self.init = spec["init"]
+        self.max_depth = spec["max_depth"]
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+        # One-hot layout: each categorical feature maps its categories to output columns
+        self.category_index: List[Dict[Any, int]] = []
+        position = len(self.numeric_features)
+        for categories in spec["categories"]:
+            self.category_index.append({c: position + i for i, c in enumerate(categories)})
+            position += len(categories)
+        self.n_features = position
+
+        # Traversal tables. Leaves point at themselves, so every row can take
+        # max_depth steps without checking whether it has already stopped;
+        # children[2 * node + went_left] is the next node.
+        nodes = np.arange(len(self.left))
+        leaf = self.left < 0
+        self._children = np.column_stack([np.where(leaf, nodes, self.right), np.where(leaf, nodes, self.left)]).ravel()
+        self._feature = np.where(leaf, 0, self.feature)
+        # For float32 x, x <= t exactly when x <= (t rounded down to float32),
+        # so the comparison can stay in float32
+        threshold = self.threshold.astype(np.float32)
+        self._threshold = np.where(threshold > self.threshold, np.nextafter(threshold, np.float32(-np.inf)), threshold)
+
+    def transform(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        n = len(columns[self.categorical_features[0]]) if self.categorical_features else len(columns[self.numeric_features[0]])
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+
+        if self.numeric_features:
+            numeric = np.column_stack([np.asarray(columns[f], dtype=np.float64) for f in self.numeric_features])
+            numeric = np.where(np.isnan(numeric), self.impute, numeric)
+            X[:, :len(self.numeric_features)] = (numeric - self.mean) / self.scale
+
+        rows = np.arange(n)
+        for feature, index in zip(self.categorical_features, self.category_index):
+            # NaN (x != x) is the imputer's missing marker; unknown categories stay all-zero
+            lookup, missing = index.get, index.get(self.fill, -1)
+            positions = np.array([lookup(value, -1) if value == value else missing for value in columns[feature]],
+                                 dtype=np.int64)
+            known = positions >= 0
+            X[rows[known], positions[known]] = 1.0
+        return X
+
+    def predict(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        # sklearn trees see float32 features
+        X = self.transform(columns).astype(np.float32)
+        # Row blocks keep the (rows x trees) working arrays cache-sized
+        return np.concatenate([self._score(X[i:i + BLOCK_ROWS]) for i in range(0, max(len(X), 1), BLOCK_ROWS)])
+
+    def _score(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+
+        # Walk every (tree, row) pair down one level per step, gathering
+        # from the flattened feature matrix
+        flat = X.ravel()
+        row_start = np.arange(n) * self.n_features
+        node = np.broadcast_to(self.roots[:, None], (len(self.roots), n))
+        for _ in range(self.max_depth):
+            go_left = flat.take(row_start + self._feature.take(node)) <= self._threshold.take(node)
+            node = self._children.take(2 * node + go_left)
+
+        # Accumulate stage by stage, in sklearn's order, for identical rounding
+        out = np.full(n, self.init, dtype=np.float64)
+        for leaf_values in self.value.take(node):
+            out += self.learning_rate * leaf_values
+        return out
+
+if __name__ == "__main__":
+    import sys
+    import joblib
+    from ml.registry import MODEL_FILE, compiled_quantile_name, quantile_file, registry
+
+    version = sys.argv[1]
+    version_dir = os.path.join(registry.registry_dir, version)
+    save_compiled(version_dir, *compile_pipeline(joblib.load(os.path.join(version_dir, MODEL_FILE))))
+    metadata = next((v for v in registry.versions() if v["version"] == version), {})
+    for name in metadata.get("quantiles", {}):
+        quantile_model = joblib.load(os.path.join(version_dir, quantile_file(name)))
+        save_compiled(version_dir, *compile_pipeline(quantile_model), name=compiled_quantile_name(name))
+    print(f"Compiled model written to {version_dir}")
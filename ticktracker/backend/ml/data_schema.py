@@ -27,3 +27,24 @@ class TrainingDataRow(BaseModel):
     observed_market_price_high: Optional[float]
     observed_market_price_mid: Optional[float]
     source: str
+
+
+# Model inputs, in the order the price model pipeline expects them
+NUMERIC_FEATURES = [
+    "days_to_event_at_observation",
+    "venue_capacity",
+    "heuristic_mid",
+    "ticketmaster_min_price",
+    "ticketmaster_max_price",
+    "eventbrite_min_tier_price"
+]
+
+CATEGORICAL_FEATURES = [
+    "event_type",
+    "city",
+    "country",
+    "weekday", # Treat as categorical or numeric? User said categorical.
+    "demand_signal"
+]
+
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
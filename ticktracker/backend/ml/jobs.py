@@ -0,0 +1,304 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from settings import settings
+
+# One JSON status file per job, plus a lock file while a training job runs.
+# Files (rather than process memory) let every API worker see the same jobs.
+JOBS_DIR = os.path.join(os.path.dirname(__file__), "jobs")
+LOCK_FILE = "training.lock"
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# A lock younger than this is always treated as held, whatever it contains
+LOCK_GRACE_SECONDS = 30.0
+
+
+class JobConflict(Exception):
+    """
+    Raised when a training job is requested while another one is running.
+    """
+
+    def __init__(self, running_job_id: str):
+        super().__init__(f"Training job {running_job_id} is already running")
+        self.running_job_id = running_job_id
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _job_path(jobs_dir: str, job_id: str) -> str:
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+
+def read_job(jobs_dir: str, job_id: str) -> Optional[Dict[str, Any]]:
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_job_path(jobs_dir, job_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_job(jobs_dir: str, job: Dict[str, Any]):
+    # Write-then-rename so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=jobs_dir, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp, _job_path(jobs_dir, job["id"]))
+
+
+def _update_job(jobs_dir: str, job_id: str, **changes) -> Dict[str, Any]:
+    job = read_job(jobs_dir, job_id) or {"id": job_id}
+    job.update(changes)
+    _write_job(jobs_dir, job)
+    return job
+
+
+# --- runs in the pool process ---
+
+def _train_price_model(progress: Callable[[str, float], None]) -> Dict[str, Any]:
+    from ml import train_price_model
+    version = train_price_model.train_model(progress=progress)
+    if version is None:
+        raise RuntimeError("Not enough training data; model unchanged")
+    from ml.registry import registry
+    metadata = next((v for v in registry.versions() if v["version"] == version), {})
+    return {"model_version": version, "metrics": metadata.get("metrics")}
+
+
+def _train_basic(progress: Callable[[str, float], None]) -> Dict[str, Any]:
+    from ml import train
+    progress("fitting", 0.0)
+    return {"model_version": None, "metrics": train.train_model()}
+
+
+TRAINERS = {
+    "price_model": _train_price_model,
+    "basic": _train_basic,
+}
+
+
+def _run_job(jobs_dir: str, job_id: str, kind: str) -> Dict[str, Any]:
+    _update_job(jobs_dir, job_id, status="running", started_at=_now(), worker_pid=os.getpid())
+
+    def progress(stage: str, fraction: float):
+        _update_job(jobs_dir, job_id, progress={"stage": stage, "fraction": round(fraction, 3)})
+
+    try:
+        result = TRAINERS[kind](progress)
+    except Exception as e:
+        return _update_job(jobs_dir, job_id, status="failed", finished_at=_now(), error=str(e))
+    return _update_job(
+        jobs_dir, job_id,
+        status="succeeded",
+        finished_at=_now(),
+        progress={"stage": "done", "fraction": 1.0},
+        **result,
+    )
+
+
+# --- API side ---
+
+class TrainingJobs:
+    """
+    Runs model training in a separate process so fits never hold an API
+    worker. Only one training job runs at a time across all workers sharing
+    `jobs_dir`; the lock file names the running job and the API process that
+    owns it, so a lock left by a crashed process is taken over.
+    """
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, on_success: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.jobs_dir = jobs_dir
+        self.on_success = on_success
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: a forked copy of the API process would inherit its threads and sockets
+                self._pool = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=settings.ML_JOBS_TASKS_PER_WORKER,
+                )
+            return self._pool
+
+    def submit(self, kind: str) -> Dict[str, Any]:
+        """
+        Starts a training job and returns its record straight away.
+        Raises JobConflict if one is already running.
+        """
+        if kind not in TRAINERS:
+            raise ValueError(f"Unknown training job '{kind}'")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "created_at": _now(),
+            "owner_pid": os.getpid(),
+            "progress": {"stage": "queued", "fraction": 0.0},
+        }
+        # The job file exists before the lock names it, so a lock holder's job can always be read
+        _write_job(self.jobs_dir, job)
+        try:
+            self._acquire_lock(job_id)
+        except Exception:
+            self._remove_job(job_id)
+            raise
+
+        try:
+            future = self._executor().submit(_run_job, self.jobs_dir, job_id, kind)
+        except Exception as e:
+            self._release_lock(job_id)
+            return _update_job(self.jobs_dir, job_id, status="failed", finished_at=_now(), error=str(e))
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return read_job(self.jobs_dir, job_id)
+
+    def _finished(self, job_id: str, future: Future):
+        try:
+            job = future.result()
+        except Exception as e:
+            # The worker died (or the pool shut down) before recording a result
+            if isinstance(e, BrokenProcessPool):
+                self._discard_pool()
+            job = _update_job(self.jobs_dir, job_id, status="failed", finished_at=_now(), error=f"Worker failed: {e}")
+        finally:
+            self._release_lock(job_id)
+        if job.get("status") == "succeeded" and self.on_success is not None:
+            try:
+                self.on_success(job)
+            except Exception as e:
+                print(f"Training job {job_id}: post-success hook failed: {e}")
+
+    # --- lock ---
+
+    def _lock_path(self) -> str:
+        return os.path.join(self.jobs_dir, LOCK_FILE)
+
+    def _acquire_lock(self, job_id: str):
+        # The lock is written in full under a temporary name, then published with
+        # link(), which fails if the lock exists: no one ever sees a partial lock
+        fd, tmp = tempfile.mkstemp(dir=self.jobs_dir, prefix=".lock-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"job_id": job_id, "owner_pid": os.getpid()}, f)
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp, self._lock_path())
+                    return
+                except FileExistsError:
+                    holder = self._lock_holder()
+                    if not self._is_stale(holder):
+                        raise JobConflict(holder["job_id"] if holder else "unknown")
+                    self._break_lock(holder)
+            raise JobConflict("unknown")
+        finally:
+            os.remove(tmp)
+
+    def _lock_holder(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._lock_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _lock_age(self) -> float:
+        try:
+            return time.time() - os.path.getmtime(self._lock_path())
+        except OSError:
+            return 0.0
+
+    def _is_stale(self, holder: Optional[Dict[str, Any]]) -> bool:
+        # Recent, empty or unreadable locks are held; only a lock past the grace
+        # period whose job is over, or whose owning process is gone, is stale
+        if self._lock_age() < LOCK_GRACE_SECONDS:
+            return False
+        if holder is None:
+            return True
+        job = read_job(self.jobs_dir, holder.get("job_id", ""))
+        if job is None or job.get("status") in TERMINAL_STATUSES:
+            return True
+        return not _pid_alive(holder.get("owner_pid", -1))
+
+    def _break_lock(self, holder: Optional[Dict[str, Any]]):
+        # Move the lock aside rather than deleting it, so a lock published by
+        # another submit meanwhile is put back instead of being lost
+        taken = os.path.join(self.jobs_dir, f".stale-{uuid.uuid4().hex}")
+        try:
+            os.rename(self._lock_path(), taken)
+        except FileNotFoundError:
+            return
+        try:
+            with open(taken) as f:
+                taken_holder = json.load(f)
+        except (OSError, ValueError):
+            taken_holder = None
+        if taken_holder != holder:
+            try:
+                os.link(taken, self._lock_path())
+            except FileExistsError:
+                pass
+            os.remove(taken)
+            return
+        os.remove(taken)
+
+        if holder is not None:
+            job = read_job(self.jobs_dir, holder.get("job_id", ""))
+            if job is not None and job.get("status") not in TERMINAL_STATUSES:
+                _update_job(self.jobs_dir, job["id"], status="failed", finished_at=_now(),
+                            error="Interrupted: the owning API process exited")
+
+    def _remove_job(self, job_id: str):
+        try:
+            os.remove(_job_path(self.jobs_dir, job_id))
+        except FileNotFoundError:
+            pass
+
+    def _release_lock(self, job_id: str):
+        holder = self._lock_holder()
+        if holder is not None and holder.get("job_id") == job_id:
+            try:
+                os.remove(self._lock_path())
+            except FileNotFoundError:
+                pass
+
+    def _discard_pool(self):
+        # A broken pool rejects all further work; the next submit starts a new one
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
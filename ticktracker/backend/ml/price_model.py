@@ -1,29 +1,43 @@
-import joblib
-import os
-import pandas as pd
 import numpy as np
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from utils import pricing_heuristics
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence
+from ml.compiled_model import CompiledModel
+from ml.data_schema import FEATURES
+from ml.registry import LoadedModel, registry
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "price_model.joblib")
+# Confidence for model versions trained without interval models
+DEFAULT_CONFIDENCE = 0.7
 
-_price_model = None
+# model_version recorded for predictions made without an ML model
+HEURISTIC_VERSION = "heuristic"
+
+# Interval-derived confidence is kept inside these bounds
+MIN_CONFIDENCE = 0.05
+MAX_CONFIDENCE = 0.95
+
+def get_live_model() -> Optional[LoadedModel]:
+    """
+    The registry's live model. Normally warmed at startup; loads on first
+    use otherwise (a failed load is not retried until the artifact changes).
+    """
+    return registry.current() or registry.load()
 
 def get_price_model():
-    global _price_model
-    if _price_model is None:
-        if os.path.exists(MODEL_PATH):
-            try:
-                _price_model = joblib.load(MODEL_PATH)
-            except Exception as e:
-                print(f"Error loading model: {e}")
-                return None
-        else:
-            return None
-    return _price_model
-
-def blend_prices(heuristic_mid: float, ml_mid: float, confidence: float) -> Dict[str, float]:
+    live = get_live_model()
+    return live.model if live else None
+
+def interval_confidence(ml_low: np.ndarray, ml_mid: np.ndarray, ml_high: np.ndarray) -> np.ndarray:
+    """
+    Confidence (0-1) in ML predictions from their 80% intervals:
+    1 / (1 + relative width), so an interval as wide as the prediction
+    itself gives 0.5.
+    """
+    width = (ml_high - ml_low) / np.maximum(ml_mid, 1e-9)
+    return np.clip(1.0 / (1.0 + np.maximum(width, 0.0)), MIN_CONFIDENCE, MAX_CONFIDENCE)
+
+def blend_prices(heuristic_mid: float, ml_mid: float, confidence: float,
+                 ml_low: Optional[float] = None, ml_high: Optional[float] = None) -> Dict[str, float]:
     """
     Returns final_low, final_high, final_mid, confidence.
     """
@@ -32,8 +46,13 @@ def blend_prices(heuristic_mid: float, ml_mid: float, confidence: float) -> Dict
     # Simple blending: weighted average
     final_mid = alpha * ml_mid + (1 - alpha) * heuristic_mid
 
-    final_low = final_mid * 0.8
-    final_high = final_mid * 1.3
+    if ml_low is not None and ml_high is not None and ml_mid > 0:
+        # The model's interval, scaled to the blended mid
+        final_low = final_mid * min(ml_low / ml_mid, 1.0)
+        final_high = final_mid * max(ml_high / ml_mid, 1.0)
+    else:
+        final_low = final_mid * 0.8
+        final_high = final_mid * 1.3
 
     return {
         "final_low": round(final_low, 2),
@@ -60,63 +79,131 @@ def get_buy_recommendation(days_to_event: int, confidence: float, current_price:
             
     return "Monitor"
 
+def build_feature_columns(events: Sequence, heuristics: List[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Feature name -> one value per event (see ml/data_schema.py).
+    """
+    venue_capacity = [getattr(event, "venue_capacity", None) for event in events]  # Might be missing on Event object
+    features = {
+        "days_to_event_at_observation": [h["components"]["days_to_event"] for h in heuristics],
+        "venue_capacity": [capacity if capacity else np.nan for capacity in venue_capacity],
+        "heuristic_mid": [h["heuristic_mid"] for h in heuristics],
+        "ticketmaster_min_price": [event.price_low if event.source == "ticketmaster" else np.nan for event in events],
+        "ticketmaster_max_price": [event.price_high if event.source == "ticketmaster" else np.nan for event in events],
+        "eventbrite_min_tier_price": [event.price_low if event.source == "eventbrite" else np.nan for event in events],
+        "event_type": [h["components"]["event_type"] for h in heuristics],
+        "city": [event.city for event in events],
+        "country": ["US"] * len(events), # Default or extract
+        "weekday": [event.date.weekday() for event in events],
+        "demand_signal": ["unknown"] * len(events) # Placeholder
+    }
+    return features
+
+def predict_log_prices(model, columns: Dict[str, list]) -> np.ndarray:
+    """
+    Raw (log1p) model output per row of build_feature_columns; compiled
+    models skip the DataFrame.
+    """
+    if isinstance(model, CompiledModel):
+        return model.predict(columns)
+    import pandas as pd
+    return model.predict(pd.DataFrame(columns, columns=FEATURES))
+
 def predict_price_for_event(event) -> Dict[str, Any]:
     """
     Predict price for an event using ML + Heuristics.
     Input: Event object (pydantic model or similar)
     """
+    return predict_prices_for_events([event])[0]
+
+def predict_prices_for_events(events: Sequence, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Batch form of predict_price_for_event: heuristics for every event in bulk
+    against one clock reading (`now`, UTC-aware, defaults to the current
+    time), feature columns from build_feature_columns and a single predict
+    call per model. Results are in input order.
+    """
+    events = list(events)
+    if not events:
+        return []
+
     # 1. Compute Heuristics
-    heuristic_data = pricing_heuristics.compute_heuristic_price(event)
-    heuristic_mid = heuristic_data["heuristic_mid"]
-    
+    now = now or datetime.now(timezone.utc)
+    heuristics = pricing_heuristics.compute_heuristic_prices(events, now)
+    return _predict_rows(events, heuristics)
+
+def forecast_prices_for_events(events: Sequence, horizon_days: int, now: Optional[datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Daily forecasts for each event: the blended prediction as observed at
+    midnight UTC of each of the next `horizon_days` days, up to the event
+    date. All events and days are scored together. Returns
+    {event_id: [prediction dict + "prediction_date" (naive UTC)]}.
+    """
+    events = list(events)
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    row_events, row_dates, heuristics = [], [], []
+    for day in range(1, horizon_days + 1):
+        observed = today + timedelta(days=day)
+        upcoming = [e for e in events if (e.date if e.date.tzinfo else e.date.replace(tzinfo=timezone.utc)) > observed]
+        row_events += upcoming
+        row_dates += [observed] * len(upcoming)
+        heuristics += pricing_heuristics.compute_heuristic_prices(upcoming, observed)
+
+    forecasts = {event.id: [] for event in events}
+    for event, observed, result in zip(row_events, row_dates, _predict_rows(row_events, heuristics)):
+        result["prediction_date"] = observed.replace(tzinfo=None)
+        forecasts[event.id].append(result)
+    return forecasts
+
+def _predict_rows(events: List, heuristics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # One prediction per (event, heuristics) row; rows may repeat an event at different observation times
+    if not events:
+        return []
+
     # 2. Try ML Prediction
-    model = get_price_model()
-    ml_mid = None
-    confidence = 0.0
+    # One reference for the whole batch, so a hot reload can't mix versions
+    live = get_live_model()
+    ml_mids = ml_lows = ml_highs = [None] * len(events)
+    confidences = [0.0] * len(events)
     source = "heuristic_only"
-    
-    if model:
+    model_version = None
+
+    if live:
         try:
-            # Build feature vector
-            # Must match training features order/names
-            
-            # Extract features
-            days_to_event = pricing_heuristics.compute_days_to_event(event.date)
-            venue_capacity = getattr(event, "venue_capacity", None) # Might be missing on Event object
-            
-            # We need to construct a DataFrame for the pipeline
-            features = {
-                "days_to_event_at_observation": [days_to_event],
-                "venue_capacity": [venue_capacity if venue_capacity else np.nan],
-                "heuristic_mid": [heuristic_mid],
-                "ticketmaster_min_price": [event.price_low if event.source == "ticketmaster" else np.nan],
-                "ticketmaster_max_price": [event.price_high if event.source == "ticketmaster" else np.nan],
-                "eventbrite_min_tier_price": [event.price_low if event.source == "eventbrite" else np.nan],
-                "event_type": [pricing_heuristics.classify_event_type(event)],
-                "city": [event.city],
-                "country": ["US"], # Default or extract
-                "weekday": [event.date.weekday()],
-                "demand_signal": ["unknown"] # Placeholder
-            }
-            
-            df_features = pd.DataFrame(features)
-            
             # Predict
-            pred_log = model.predict(df_features)[0]
-            ml_mid = np.expm1(pred_log)
-            
-            # Estimate confidence (mock logic for now)
-            # Real logic would use prediction intervals or distance from training data
-            confidence = 0.7 # Default moderate confidence if model works
+            columns = build_feature_columns(events, heuristics)
+            ml_mids = np.expm1(predict_log_prices(live.model, columns))
+
+            # Confidence from the model's prediction interval where the version has one
+            if "lower" in live.quantiles and "upper" in live.quantiles:
+                ml_lows = np.expm1(predict_log_prices(live.quantiles["lower"], columns))
+                ml_highs = np.expm1(predict_log_prices(live.quantiles["upper"], columns))
+                confidences = interval_confidence(ml_lows, ml_mids, ml_highs)
+            else:
+                confidences = [DEFAULT_CONFIDENCE] * len(events)
             source = "ml+heuristic"
-            
+            model_version = live.version
+
         except Exception as e:
             print(f"ML prediction failed: {e}")
-            ml_mid = None
-            
+            ml_mids = ml_lows = ml_highs = [None] * len(events)
+            confidences = [0.0] * len(events)
+
+    return [
+        _finalize_prediction(event, heuristic_data, ml_mid, float(confidence), source, model_version, ml_low, ml_high)
+        for event, heuristic_data, ml_mid, confidence, ml_low, ml_high
+        in zip(events, heuristics, ml_mids, confidences, ml_lows, ml_highs)
+    ]
+
+def _finalize_prediction(event, heuristic_data: Dict[str, Any], ml_mid, confidence: float, source: str,
+                         model_version: Optional[str], ml_low=None, ml_high=None) -> Dict[str, Any]:
+    heuristic_mid = heuristic_data["heuristic_mid"]
+
     # 3. Blend
     if ml_mid is not None:
-        result = blend_prices(heuristic_mid, ml_mid, confidence)
+        result = blend_prices(heuristic_mid, ml_mid, confidence, ml_low, ml_high)
     else:
         result = {
             "final_low": heuristic_data["heuristic_low"],
@@ -124,12 +211,12 @@ def predict_price_for_event(event) -> Dict[str, Any]:
             "final_mid": heuristic_mid,
             "confidence": 0.0
         }
-        
+
     # 4. Recommendation
-    days_to_event = pricing_heuristics.compute_days_to_event(event.date)
+    days_to_event = heuristic_data["components"]["days_to_event"]
     current_price = event.price_low # Use low price as proxy for "current available"
     recommendation = get_buy_recommendation(days_to_event, result["confidence"]/100.0, current_price, result["final_mid"])
-    
+
     return {
         "event_id": event.id,
         "pred_low_price": result["final_low"],
@@ -137,6 +224,7 @@ def predict_price_for_event(event) -> Dict[str, Any]:
         "pred_mid_price": result["final_mid"],
         "confidence": result["confidence"],
         "source": source,
+        "model_version": model_version, # None when the heuristic was used alone
         "buy_recommendation": recommendation,
         "heuristic_details": heuristic_data
     }
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from ml.compiled_model import COMPILED_NAME, CompiledModel, load_compiled, save_compiled
+from settings import settings
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+# Versioned artifacts live in REGISTRY_DIR/<version>/{model.joblib,metadata.json},
+# plus compiled.{npz,json} when the model was exported and quantile_<name>.joblib
+# (compiled_<name>.{npz,json}) per interval model; CURRENT holds the active version's name.
+# Set ML_REGISTRY_DIR to keep them elsewhere; the default is ignored by git.
+REGISTRY_DIR = settings.ML_REGISTRY_DIR or os.path.join(MODELS_DIR, "price_model")
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+
+# Single-file artifact from before the registry; served as version "legacy"
+LEGACY_MODEL_PATH = os.path.join(MODELS_DIR, "price_model.joblib")
+LEGACY_VERSION = "legacy"
+
+
+class LoadedModel(NamedTuple):
+    version: str
+    model: Any
+    metadata: Dict[str, Any]
+    # Interval models by name ("lower", "upper"); empty for versions trained without them
+    quantiles: Dict[str, Any] = {}
+
+
+def quantile_file(name: str) -> str:
+    return f"quantile_{name}.joblib"
+
+
+def compiled_quantile_name(name: str) -> str:
+    return f"compiled_{name}"
+
+
+def _write_atomic(path: str, content: str):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """
+    Versioned price-model artifacts plus the live, loaded model.
+
+    - save() writes a new version next to the old ones and points CURRENT at it.
+    - load() reads whatever CURRENT names (or the legacy file), then swaps
+      it in with one assignment; predictions never wait on a load. Those that
+      already took a reference from current() finish on the model they
+      started with. A version's compiled export is preferred, so serving
+      doesn't import sklearn; the pickle is the fallback.
+    - A failed load keeps the previous model and isn't retried until the
+      artifact changes or a reload is forced.
+    - start_watching() polls CURRENT so a model trained by another process (or worker)
+      is picked up without a restart.
+    """
+
+    def __init__(self, registry_dir: str = REGISTRY_DIR, legacy_path: str = LEGACY_MODEL_PATH):
+        self.registry_dir = registry_dir
+        self.current_file = os.path.join(registry_dir, "CURRENT")
+        self.legacy_path = legacy_path
+        self._live: Optional[LoadedModel] = None
+        self._load_lock = threading.Lock()
+        self._loaded_source: Optional[Tuple[str, float]] = None
+        self._failed_source: Optional[Tuple[str, float]] = None
+        self.last_error: Optional[str] = None
+        self.loaded_at: Optional[datetime] = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+    # --- artifacts ---
+
+    def save(self, model: Any, metrics: Dict[str, float], features: List[str], activate: bool = True,
+             compiled: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None,
+             quantiles: Optional[Dict[str, Tuple[float, Any, Optional[Tuple[Dict[str, Any], Dict[str, Any]]]]]] = None) -> str:
+        """
+        Stores a fitted model as a new version and, by default, makes it
+        current. `compiled` is its (spec, arrays) export from
+        ml.compiled_model.compile_pipeline(); `quantiles` maps an interval
+        model's name to (alpha, model, compiled export or None).
+        Returns the version name.
+        """
+        quantiles = quantiles or {}
+        import joblib
+        os.makedirs(self.registry_dir, exist_ok=True)
+        trained_at = datetime.now(timezone.utc)
+        version = trained_at.strftime("%Y%m%dT%H%M%S%fZ")
+
+        # Build the version directory under a temporary name so readers never see it half-written
+        staging = tempfile.mkdtemp(dir=self.registry_dir, prefix=".staging-")
+        try:
+            joblib.dump(model, os.path.join(staging, MODEL_FILE))
+            if compiled is not None:
+                save_compiled(staging, *compiled)
+            for name, (alpha, quantile_model, quantile_compiled) in quantiles.items():
+                joblib.dump(quantile_model, os.path.join(staging, quantile_file(name)))
+                if quantile_compiled is not None:
+                    save_compiled(staging, *quantile_compiled, name=compiled_quantile_name(name))
+            metadata = {
+                "version": version,
+                "trained_at": trained_at.isoformat(),
+                "metrics": metrics,
+                "features": list(features),
+                "quantiles": {name: alpha for name, (alpha, _, _) in quantiles.items()},
+            }
+            with open(os.path.join(staging, METADATA_FILE), "w") as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(staging, os.path.join(self.registry_dir, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        if not version or version.startswith(".") or os.sep in version or not os.path.exists(os.path.join(self.registry_dir, version, MODEL_FILE)):
+            raise ValueError(f"Unknown model version '{version}'")
+        _write_atomic(self.current_file, version)
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """
+        Metadata of every stored version, newest first.
+        """
+        if not os.path.isdir(self.registry_dir):
+            return []
+        result = []
+        for name in sorted(os.listdir(self.registry_dir), reverse=True):
+            metadata = self._read_metadata(name)
+            if metadata is not None:
+                result.append(metadata)
+        return result
+
+    def _read_metadata(self, version: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.registry_dir, version, METADATA_FILE)
+        if version.startswith(".") or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _source(self) -> Optional[Tuple[str, str, float]]:
+        # (version, artifact path, mtime) that load() would use right now
+        try:
+            with open(self.current_file) as f:
+                version = f.read().strip()
+            path = os.path.join(self.registry_dir, version, MODEL_FILE)
+            return version, path, os.path.getmtime(path)
+        except OSError:
+            pass
+        if os.path.exists(self.legacy_path):
+            return LEGACY_VERSION, self.legacy_path, os.path.getmtime(self.legacy_path)
+        return None
+
+    # --- live model ---
+
+    def current(self) -> Optional[LoadedModel]:
+        """
+        The live model. Take one reference per prediction (or batch) and use
+        it throughout, so a concurrent reload can't mix versions.
+        """
+        return self._live
+
+    def use(self, model: Any, version: str, metadata: Optional[Dict[str, Any]] = None,
+            quantiles: Optional[Dict[str, Any]] = None):
+        """
+        Serves an in-memory model, e.g. one fitted by a benchmark or test.
+        """
+        self._live = LoadedModel(version, model, metadata or {}, quantiles or {})
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def load(self, force: bool = False) -> Optional[LoadedModel]:
+        """
+        Loads the current artifact if it changed since the last load (or
+        failed load). Returns the live model, which is the previous one if
+        loading failed.
+        """
+        with self._load_lock:
+            source = self._source()
+            if source is None:
+                return self._live
+            version, path, mtime = source
+            key = (path, mtime)
+            if not force and key in (self._loaded_source, self._failed_source):
+                return self._live
+
+            metadata = {} if version == LEGACY_VERSION else (self._read_metadata(version) or {})
+            try:
+                model = self._load_model(version, path)
+                directory = os.path.dirname(path)
+                quantiles = {
+                    name: self._load_model(version, os.path.join(directory, quantile_file(name)), compiled_quantile_name(name))
+                    for name in metadata.get("quantiles", {})
+                }
+            except Exception as e:
+                self._failed_source = key
+                self.last_error = f"{version}: {e}"
+                print(f"Error loading model {version}: {e}")
+                return self._live
+
+            self._live = LoadedModel(version, model, metadata, quantiles)
+            self._loaded_source = key
+            self._failed_source = None
+            self.last_error = None
+            self.loaded_at = datetime.now(timezone.utc)
+            print(f"Price model {version} loaded")
+            return self._live
+
+    def _load_model(self, version: str, path: str, compiled_name: str = COMPILED_NAME) -> Any:
+        if settings.ML_USE_COMPILED_MODEL and version != LEGACY_VERSION:
+            compiled = load_compiled(os.path.dirname(path), compiled_name)
+            if compiled is not None:
+                return compiled
+        import joblib
+        return joblib.load(path)
+
+    # --- background reload ---
+
+    def start_watching(self, interval: float):
+        if interval > 0 and (self._watch_task is None or self._watch_task.done()):
+            self._watch_task = asyncio.create_task(self._watch(interval))
+
+    async def stop_watching(self):
+        if self._watch_task is None:
+            return
+        self._watch_task.cancel()
+        try:
+            await self._watch_task
+        except asyncio.CancelledError:
+            pass
+        self._watch_task = None
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Cheap when nothing changed: one small file read and a stat
+                await asyncio.to_thread(self.load)
+            except Exception as e:
+                print(f"Model watch failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        live = self._live
+        return {
+            "version": live.version if live else None,
+            "metadata": live.metadata if live else None,
+            "compiled": isinstance(live.model, CompiledModel) if live else None,
+            "quantiles": sorted(live.quantiles) if live else None,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "last_error": self.last_error,
+        }
+
+
+registry = ModelRegistry()
@@ -4,18 +4,15 @@ import os
 from datetime import datetime, timedelta
 import random
 
-def generate_seed_data():
+def build_seed_frame(n_samples: int = 1000) -> pd.DataFrame:
     """
-    Generates synthetic data to train the price model.
-    This simulates historical data so the model has something to learn from
-    in the absence of a large real database.
+    Synthetic training rows for the price model.
     """
     
     cities = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Philadelphia"]
     event_types = ["concert", "sports", "theater", "festival"]
     demand_signals = ["low", "medium", "high", "very_high"]
     
-    n_samples = 1000
     data = []
     
     for _ in range(n_samples):
@@ -73,7 +70,16 @@ def generate_seed_data():
             "observed_market_price_mid": true_market_mid
         })
         
-    df = pd.DataFrame(data)
+    return pd.DataFrame(data)
+
+def generate_seed_data():
+    """
+    Generates synthetic data to train the price model.
+    This simulates historical data so the model has something to learn from
+    in the absence of a large real database.
+    """
+    n_samples = 1000
+    df = build_seed_frame(n_samples)
     
     # Save
     data_dir = os.path.join(os.path.dirname(__file__), "data")
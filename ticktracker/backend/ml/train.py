@@ -49,6 +49,7 @@ def train_model():
         print(f"Model trained. MSE: {mse}, MAE: {mae}, R2: {r2}")
         
         joblib.dump(model, MODEL_PATH)
+        return {"mse": float(mse), "mae": float(mae), "r2": float(r2)}
         
     finally:
         db.close()
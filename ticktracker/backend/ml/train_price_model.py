@@ -7,14 +7,67 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import mean_squared_error, mean_absolute_error, mean_absolute_percentage_error
-from joblib import dump
 import os
+from typing import Callable, Optional
+from ml.compiled_model import compile_pipeline
+from ml.data_schema import CATEGORICAL_FEATURES, FEATURES, NUMERIC_FEATURES
+from ml.registry import registry
 
 DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "price_training_data.parquet")
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "price_model.joblib")
 
-def train_model():
+# Interval models trained alongside the point model: name -> quantile of log price.
+# Together they bound an 80% prediction interval.
+QUANTILES = {"lower": 0.1, "upper": 0.9}
+
+def build_pipeline(quantile: Optional[float] = None) -> Pipeline:
+    """
+    Unfitted preprocessing + regressor pipeline over FEATURES. With
+    `quantile`, the regressor predicts that quantile instead of the mean.
+    """
+    # Preprocessing
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    
+    categorical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, NUMERIC_FEATURES),
+            ('cat', categorical_transformer, CATEGORICAL_FEATURES)
+        ])
+        
+    # Model
+    if quantile is None:
+        regressor = GradientBoostingRegressor(n_estimators=100, random_state=42)
+    else:
+        regressor = GradientBoostingRegressor(loss='quantile', alpha=quantile, n_estimators=100, random_state=42)
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('regressor', regressor)
+    ])
+
+def _export(model: Pipeline):
+    # Flat-array form of the fitted pipeline so the API can score without sklearn
+    try:
+        return compile_pipeline(model)
+    except ValueError as e:
+        print(f"Model not compiled, the API will load the pickle: {e}")
+        return None
+
+def train_model(progress: Optional[Callable[[str, float], None]] = None) -> Optional[str]:
+    """
+    Fits the price model on the training data and stores it in the model
+    registry. Returns the new version, or None if there was nothing to train on.
+    `progress(stage, fraction)` is called as training advances (see ml/jobs.py).
+    """
+    progress = progress or (lambda stage, fraction: None)
     print("Starting model training...")
+    progress("loading", 0.0)
     
     if not os.path.exists(DATA_PATH):
         print(f"No training data found at {DATA_PATH}. Skipping training.")
@@ -26,24 +79,6 @@ def train_model():
         print("Training data is empty. Skipping training.")
         return
 
-    # Features
-    numeric_features = [
-        "days_to_event_at_observation",
-        "venue_capacity",
-        "heuristic_mid",
-        "ticketmaster_min_price",
-        "ticketmaster_max_price",
-        "eventbrite_min_tier_price"
-    ]
-    
-    categorical_features = [
-        "event_type",
-        "city",
-        "country",
-        "weekday", # Treat as categorical or numeric? User said categorical.
-        "demand_signal"
-    ]
-    
     # Target
     # We want to predict the residual or the actual price.
     # The prompt says: "ML model learns the residual: residual = true_price - heuristic_mid_price"
@@ -60,37 +95,33 @@ def train_model():
         print("Not enough data to train (need at least 10 samples).")
         return
 
-    X = df[numeric_features + categorical_features]
+    X = df[FEATURES]
     y = np.log1p(df[target]) # Log transform target
     
-    # Preprocessing
-    numeric_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='median')),
-        ('scaler', StandardScaler())
-    ])
-    
-    categorical_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))
-    ])
-    
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', numeric_transformer, numeric_features),
-            ('cat', categorical_transformer, categorical_features)
-        ])
-        
-    # Model
-    model = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('regressor', GradientBoostingRegressor(n_estimators=100, random_state=42))
-    ])
+    # Point model first, then one model per interval bound
+    models = {"mid": build_pipeline()}
+    models.update({name: build_pipeline(alpha) for name, alpha in QUANTILES.items()})
     
     # Split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Train
-    model.fit(X_train, y_train)
+    # Train; each regressor reports its boosting stages through the monitor hook.
+    # Fitting spans 0.1-0.9 of the progress bar, split evenly between the models.
+    share = 0.8 / len(models)
+    for position, (name, pipeline) in enumerate(models.items()):
+        n_estimators = pipeline.named_steps["regressor"].n_estimators
+        step = max(n_estimators // 20, 1)
+        start = 0.1 + position * share
+
+        def monitor(i, estimator, local_vars, start=start, n_estimators=n_estimators, step=step):
+            if (i + 1) % step == 0:
+                progress("fitting", start + share * (i + 1) / n_estimators)
+            return False
+
+        progress("fitting", start)
+        pipeline.fit(X_train, y_train, regressor__monitor=monitor)
+    model = models["mid"]
+    progress("evaluating", 0.9)
     
     # Evaluate
     y_pred = model.predict(X_test)
@@ -101,15 +132,34 @@ def train_model():
     rmse = np.sqrt(mean_squared_error(y_test_orig, y_pred_orig))
     mae = mean_absolute_error(y_test_orig, y_pred_orig)
     mape = mean_absolute_percentage_error(y_test_orig, y_pred_orig)
+
+    # How often the interval holds the observed price, and how wide it is relative to the point prediction
+    y_lower = models["lower"].predict(X_test)
+    y_upper = models["upper"].predict(X_test)
+    coverage = np.mean((y_test >= y_lower) & (y_test <= y_upper))
+    width = np.mean((np.expm1(y_upper) - np.expm1(y_lower)) / np.maximum(y_pred_orig, 1e-9))
     
     print(f"Model Evaluation:")
     print(f"RMSE: {rmse:.2f}")
     print(f"MAE: {mae:.2f}")
     print(f"MAPE: {mape:.2%}")
-    
-    # Save
-    dump(model, MODEL_PATH)
-    print(f"Model saved to {MODEL_PATH}")
+    print(f"Interval coverage: {coverage:.2%} (target {QUANTILES['upper'] - QUANTILES['lower']:.0%}), mean relative width {width:.2f}")
+    
+    # Save as a new registry version and make it current
+    progress("saving", 0.95)
+    metrics = {
+        "rmse": float(rmse),
+        "mae": float(mae),
+        "mape": float(mape),
+        "interval_coverage": float(coverage),
+        "interval_width": float(width),
+        "n_train": int(len(X_train)),
+        "n_test": int(len(X_test)),
+    }
+    quantiles = {name: (alpha, models[name], _export(models[name])) for name, alpha in QUANTILES.items()}
+    version = registry.save(model, metrics, FEATURES, compiled=_export(model), quantiles=quantiles)
+    print(f"Model saved as version {version}")
+    return version
 
 if __name__ == "__main__":
     train_model()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -19,6 +19,8 @@ class Event(Base):
     url = Column(String)
     source = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Last time a provider confirmed this event; drives local search freshness
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     price_history = relationship("PriceHistory", back_populates="event")
     user_reports = relationship("UserPriceReport", back_populates="event")
@@ -40,6 +42,42 @@ class PriceHistory(Base):
 
     event = relationship("Event", back_populates="price_history")
 
+    # Every chart/history read is "one event, ordered by time"
+    __table_args__ = (
+        Index("ix_price_history_event_id_timestamp", "event_id", "timestamp"),
+    )
+
+class PriceRollup(Base):
+    """OHLC aggregate of an event's PriceHistory over one hour or one day (services/price_rollups.py)."""
+    __tablename__ = "price_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String, ForeignKey("events.id"), nullable=False)
+    resolution = Column(String, nullable=False)  # "hour" | "day"
+    bucket_start = Column(DateTime, nullable=False)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    count = Column(Integer, default=0)
+    sum = Column(Float, default=0.0)
+    # Timestamps of the observations behind open/close, so late arrivals merge correctly
+    first_at = Column(DateTime)
+    last_at = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("event_id", "resolution", "bucket_start", name="uq_price_rollups_bucket"),
+    )
+
+class PriceCheck(Base):
+    """Last re-pricing attempt of an event by services/price_scheduler.py, successful or not."""
+    __tablename__ = "price_checks"
+
+    event_id = Column(String, ForeignKey("events.id"), primary_key=True)
+    checked_at = Column(DateTime, nullable=False)
+    # Attempts in a row that found no price; backs off the next one
+    failures = Column(Integer, nullable=False, default=0)
+
 class UserPriceReport(Base):
     __tablename__ = "user_price_reports"
     
@@ -52,6 +90,10 @@ class UserPriceReport(Base):
     
     event = relationship("Event", back_populates="user_reports")
 
+    __table_args__ = (
+        Index("ix_user_price_reports_event_id_created_at", "event_id", "created_at"),
+    )
+
 class EventMilestone(Base):
     __tablename__ = "event_milestones"
 
@@ -67,6 +109,10 @@ class EventMilestone(Base):
 
     event = relationship("Event", back_populates="milestones")
 
+    __table_args__ = (
+        Index("ix_event_milestones_event_id_milestone_date", "event_id", "milestone_date"),
+    )
+
 class PredictionHistory(Base):
     __tablename__ = "prediction_history"
 
@@ -78,11 +124,19 @@ class PredictionHistory(Base):
     confidence_upper = Column(Float)
     model_version = Column(String)
     features_used = Column(String, nullable=True)
+    # Price the prediction was made from, as text ("" = no price); NULL on rows written before it existed
+    input_price_key = Column(String, nullable=True)
     recommendation = Column(String, nullable=True)
     created_at = Column(DateTime, default=func.now())
 
     event = relationship("Event", back_populates="predictions")
 
+    __table_args__ = (
+        Index("ix_prediction_history_event_id_prediction_date", "event_id", "prediction_date"),
+        # One stored prediction per set of inputs (services/prediction_store.py upserts on it)
+        Index("uq_prediction_history_inputs", "event_id", "prediction_date", "model_version", "input_price_key", unique=True),
+    )
+
 class SimilarEventsCache(Base):
     __tablename__ = "similar_events_cache"
 
@@ -95,3 +149,16 @@ class SimilarEventsCache(Base):
     expires_at = Column(DateTime, nullable=True)
 
     event = relationship("Event", back_populates="similar_events")
+
+    __table_args__ = (
+        Index("ix_similar_events_cache_event_id_score", "event_id", "similarity_score"),
+    )
+
+class ScrapeResult(Base):
+    __tablename__ = "scrape_cache"
+
+    url = Column(String, primary_key=True)
+    price_low = Column(Float, nullable=True)  # NULL = page had no price (negative entry)
+    price_high = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
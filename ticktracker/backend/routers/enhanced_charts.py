@@ -1,18 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 import database
 import chart_schemas as schemas
 from services.chart_data_service import ChartDataService
+from settings import settings
+from utils.chart_cache import chart_cache
+from utils.chart_encoding import chart_response, compress, encode_chart, negotiate_encoding, negotiate_format
 
 router = APIRouter(
     prefix="/api/events",
     tags=["enhanced-charts"]
 )
 
+
+def _cache_variant(time_range: str, format: str, max_points: Optional[int]) -> str:
+    # Plain full-resolution JSON keeps the bare time range as its key
+    variant = time_range.strip()
+    if max_points:
+        variant = f"{variant}|max{max_points}"
+    return variant if format == "json" else f"{variant}|{format}"
+
+
+def _negotiate(format: Optional[str], accept: Optional[str]) -> str:
+    try:
+        return negotiate_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{event_id}/chart-data", response_model=schemas.EnhancedChartData)
-def get_enhanced_chart_data(event_id: str, time_range: str = 'all', db: Session = Depends(database.get_db)):
-    service = ChartDataService(db)
-    chart_data = service.get_chart_data(event_id, time_range)
-    if not chart_data:
-        raise HTTPException(status_code=404, detail="Event not found or chart data unavailable")
-    return chart_data
+async def get_enhanced_chart_data(
+    event_id: str,
+    time_range: str = 'all',
+    format: Optional[str] = None,
+    max_points: Optional[int] = Query(None, ge=3, le=settings.CHART_MAX_POINTS_LIMIT, description="Downsample historical prices to at most this many points"),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Chart payload for one event. `?format=columnar` (or an Accept header of
+    application/vnd.ticktracker.columnar+json) sends historical prices as
+    parallel arrays; gzip/br are applied when the client accepts them.
+    """
+    format = _negotiate(format, accept)
+    encoding = negotiate_encoding(accept_encoding)
+
+    # Serve the serialized payload straight from the cache; it is dropped
+    # whenever prices, milestones or predictions for the event are written.
+    # Compressed bodies are cached too (as variant|encoding): compressing
+    # costs more than encoding, so a hit shouldn't redo it.
+    variant = _cache_variant(time_range, format, max_points)
+    compressed_variant = f"{variant}|{encoding}" if encoding else None
+    if compressed_variant:
+        body = chart_cache.get(event_id, compressed_variant)
+        if body is not None:
+            return chart_response(body, format, encoding)
+
+    generation = chart_cache.generation(event_id)
+    payload = chart_cache.get(event_id, variant)
+    if payload is None:
+        try:
+            chart_data = await db.run_sync(lambda session: ChartDataService(session).get_chart_data(event_id, time_range, max_points))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not chart_data:
+            raise HTTPException(status_code=404, detail="Event not found or chart data unavailable")
+
+        payload = encode_chart(chart_data, format)
+        chart_cache.set(event_id, variant, payload, generation)
+
+    body, encoding = compress(payload, encoding)
+    if encoding:
+        chart_cache.set(event_id, compressed_variant, body, generation)
+    return chart_response(body, format, encoding)
+
+
+@router.post("/chart-data/batch")
+async def get_enhanced_chart_data_batch(
+    request: schemas.ChartDataBatchRequest,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Chart payloads for several events: {"charts": {event_id: EnhancedChartData}, "missing": [...]}.
+    Cached payloads are reused; the rest are built together in one pass.
+    Format and compression are negotiated as for a single chart.
+    """
+    event_ids = list(dict.fromkeys(request.event_ids))
+    if len(event_ids) > settings.CHART_BATCH_MAX_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.CHART_BATCH_MAX_EVENTS} events per request")
+    format = _negotiate(format, accept)
+    encoding = negotiate_encoding(accept_encoding)
+
+    variant = _cache_variant(request.time_range, format, request.max_points)
+    payloads = {}
+    generations = {}
+    for event_id in event_ids:
+        payload = chart_cache.get(event_id, variant)
+        if payload is not None:
+            payloads[event_id] = payload
+        else:
+            generations[event_id] = chart_cache.generation(event_id)
+
+    if generations:
+        try:
+            charts = await db.run_sync(
+                lambda session: ChartDataService(session).get_chart_data_batch(list(generations), request.time_range, request.max_points)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        for event_id, chart_data in charts.items():
+            payload = encode_chart(chart_data, format)
+            chart_cache.set(event_id, variant, payload, generations[event_id])
+            payloads[event_id] = payload
+
+    # Splice the serialized payloads together rather than re-encoding them
+    charts_json = b",".join(
+        json.dumps(event_id).encode() + b":" + payloads[event_id]
+        for event_id in event_ids if event_id in payloads
+    )
+    missing = [event_id for event_id in event_ids if event_id not in payloads]
+    content = b'{"charts":{' + charts_json + b'},"missing":' + json.dumps(missing).encode() + b"}"
+    body, encoding = compress(content, encoding)
+    return chart_response(body, format, encoding)
@@ -34,12 +34,51 @@ class PriceHistory(PriceHistoryBase):
     class Config:
         from_attributes = True
 
+class EventMilestone(BaseModel):
+    id: int
+    milestone_type: Optional[str] = None
+    milestone_date: Optional[datetime] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    impact_score: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class PredictionHistory(BaseModel):
+    id: int
+    prediction_date: Optional[datetime] = None
+    predicted_price: Optional[float] = None
+    confidence_lower: Optional[float] = None
+    confidence_upper: Optional[float] = None
+    model_version: Optional[str] = None
+    recommendation: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class SimilarEventEntry(BaseModel):
+    similar_event_id: str
+    similarity_score: Optional[float] = None
+    matching_factors: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class EventDetail(Event):
+    # Filled according to GET /events/{id}?include=...; relations not requested stay empty
     price_history: List[PriceHistory] = []
+    milestones: List[EventMilestone] = []
+    predictions: List[PredictionHistory] = []
+    similar_events: List[SimilarEventEntry] = []
 
 class Prediction(BaseModel):
     prediction: str
     confidence: float
+    model_version: Optional[str] = None  # None when no ML model contributed
+
+class PricePredictionBatchRequest(BaseModel):
+    events: List[Event]
 
 class PriceReportCreate(BaseModel):
     price: float
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine
 import models
+from services.price_rollups import PriceRollups
 from datetime import datetime, timedelta
 import random
 
@@ -87,6 +88,8 @@ def seed_data():
     db.add(m2)
     
     db.commit()
+    # History above was added row by row, bypassing EventStore.record_prices
+    PriceRollups(db).rebuild([event_id])
     print("Database seeded successfully!")
     db.close()
 
@@ -1,119 +1,223 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import models
 import chart_schemas as schemas
-from typing import List, Optional
+from settings import settings
+from services.downsampling import downsample
+from services.price_rollups import PriceRollups
+from services.price_statistics import PERCENTILES, compute_statistics
+from utils.time_range import TimeWindow, parse_time_range, apply_time_window
+from typing import Dict, List, Optional, Tuple
 import math
 
-# Placeholder for ML model imports
-# from ml.price_model import predict_price_for_event
-
 class ChartDataService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_chart_data(self, event_id: str, time_range: str = 'all') -> schemas.EnhancedChartData:
-        event = self._get_event(event_id)
-        if not event:
-            return None # Or raise exception
+    def get_chart_data(self, event_id: str, time_range: str = 'all', max_points: Optional[int] = None) -> schemas.EnhancedChartData:
+        return self.get_chart_data_batch([event_id], time_range, max_points).get(event_id)
+
+    def get_chart_data_batch(self, event_ids: List[str], time_range: str = 'all', max_points: Optional[int] = None) -> Dict[str, schemas.EnhancedChartData]:
+        """
+        Chart payloads for several events in a fixed number of set-based
+        queries (one IN query per part, whatever the number of events).
+        Events that don't exist are left out of the result. With `max_points`,
+        historical prices are downsampled after statistics are computed.
+        """
+        window = parse_time_range(time_range)
+        events = self._get_events(event_ids)
+        if not events:
+            return {}
+        ids = list(events)
 
         # 1. Fetch Historical Data
-        historical_prices = self._get_historical_prices(event_id, time_range)
-        
-        # 2. Fetch/Generate Predictions
-        predictions = self._get_predictions(event)
-
-        # 3. Fetch Milestones
-        milestones = self._get_milestones(event_id)
-
-        # 4. Fetch Similar Events (Placeholder)
-        similar_events = self._get_similar_events(event_id)
-
-        # 5. Calculate Buy Windows
-        buy_windows = self._calculate_buy_windows(event, predictions)
-
-        # 6. Generate Stats
-        statistics = self._generate_statistics(event, historical_prices, predictions)
-
-        return schemas.EnhancedChartData(
-            historical_prices=historical_prices,
-            predictions=predictions,
-            milestones=milestones,
-            similar_events=similar_events,
-            buy_windows=buy_windows,
-            statistics=statistics
-        )
+        history = self._get_historical_prices(ids, window)
+
+        # 2. Fetch Milestones
+        milestones = self._get_milestones(ids)
+
+        # 3. Fetch Similar Events (precomputed)
+        similar_events = self._get_similar_events(ids)
+
+        # 4. Fetch Predictions (stored by the forecast job)
+        forecasts = self._get_predictions(ids)
+
+        charts = {}
+        for event_id, event in events.items():
+            historical_prices, resolution = history[event_id]
+
+            predictions = forecasts[event_id]
+
+            # 5. Calculate Buy Windows
+            buy_windows = self._calculate_buy_windows(event, predictions)
+
+            # 6. Generate Stats
+            statistics = self._generate_statistics(event, historical_prices, predictions)
+
+            # 7. Downsample for plotting, keeping outliers and points next to milestones
+            historical_prices = downsample(historical_prices, max_points, [m.date for m in milestones[event_id] if m.date])
+
+            charts[event_id] = schemas.EnhancedChartData(
+                historical_prices=historical_prices,
+                predictions=predictions,
+                milestones=milestones[event_id],
+                similar_events=similar_events[event_id],
+                buy_windows=buy_windows,
+                statistics=statistics,
+                resolution=resolution
+            )
+        return charts
+
+    def _get_events(self, event_ids: List[str]) -> Dict[str, models.Event]:
+        events = self.db.query(models.Event).filter(models.Event.id.in_(event_ids)).all()
+        by_id = {e.id: e for e in events}
+        # Keep the caller's order
+        return {event_id: by_id[event_id] for event_id in dict.fromkeys(event_ids) if event_id in by_id}
+
+    def _get_historical_prices(self, event_ids: List[str], window: TimeWindow) -> Dict[str, Tuple[List[schemas.PriceDataPoint], str]]:
+        resolutions = self._pick_resolutions(event_ids, window)
+        history: Dict[str, Tuple[List[schemas.PriceDataPoint], str]] = {}
+
+        for resolution in ("hour", "day"):
+            ids = [event_id for event_id in event_ids if resolutions[event_id] == resolution]
+            if not ids:
+                continue
+            for event_id, rollups in PriceRollups(self.db).load_many(ids, resolution, window).items():
+                history[event_id] = ([
+                    schemas.PriceDataPoint(
+                        date=r.bucket_start,
+                        price=r.close,
+                        open=r.open,
+                        high=r.high,
+                        low=r.low,
+                        mean=r.sum / r.count if r.count else None,
+                        count=r.count
+                    ) for r in rollups
+                ], resolution)
+
+        # Raw points for short spans, and for history written before rollups existed
+        raw_ids = [event_id for event_id in event_ids if event_id not in history]
+        raw = self._get_raw_prices(raw_ids, window) if raw_ids else {}
+        for event_id in raw_ids:
+            history[event_id] = (raw.get(event_id, []), "raw")
+        return history
 
-    def _get_event(self, event_id: str):
-        return self.db.query(models.Event).filter(models.Event.id == event_id).first()
-
-    def _get_historical_prices(self, event_id: str, time_range: str) -> List[schemas.PriceDataPoint]:
-        query = self.db.query(models.PriceHistory)\
-            .filter(models.PriceHistory.event_id == event_id)\
-            .order_by(models.PriceHistory.timestamp.asc())
-        
-        # Apply time range filter if needed (omitted for brevity in Phase 1 basic)
-        
-        prices = query.all()
-        return [
-            schemas.PriceDataPoint(
+    def _pick_resolutions(self, event_ids: List[str], window: TimeWindow) -> Dict[str, str]:
+        # Span of the history actually inside the window, per event
+        query = self.db.query(
+            models.PriceHistory.event_id,
+            func.min(models.PriceHistory.timestamp),
+            func.max(models.PriceHistory.timestamp),
+        ).filter(models.PriceHistory.event_id.in_(event_ids))
+        rows = apply_time_window(query, models.PriceHistory.timestamp, window)\
+            .group_by(models.PriceHistory.event_id)\
+            .all()
+
+        resolutions = {event_id: "raw" for event_id in event_ids}
+        for event_id, first, last in rows:
+            if first is None:
+                continue
+            span = last - first
+            if span <= timedelta(hours=settings.CHART_RAW_MAX_SPAN_HOURS):
+                continue
+            resolutions[event_id] = "hour" if span <= timedelta(days=settings.CHART_HOURLY_MAX_SPAN_DAYS) else "day"
+        return resolutions
+
+    def _get_raw_prices(self, event_ids: List[str], window: TimeWindow) -> Dict[str, List[schemas.PriceDataPoint]]:
+        # Only the plotted columns, range-filtered in SQL; served by the (event_id, timestamp) index
+        query = self.db.query(
+            models.PriceHistory.event_id,
+            models.PriceHistory.timestamp,
+            models.PriceHistory.price,
+            models.PriceHistory.confidence_score,
+            models.PriceHistory.data_source,
+            models.PriceHistory.is_outlier,
+        ).filter(models.PriceHistory.event_id.in_(event_ids))
+        query = apply_time_window(query, models.PriceHistory.timestamp, window)
+
+        prices: Dict[str, List[schemas.PriceDataPoint]] = {}
+        for p in query.order_by(models.PriceHistory.event_id, models.PriceHistory.timestamp.asc()):
+            prices.setdefault(p.event_id, []).append(schemas.PriceDataPoint(
                 date=p.timestamp,
                 price=p.price,
                 confidence=p.confidence_score,
                 data_source=p.data_source,
                 is_outlier=p.is_outlier
-            ) for p in prices
-        ]
-
-    def _get_predictions(self, event) -> List[schemas.PredictionDataPoint]:
-        # For Phase 1, return empty or mock predictions to ensure endpoint works
-        # Real ML integration can be uncommented/refined in later phases or now if stable
-        
-        # Mock logic to prove data flow
-        predictions = []
-        
-        # Start predictions from "today" (simulated as Jan 4, 2026 based on seed data)
-        # In a real app, this would be datetime.now()
-        current_date = datetime(2026, 1, 4) 
-        
-        # Base price from last known history or event median
-        base_price = event.price_median or 100.0
-        
-        for i in range(1, 15): # Predict next 14 days
-            future_date = current_date + timedelta(days=i)
-            # Simple mock projection: assume slight increase/fluctuation
-            # We use sin wave to make it look "real"
-            import math
-            fluctuation = math.sin(i * 0.5) * 5 
-            predicted_price = base_price + (i * 0.5) + fluctuation
-            
-            predictions.append(schemas.PredictionDataPoint(
-                date=future_date,
-                predicted_price=predicted_price,
-                confidence_lower=predicted_price * 0.9,
-                confidence_upper=predicted_price * 1.1
             ))
-            
-        return predictions
+        return prices
+
+    def _get_predictions(self, event_ids: List[str]) -> Dict[str, List[schemas.PredictionDataPoint]]:
+        # Forecasts are written in batch by services/price_forecasts.py; never computed per request
+        Prediction = models.PredictionHistory
+        rows = self.db.query(Prediction.event_id, Prediction.prediction_date, Prediction.predicted_price,
+                             Prediction.confidence_lower, Prediction.confidence_upper)\
+            .filter(Prediction.event_id.in_(event_ids), Prediction.prediction_date > datetime.utcnow())\
+            .order_by(Prediction.event_id, Prediction.prediction_date)\
+            .all()
+
+        by_event: Dict[str, List[schemas.PredictionDataPoint]] = {event_id: [] for event_id in event_ids}
+        for event_id, date, price, lower, upper in rows:
+            by_event[event_id].append(schemas.PredictionDataPoint(
+                date=date,
+                predicted_price=price,
+                confidence_lower=lower if lower is not None else price,
+                confidence_upper=upper if upper is not None else price
+            ))
+        return by_event
 
-    def _get_milestones(self, event_id: str) -> List[schemas.Milestone]:
+    def _get_milestones(self, event_ids: List[str]) -> Dict[str, List[schemas.Milestone]]:
         # Fetch from DB table event_milestones
         milestones = self.db.query(models.EventMilestone)\
-            .filter(models.EventMilestone.event_id == event_id)\
+            .filter(models.EventMilestone.event_id.in_(event_ids))\
             .all()
-            
-        return [
-            schemas.Milestone(
+
+        by_event: Dict[str, List[schemas.Milestone]] = {event_id: [] for event_id in event_ids}
+        for m in milestones:
+            by_event[m.event_id].append(schemas.Milestone(
                 date=m.milestone_date,
                 title=m.title,
                 type=m.milestone_type,
                 description=m.description
-            ) for m in milestones
-        ]
+            ))
+        return by_event
+
+    def _get_similar_events(self, event_ids: List[str]) -> Dict[str, List[schemas.SimilarEvent]]:
+        # Precomputed by the similar-events job (services/similarity.py); never computed per request
+        Similar = models.SimilarEventsCache
+        rows = self.db.query(Similar.event_id, Similar.similar_event_id, Similar.similarity_score, models.Event.name)\
+            .join(models.Event, models.Event.id == Similar.similar_event_id)\
+            .filter(Similar.event_id.in_(event_ids), Similar.expires_at > datetime.utcnow())\
+            .order_by(Similar.event_id, Similar.similarity_score.desc())\
+            .all()
 
-    def _get_similar_events(self, event_id: str) -> List[schemas.SimilarEvent]:
-        # Placeholder
-        return []
+        # The job stores a handful of neighbours per event, so trimming here is cheap
+        top: Dict[str, list] = {event_id: [] for event_id in event_ids}
+        for row in rows:
+            if len(top[row.event_id]) < settings.SIMILAR_EVENTS_CHART_LIMIT:
+                top[row.event_id].append(row)
+
+        # Daily closes keep each comparison series bounded
+        price_data: Dict[str, List[schemas.PriceDataPoint]] = {
+            row.similar_event_id: [] for neighbours in top.values() for row in neighbours
+        }
+        if price_data:
+            rollups = self.db.query(models.PriceRollup)\
+                .filter(models.PriceRollup.event_id.in_(list(price_data)), models.PriceRollup.resolution == "day")\
+                .order_by(models.PriceRollup.event_id, models.PriceRollup.bucket_start.asc())\
+                .all()
+            for r in rollups:
+                price_data[r.event_id].append(schemas.PriceDataPoint(date=r.bucket_start, price=r.close))
+
+        return {
+            event_id: [
+                schemas.SimilarEvent(
+                    event_name=row.name,
+                    similarity_score=row.similarity_score,
+                    price_data=price_data[row.similar_event_id]
+                ) for row in neighbours
+            ] for event_id, neighbours in top.items()
+        }
 
     def _calculate_buy_windows(self, event, predictions: List[schemas.PredictionDataPoint]) -> List[schemas.BuyWindow]:
         # Simple logic: if price is dipping in prediction, suggest buy
@@ -130,17 +234,29 @@ class ChartDataService:
 
     def _generate_statistics(self, event, history, predictions) -> schemas.ChartStatistics:
         current_price = event.price_low
-        
-        trend = "stable"
-        if history and len(history) > 1:
-            if history[-1].price > history[0].price:
-                trend = "increasing"
-            else:
-                trend = "decreasing"
-                
+
+        # Trend is the sign of a significant regression slope, not first-vs-last
+        stats = compute_statistics([h.date for h in history], [h.price for h in history])
+        if stats is None:
+            return schemas.ChartStatistics(
+                current_price=current_price,
+                price_trend="stable",
+                recommendation="buy",
+                volatility=0.0
+            )
+
+        trend = stats["trend"]
         return schemas.ChartStatistics(
             current_price=current_price,
             price_trend=trend,
             recommendation="wait" if trend == "decreasing" else "buy",
-            volatility=0.15 # Mock
+            volatility=stats["volatility"],
+            trend_slope_per_day=stats["slope_per_day"],
+            trend_p_value=stats["p_value"],
+            trend_r_squared=stats["r_squared"],
+            rolling_min=stats["rolling_min"],
+            rolling_max=stats["rolling_max"],
+            max_drawdown=stats["max_drawdown"],
+            current_drawdown=stats["current_drawdown"],
+            percentile_bands={f"p{q}": stats[f"p{q}"] for q in PERCENTILES}
         )
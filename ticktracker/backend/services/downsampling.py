@@ -0,0 +1,147 @@
+import numpy as np
+from datetime import datetime
+from typing import Optional, Sequence
+
+from services.price_statistics import to_epoch_seconds
+
+METHODS = ("lttb", "minmax")
+
+# Share of the point budget outliers may take; the rest goes to the price line
+OUTLIER_SHARE = 0.25
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of the series. `x` must be sorted. The first and last points
+    are always kept; each bucket in between contributes the point forming the
+    largest triangle with the previously kept point and the next bucket's mean.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.int64)
+
+    # Bucket edges over the interior points, and every bucket's mean up front
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # The last bucket looks ahead to the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    # Each bucket depends on the point picked in the one before, so buckets are
+    # walked in order; the work inside a bucket is vectorized
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max-preserving downsampling: the lowest and highest point of each of
+    (n_out - 2) // 2 equal-count buckets, plus the endpoints, so at most
+    `n_out` points. Fully vectorized.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        # No room for a min/max pair: the endpoints, then the most extreme point
+        ends = np.array([0, n - 1][:max(n_out, 0)], dtype=np.int64)
+        if n_out < 3:
+            return ends
+        extreme = int(np.argmax(np.abs(y - y.mean())))
+        return np.unique(np.append(ends, extreme))
+    # Equal-width buckets laid out as rows, the last one padded
+    width = -(-n // ((n_out - 2) // 2))
+    n_buckets = -(-n // width)
+    padded = np.full(n_buckets * width, np.inf)
+    padded[:n] = y
+    low = padded.reshape(n_buckets, width).argmin(axis=1)
+    padded[n:] = -np.inf
+    high = padded.reshape(n_buckets, width).argmax(axis=1)
+    offsets = np.arange(n_buckets) * width
+    return np.unique(np.concatenate([[0, n - 1], offsets + low, offsets + high]))
+
+
+def _reduce(x: np.ndarray, y: np.ndarray, n_out: int, method: str) -> np.ndarray:
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    return minmax(x, y, n_out) if method == "minmax" else lttb(x, y, n_out)
+
+
+def downsample_indices(
+    dates: Sequence[datetime],
+    prices: Sequence[float],
+    is_outlier: Sequence[bool],
+    max_points: int,
+    anchor_dates: Sequence[datetime] = (),
+    method: str = "lttb",
+) -> np.ndarray:
+    """
+    Sorted indices of the points to plot out of a time-ordered series.
+
+    Never returns more than `max_points` indices. Points either side of each
+    anchor date (e.g. milestones) and the endpoints are kept first (thinned
+    evenly if they alone exceed the budget). Outliers are kept as a separate
+    layer, themselves downsampled if they'd take more than OUTLIER_SHARE of
+    the budget, and what is left goes to the non-outlier price line.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of: {', '.join(METHODS)}")
+    n = len(prices)
+    if n <= max_points:
+        return np.arange(n)
+
+    x = to_epoch_seconds(dates)
+    y = np.asarray(prices, dtype=np.float64)
+    outlier = np.asarray(is_outlier, dtype=bool)
+
+    keep = [np.array([0, n - 1])]
+    if len(anchor_dates):
+        pos = np.searchsorted(x, to_epoch_seconds(anchor_dates))
+        keep.append(np.clip(np.concatenate([pos - 1, pos]), 0, n - 1))
+    anchors = np.unique(np.concatenate(keep))
+    if len(anchors) > max_points:
+        anchors = anchors[np.linspace(0, len(anchors) - 1, max_points).round().astype(np.int64)]
+    # Each layer only gets what the ones before it left over, so the total stays within max_points
+    remaining = max_points - len(anchors)
+
+    outliers = np.flatnonzero(outlier)
+    outlier_budget = min(int(max_points * OUTLIER_SHARE), remaining)
+    outliers = outliers[_reduce(x[outliers], y[outliers], outlier_budget, method)]
+    remaining -= len(outliers)
+
+    line = np.flatnonzero(~outlier)
+    line = line[_reduce(x[line], y[line], remaining, method)]
+
+    return np.unique(np.concatenate([anchors, outliers, line]))
+
+
+def downsample(points: Sequence, max_points: Optional[int], anchor_dates: Sequence[datetime] = (),
+               method: str = "lttb", date_attr: str = "date", price_attr: str = "price") -> list:
+    """
+    `downsample_indices` for a list of point objects (chart PriceDataPoints
+    or PriceHistory rows); returns the kept points in order.
+    """
+    if not max_points or len(points) <= max_points:
+        return list(points)
+    keep = downsample_indices(
+        [getattr(p, date_attr) for p in points],
+        [getattr(p, price_attr) for p in points],
+        [bool(p.is_outlier) for p in points],
+        max_points,
+        anchor_dates,
+        method,
+    )
+    return [points[i] for i in keep]
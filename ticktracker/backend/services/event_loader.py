@@ -0,0 +1,88 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Dict, List, Optional
+import models
+from settings import settings
+
+# Relation name -> (model, ordering that picks which rows are kept, ascending output order)
+# Each relation is capped per event so a long-tracked event can't blow up a response.
+RELATIONS = {
+    "price_history": (models.PriceHistory, models.PriceHistory.timestamp.desc(), models.PriceHistory.timestamp),
+    "milestones": (models.EventMilestone, models.EventMilestone.milestone_date.asc(), models.EventMilestone.milestone_date),
+    "predictions": (models.PredictionHistory, models.PredictionHistory.prediction_date.desc(), models.PredictionHistory.prediction_date),
+    "similar_events": (models.SimilarEventsCache, models.SimilarEventsCache.similarity_score.desc(), None),
+}
+
+DEFAULT_INCLUDE = ["price_history"]
+
+
+def parse_include(include: Optional[str]) -> List[str]:
+    """
+    Parses a comma-separated include= value. None means the default set;
+    an empty value means no relations. Raises ValueError for unknown names.
+    """
+    if include is None:
+        return list(DEFAULT_INCLUDE)
+    names = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in names if name not in RELATIONS]
+    if unknown:
+        raise ValueError(f"Unknown include '{', '.join(unknown)}'. Valid: {', '.join(RELATIONS)}")
+    return list(dict.fromkeys(names))
+
+
+def relation_limit(name: str) -> int:
+    if name == "price_history":
+        return settings.EVENT_DETAIL_HISTORY_LIMIT
+    return settings.EVENT_DETAIL_RELATION_LIMIT
+
+
+class EventLoader:
+    """
+    Loads requested relations for one or many events with one query per
+    relation (not per event), keeping the top-N rows per event, and attaches
+    them as already-loaded collections so serialization never lazy-loads.
+    Relations that weren't requested are set to empty.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, event_id: str, include: List[str]) -> Optional[models.Event]:
+        event = self.db.get(models.Event, event_id)
+        if event is not None:
+            self.load([event], include)
+        return event
+
+    def load(self, events: List[models.Event], include: List[str]):
+        if not events:
+            return
+        by_id: Dict[str, models.Event] = {event.id: event for event in events}
+        for name in RELATIONS:
+            rows_by_event: Dict[str, list] = {event_id: [] for event_id in by_id}
+            if name in include:
+                for row in self._top_rows(name, list(by_id)):
+                    rows_by_event[row.event_id].append(row)
+            for event_id, rows in rows_by_event.items():
+                set_committed_value(by_id[event_id], name, rows)
+
+    def _top_rows(self, name: str, event_ids: List[str]) -> list:
+        model, keep_order, output_order = RELATIONS[name]
+        limit = relation_limit(name)
+
+        if len(event_ids) == 1:
+            stmt = select(model).where(model.event_id == event_ids[0]).order_by(keep_order).limit(limit)
+        else:
+            # Top-N per event in one statement
+            ranked = select(
+                model.id,
+                func.row_number().over(partition_by=model.event_id, order_by=keep_order).label("rank"),
+            ).where(model.event_id.in_(event_ids)).subquery()
+            stmt = select(model).join(ranked, ranked.c.id == model.id).where(ranked.c.rank <= limit)\
+                .order_by(model.event_id, keep_order)
+
+        rows = list(self.db.execute(stmt).scalars())
+        if output_order is not None:
+            key = output_order.key
+            rows.sort(key=lambda row: (getattr(row, key) is None, getattr(row, key)))
+        return rows
@@ -0,0 +1,149 @@
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+import models
+from settings import settings
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# SQLite: FTS5 table kept in sync with `events` by triggers. events.id is a
+# string and the implicit rowid of `events` may be renumbered by VACUUM, so
+# the index is keyed by events_fts_ids instead: its INTEGER PRIMARY KEY is a
+# stable rowid per event id, and events_fts stores its own copy of the text.
+SQLITE_FTS_DDL = [
+    "CREATE TABLE IF NOT EXISTS events_fts_ids (rowid INTEGER PRIMARY KEY, event_id TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(name, venue, city)",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT OR IGNORE INTO events_fts_ids(event_id) VALUES (new.id); "
+    "INSERT INTO events_fts(rowid, name, venue, city) "
+    "VALUES ((SELECT rowid FROM events_fts_ids WHERE event_id = new.id), new.name, new.venue, new.city); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_fts WHERE rowid = (SELECT rowid FROM events_fts_ids WHERE event_id = old.id); "
+    "DELETE FROM events_fts_ids WHERE event_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF name, venue, city ON events BEGIN "
+    "DELETE FROM events_fts WHERE rowid = (SELECT rowid FROM events_fts_ids WHERE event_id = old.id); "
+    "INSERT INTO events_fts(rowid, name, venue, city) "
+    "VALUES ((SELECT rowid FROM events_fts_ids WHERE event_id = new.id), new.name, new.venue, new.city); END",
+]
+
+# Index events that were stored before the FTS tables existed
+SQLITE_FTS_BACKFILL = [
+    "INSERT OR IGNORE INTO events_fts_ids(event_id) SELECT id FROM events",
+    "INSERT INTO events_fts(rowid, name, venue, city) "
+    "SELECT ids.rowid, e.name, e.venue, e.city FROM events e JOIN events_fts_ids ids ON ids.event_id = e.id",
+]
+
+# The first version indexed events by their implicit rowid (content='events')
+SQLITE_FTS_DROP_LEGACY = [
+    "DROP TRIGGER IF EXISTS events_fts_ai",
+    "DROP TRIGGER IF EXISTS events_fts_ad",
+    "DROP TRIGGER IF EXISTS events_fts_au",
+    "DROP TABLE IF EXISTS events_fts",
+]
+
+# Postgres: expression GIN index over the same three columns
+POSTGRES_TSVECTOR = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(venue, '') || ' ' || coalesce(city, ''))"
+POSTGRES_FTS_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_events_search ON events USING GIN ({POSTGRES_TSVECTOR})",
+]
+
+
+def ensure_search_index(engine: Engine):
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts_ids'"
+            )).first()
+            if not exists:
+                for ddl in SQLITE_FTS_DROP_LEGACY:
+                    conn.execute(text(ddl))
+            for ddl in SQLITE_FTS_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                for ddl in SQLITE_FTS_BACKFILL:
+                    conn.execute(text(ddl))
+        elif dialect == "postgresql":
+            for ddl in POSTGRES_FTS_DDL:
+                conn.execute(text(ddl))
+
+
+def _tokens(query: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(query.lower()) if query else []
+
+
+class LocalSearchResult(NamedTuple):
+    events: List[models.Event]
+    fresh: bool
+
+
+class EventSearch:
+    """
+    Searches the events we already track. Text matching uses the full-text
+    index; date and price filters run in SQL.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, query: Optional[str], location: Optional[str],
+               start_date: Optional[datetime], end_date: Optional[datetime],
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               limit: Optional[int] = None) -> LocalSearchResult:
+        limit = limit or settings.LOCAL_SEARCH_LIMIT
+        q = self.db.query(models.Event)
+
+        tokens = _tokens(query)
+        if tokens:
+            q = self._match(q, tokens)
+        elif query and query.strip():
+            # Nothing the index can match (e.g. only punctuation or non-Latin
+            # text): dropping the filter would return every upcoming event,
+            # so let the providers answer instead
+            return LocalSearchResult([], False)
+
+        if location:
+            q = q.filter(models.Event.city.ilike(f"{location.strip()}%"))
+
+        # Same defaults as the upstream search: upcoming events only
+        q = q.filter(models.Event.date >= (start_date or datetime.utcnow()))
+        if end_date:
+            q = q.filter(models.Event.date <= end_date)
+
+        # Unknown prices pass, like the upstream price filter
+        if min_price is not None:
+            q = q.filter((models.Event.price_low == None) | (models.Event.price_low >= min_price))
+        if max_price is not None:
+            q = q.filter((models.Event.price_low == None) | (models.Event.price_low <= max_price))
+
+        events = q.order_by(models.Event.date.asc()).limit(limit).all()
+        return LocalSearchResult(events, self._is_fresh(events))
+
+    def _match(self, q, tokens: List[str]):
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            # Prefix match on every token, e.g. "taylor"* "swift"*
+            match = " ".join(f'"{token}"*' for token in tokens)
+            return q.filter(text(
+                "events.id IN (SELECT ids.event_id FROM events_fts_ids ids "
+                "WHERE ids.rowid IN (SELECT rowid FROM events_fts WHERE events_fts MATCH :match))"
+            ).bindparams(match=match))
+        if dialect == "postgresql":
+            tsquery = " & ".join(f"{token}:*" for token in tokens)
+            return q.filter(text(
+                f"{POSTGRES_TSVECTOR} @@ to_tsquery('simple', :tsquery)"
+            ).bindparams(tsquery=tsquery))
+
+        # No full-text support: fall back to substring matching on the name
+        for token in tokens:
+            q = q.filter(models.Event.name.ilike(f"%{token}%"))
+        return q
+
+    def _is_fresh(self, events: List[models.Event]) -> bool:
+        if len(events) < settings.LOCAL_SEARCH_MIN_RESULTS:
+            return False
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.LOCAL_SEARCH_MAX_AGE_MINUTES)
+        return all(e.updated_at is not None and e.updated_at >= cutoff for e in events)
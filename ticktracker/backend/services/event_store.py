@@ -0,0 +1,194 @@
+from sqlalchemy import case, delete, insert, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import models
+import schemas
+from services.price_rollups import PriceRollups
+
+# Keep statements well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+ESTIMATE_MARKER = "(Est.)"
+
+# Columns refreshed when a search returns an event we already store
+UPDATABLE_COLUMNS = ["name", "venue", "city", "date", "timezone", "url", "source", "price_low", "price_high", "updated_at"]
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def is_estimated(source: Optional[str]) -> bool:
+    return bool(source) and source.endswith(ESTIMATE_MARKER)
+
+
+class EventStore:
+    """
+    Set-based persistence for events and their price observations.
+    Every write costs a fixed number of statements per chunk, not per event.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_events(self, events: List[schemas.Event]) -> int:
+        """
+        Inserts new events and refreshes changed fields on existing ones.
+        A PriceHistory row is appended for every event whose real (non-estimated)
+        price is new or different from what we had. Returns the number of
+        price observations recorded.
+        """
+        # Last occurrence wins if a batch repeats an id
+        rows_by_id = {event.id: event.model_dump() for event in events}
+        if not rows_by_id:
+            return 0
+        rows = list(rows_by_id.values())
+        now = datetime.utcnow()
+        for row in rows:
+            row["updated_at"] = now
+
+        existing = self._existing_prices(list(rows_by_id))
+
+        dialect = self.db.get_bind().dialect.name
+        for chunk in _chunks(rows):
+            if dialect in ("sqlite", "postgresql"):
+                self._upsert_native(chunk, dialect)
+            else:
+                self._upsert_generic(chunk, existing)
+
+        observations = []
+        for row in rows:
+            if row["price_low"] is None or is_estimated(row["source"]):
+                continue
+            if existing.get(row["id"]) == (row["price_low"], row["price_high"]):
+                continue
+            observations.append({
+                "event_id": row["id"],
+                "price": row["price_low"],
+                "timestamp": now,
+                "data_source": "api",
+                "confidence_score": 1.0,
+                "is_outlier": False,
+            })
+        self.record_prices(observations)
+
+        self.db.commit()
+        return len(observations)
+
+    def apply_price_updates(self, updates: List[Dict]) -> int:
+        """
+        Writes a batch of re-priced events: refreshes the stored price on each
+        event and appends one PriceHistory observation per update.
+        Each update has event_id, price_low, price_high, source, data_source
+        and timestamp.
+        """
+        if not updates:
+            return 0
+        event_rows = [{
+            "id": u["event_id"],
+            "price_low": u["price_low"],
+            "price_high": u["price_high"],
+            "source": u["source"],
+            "updated_at": u["timestamp"],
+        } for u in updates]
+        for chunk in _chunks(event_rows):
+            self.db.execute(update(models.Event), chunk)
+
+        self.record_prices([{
+            "event_id": u["event_id"],
+            "price": u["price_low"],
+            "timestamp": u["timestamp"],
+            "data_source": u["data_source"],
+            "confidence_score": 1.0,
+            "is_outlier": False,
+        } for u in updates])
+        self.db.commit()
+        return len(updates)
+
+    def record_price_checks(self, checks: List[Dict]):
+        """
+        Upserts the scheduler's last re-pricing attempt per event
+        (event_id, checked_at, failures). The caller commits.
+        """
+        if not checks:
+            return
+        dialect = self.db.get_bind().dialect.name
+        table = models.PriceCheck.__table__
+        for chunk in _chunks(checks):
+            if dialect in ("sqlite", "postgresql"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                stmt = dialect_insert(table).values(chunk)
+                self.db.execute(stmt.on_conflict_do_update(
+                    index_elements=[table.c.event_id],
+                    set_={"checked_at": stmt.excluded.checked_at, "failures": stmt.excluded.failures},
+                ))
+            else:
+                self.db.execute(delete(table).where(table.c.event_id.in_([c["event_id"] for c in chunk])))
+                self.db.execute(insert(table), chunk)
+
+    def record_prices(self, observations: List[Dict]):
+        """
+        Appends PriceHistory rows in bulk. All price observations go through
+        here so that derived data can be kept in step with new prices.
+        The caller commits.
+        """
+        if not observations:
+            return
+        for chunk in _chunks(observations):
+            self.db.execute(insert(models.PriceHistory), chunk)
+        PriceRollups(self.db).apply(observations)
+
+    def _existing_prices(self, ids: List[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        existing = {}
+        for chunk in _chunks(ids):
+            rows = self.db.query(models.Event.id, models.Event.price_low, models.Event.price_high, models.Event.source)\
+                .filter(models.Event.id.in_(chunk))\
+                .all()
+            for event_id, price_low, price_high, source in rows:
+                # Estimates aren't observations, so a real price replacing one counts as a change
+                existing[event_id] = (None, None) if is_estimated(source) else (price_low, price_high)
+        return existing
+
+    def _upsert_native(self, rows: List[Dict], dialect: str):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        table = models.Event.__table__
+        stmt = dialect_insert(table).values(rows)
+        excluded = stmt.excluded
+
+        # Don't let a heuristic estimate overwrite a real price we already have
+        keep_existing = excluded.source.like(f"%{ESTIMATE_MARKER}") & table.c.price_low.isnot(None) \
+            & table.c.source.notlike(f"%{ESTIMATE_MARKER}")
+
+        set_ = {column: excluded[column] for column in UPDATABLE_COLUMNS}
+        for column in ("price_low", "price_high", "source"):
+            set_[column] = case((keep_existing, table.c[column]), else_=excluded[column])
+
+        self.db.execute(stmt.on_conflict_do_update(index_elements=[table.c.id], set_=set_))
+
+    def _upsert_generic(self, rows: List[Dict], existing: Dict):
+        # Fallback for other databases: one executemany insert plus one bulk update
+        new_rows = [row for row in rows if row["id"] not in existing]
+        changed_rows = []
+        for row in rows:
+            if row["id"] not in existing:
+                continue
+            values = {column: row[column] for column in UPDATABLE_COLUMNS}
+            values["id"] = row["id"]
+            if is_estimated(row["source"]) and existing[row["id"]][0] is not None:
+                for column in ("price_low", "price_high", "source"):
+                    values.pop(column)
+            changed_rows.append(values)
+
+        if new_rows:
+            self.db.execute(insert(models.Event), new_rows)
+        if changed_rows:
+            self.db.execute(update(models.Event), changed_rows)
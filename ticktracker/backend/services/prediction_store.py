@@ -0,0 +1,144 @@
+import json
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import models
+from ml.price_model import HEURISTIC_VERSION, get_live_model, predict_prices_for_events
+from utils.chart_cache import SKIP_INVALIDATION
+from utils.prediction_cache import PredictionKey, prediction_cache
+
+
+def observation_day(now: datetime) -> datetime:
+    """
+    Midnight UTC of `now`'s day (naive, as stored in PredictionHistory).
+    """
+    return now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def price_key(price: Optional[float]) -> str:
+    """
+    PredictionHistory.input_price_key: the price a prediction was made from,
+    in a form a unique index can compare ("" when the event has no price).
+    """
+    return "" if price is None else repr(float(price))
+
+
+def prediction_inputs(latest_price: Optional[float], confidence: float, source: str) -> str:
+    """
+    PredictionHistory.features_used for a stored prediction: the price it was
+    made from and the fields the row has no column for.
+    """
+    return json.dumps({"latest_price": latest_price, "confidence": confidence, "source": source})
+
+
+class PredictionStore:
+    """
+    Blended price predictions for stored events, made as of the start of the
+    current UTC day so they can be reused all day. Looked up by
+    (event_id, model_version, observation day, latest price) in:
+
+    1. the in-process LRU (utils/prediction_cache.py),
+    2. PredictionHistory: the row for that day written by an earlier miss
+       (in any worker) or by the forecast job the day before,
+    3. the model; results are written back to both tiers.
+
+    Results are the prediction dicts of ml.price_model without heuristic_details.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_predictions(self, events: Sequence, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        events = list(events)
+        day = observation_day(now or datetime.now(timezone.utc))
+        live = get_live_model()
+        version = live.version if live else HEURISTIC_VERSION
+        keys: List[PredictionKey] = [(e.id, version, day.date().isoformat(), e.price_low) for e in events]
+
+        results = [prediction_cache.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            stored = self._load_stored([events[i] for i in missing], day, version)
+            for i in missing:
+                if events[i].id in stored:
+                    results[i] = stored[events[i].id]
+                    prediction_cache.set(keys[i], results[i])
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = predict_prices_for_events([events[i] for i in missing], day.replace(tzinfo=timezone.utc))
+            self._save([events[i] for i in missing], computed, day)
+            for i, prediction in zip(missing, computed):
+                del prediction["heuristic_details"]
+                results[i] = prediction
+                # Filed under the version that actually made it (a reload may have landed meanwhile)
+                key = (keys[i][0], prediction["model_version"] or HEURISTIC_VERSION, keys[i][2], keys[i][3])
+                prediction_cache.set(key, prediction)
+        return results
+
+    def _load_stored(self, events: List, day: datetime, version: str) -> Dict[str, Dict[str, Any]]:
+        prices = {e.id: e.price_low for e in events}
+        Prediction = models.PredictionHistory
+        rows = self.db.query(Prediction.event_id, Prediction.predicted_price, Prediction.confidence_lower,
+                             Prediction.confidence_upper, Prediction.recommendation, Prediction.features_used)\
+            .filter(tuple_(Prediction.event_id, Prediction.input_price_key).in_(
+                        [(event_id, price_key(price)) for event_id, price in prices.items()]),
+                    Prediction.prediction_date == day, Prediction.model_version == version)\
+            .all()
+
+        stored: Dict[str, Dict[str, Any]] = {}
+        for event_id, price, lower, upper, recommendation, features_used in rows:
+            try:
+                inputs = json.loads(features_used)
+            except (TypeError, ValueError):
+                continue
+            stored[event_id] = {
+                "event_id": event_id,
+                "pred_low_price": lower,
+                "pred_high_price": upper,
+                "pred_mid_price": price,
+                "confidence": inputs["confidence"],
+                "source": inputs["source"],
+                "model_version": None if version == HEURISTIC_VERSION else version,
+                "buy_recommendation": recommendation,
+            }
+        return stored
+
+    def _save(self, events: List, predictions: List[Dict[str, Any]], day: datetime):
+        # Written with SKIP_INVALIDATION: a row for today is history to the
+        # chart (it only plots future dates), so chart caches stay valid.
+        # Concurrent misses (other threads or workers) compute the same rows;
+        # the first one written wins and the rest are dropped.
+        rows = [{
+            "event_id": event.id,
+            "prediction_date": day,
+            "predicted_price": p["pred_mid_price"],
+            "confidence_lower": p["pred_low_price"],
+            "confidence_upper": p["pred_high_price"],
+            "model_version": p["model_version"] or HEURISTIC_VERSION,
+            "features_used": prediction_inputs(event.price_low, p["confidence"], p["source"]),
+            "input_price_key": price_key(event.price_low),
+            "recommendation": p["buy_recommendation"],
+            "created_at": datetime.utcnow(),
+        } for event, p in zip(events, predictions)]
+
+        table = models.PredictionHistory.__table__
+        key_columns = [table.c.event_id, table.c.prediction_date, table.c.model_version, table.c.input_price_key]
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            self.db.execute(dialect_insert(table).on_conflict_do_nothing(index_elements=key_columns), rows,
+                            execution_options=SKIP_INVALIDATION)
+        else:
+            # Fallback for other databases: skip the rows already stored
+            existing = set(self.db.query(*key_columns).filter(
+                tuple_(*key_columns).in_([tuple(row[c.name] for c in key_columns) for row in rows])).all())
+            rows = [row for row in rows if tuple(row[c.name] for c in key_columns) not in existing]
+            if rows:
+                self.db.execute(insert(table), rows, execution_options=SKIP_INVALIDATION)
+        self.db.commit()
@@ -0,0 +1,68 @@
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import database
+import models
+from settings import settings
+from ml.price_model import HEURISTIC_VERSION, forecast_prices_for_events, get_live_model
+from services.prediction_store import prediction_inputs, price_key
+
+
+def refresh_forecasts(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Batch job: rewrites the stored forecast (PredictionHistory rows dated
+    after `now`) of every upcoming event whose forecast is missing, older
+    than PREDICTION_FORECAST_TTL_SECONDS or made by another model version.
+    Rows for past dates are kept as the record of what was predicted; the
+    one for today is also what services/prediction_store.py serves until
+    the event's price changes.
+    Commits and returns the number of events refreshed.
+    """
+    now = now or datetime.utcnow()
+    live = get_live_model()
+    version = live.version if live else HEURISTIC_VERSION
+    stale_before = now - timedelta(seconds=settings.PREDICTION_FORECAST_TTL_SECONDS)
+
+    Prediction = models.PredictionHistory
+    fresh = {event_id for (event_id,) in db.query(Prediction.event_id)
+             .filter(Prediction.prediction_date > now, Prediction.created_at >= stale_before, Prediction.model_version == version)
+             .distinct()}
+    events = [e for e in db.query(models.Event).filter(models.Event.date > now).all() if e.id not in fresh]
+    if not events:
+        return 0
+
+    for start in range(0, len(events), settings.PREDICTION_FORECAST_BATCH_SIZE):
+        chunk = events[start:start + settings.PREDICTION_FORECAST_BATCH_SIZE]
+        ids = [e.id for e in chunk]
+        prices = {e.id: e.price_low for e in chunk}
+        forecasts = forecast_prices_for_events(chunk, settings.PREDICTION_HORIZON_DAYS, now.replace(tzinfo=timezone.utc))
+        db.execute(delete(Prediction).where(Prediction.event_id.in_(ids), Prediction.prediction_date > now))
+        rows = [{
+            "event_id": event_id,
+            "prediction_date": p["prediction_date"],
+            "predicted_price": p["pred_mid_price"],
+            "confidence_lower": p["pred_low_price"],
+            "confidence_upper": p["pred_high_price"],
+            "model_version": p["model_version"] or HEURISTIC_VERSION,
+            "features_used": prediction_inputs(prices[event_id], p["confidence"], p["source"]),
+            "input_price_key": price_key(prices[event_id]),
+            "recommendation": p["buy_recommendation"],
+            "created_at": now,
+        } for event_id in ids for p in forecasts[event_id]]
+        if rows:
+            db.execute(insert(Prediction), rows)
+        db.commit()
+
+    print(f"Price forecasts: refreshed {len(events)} events with model {version}")
+    return len(events)
+
+
+if __name__ == "__main__":
+    import migrations
+    migrations.run_migrations(database.engine)
+    session = database.SessionLocal()
+    try:
+        refresh_forecasts(session)
+    finally:
+        session.close()
@@ -0,0 +1,183 @@
+from sqlalchemy import case, delete, insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import models
+from utils.time_range import TimeWindow
+
+# Pre-aggregated resolutions kept in price_rollups
+RESOLUTIONS = ("hour", "day")
+
+# Rows per executed statement
+CHUNK_SIZE = 50
+
+RollupKey = Tuple[str, str, datetime]
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution '{resolution}'")
+
+
+def bucket_width(resolution: str) -> timedelta:
+    return timedelta(hours=1) if resolution == "hour" else timedelta(days=1)
+
+
+def aggregate(observations: Iterable[Dict]) -> Dict[RollupKey, Dict]:
+    """
+    Folds observations (event_id, price, timestamp, is_outlier) into one
+    OHLC row per (event_id, resolution, bucket). Outliers are left out.
+    """
+    rollups: Dict[RollupKey, Dict] = {}
+    for obs in observations:
+        if obs.get("is_outlier") or obs.get("price") is None:
+            continue
+        price, ts = obs["price"], obs["timestamp"]
+        for resolution in RESOLUTIONS:
+            key = (obs["event_id"], resolution, bucket_start(ts, resolution))
+            row = rollups.get(key)
+            if row is None:
+                rollups[key] = {
+                    "event_id": key[0], "resolution": resolution, "bucket_start": key[2],
+                    "open": price, "high": price, "low": price, "close": price,
+                    "count": 1, "sum": price, "first_at": ts, "last_at": ts,
+                }
+                continue
+            _merge(row, {"open": price, "high": price, "low": price, "close": price,
+                         "count": 1, "sum": price, "first_at": ts, "last_at": ts})
+    return rollups
+
+
+def _merge(row: Dict, other: Dict):
+    if other["first_at"] < row["first_at"]:
+        row["open"], row["first_at"] = other["open"], other["first_at"]
+    if other["last_at"] >= row["last_at"]:
+        row["close"], row["last_at"] = other["close"], other["last_at"]
+    row["high"] = max(row["high"], other["high"])
+    row["low"] = min(row["low"], other["low"])
+    row["count"] += other["count"]
+    row["sum"] += other["sum"]
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class PriceRollups:
+    """
+    Hourly and daily OHLC rollups of PriceHistory per event. Rows are merged
+    in as observations are recorded (see EventStore.record_prices), so chart
+    reads cost one indexed range scan over at most one row per bucket.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, observations: List[Dict]):
+        """
+        Merges new observations into their buckets. The caller commits.
+        """
+        rows = list(aggregate(observations).values())
+        if not rows:
+            return
+        dialect = self.db.get_bind().dialect.name
+        for chunk in _chunks(rows):
+            if dialect in ("sqlite", "postgresql"):
+                self._upsert_native(chunk, dialect)
+            else:
+                self._upsert_generic(chunk)
+
+    def rebuild(self, event_ids: Optional[List[str]] = None) -> int:
+        """
+        Recomputes rollups from PriceHistory, for the given events or for all
+        of them. Used to backfill and after writes that bypass record_prices.
+        Commits and returns the number of rollup rows written.
+        """
+        Rollup = models.PriceRollup
+        History = models.PriceHistory
+
+        stmt = delete(Rollup)
+        query = self.db.query(History.event_id, History.price, History.timestamp, History.is_outlier)
+        if event_ids is not None:
+            stmt = stmt.where(Rollup.event_id.in_(event_ids))
+            query = query.filter(History.event_id.in_(event_ids))
+        self.db.execute(stmt)
+
+        observations = (
+            {"event_id": event_id, "price": price, "timestamp": ts, "is_outlier": is_outlier}
+            for event_id, price, ts, is_outlier in query.filter(History.timestamp.isnot(None)).yield_per(5000)
+        )
+        rows = list(aggregate(observations).values())
+        for chunk in _chunks(rows):
+            self.db.execute(insert(Rollup), chunk)
+        self.db.commit()
+        return len(rows)
+
+    def load(self, event_id: str, resolution: str, window: TimeWindow) -> List[models.PriceRollup]:
+        return self.load_many([event_id], resolution, window).get(event_id, [])
+
+    def load_many(self, event_ids: List[str], resolution: str, window: TimeWindow) -> Dict[str, List[models.PriceRollup]]:
+        """
+        Rollups inside the window for several events in one query, keyed by
+        event; events without rollups are absent.
+        """
+        Rollup = models.PriceRollup
+        query = self.db.query(Rollup)\
+            .filter(Rollup.event_id.in_(event_ids), Rollup.resolution == resolution)
+        if window.start is not None:
+            # Include the bucket the window starts in
+            query = query.filter(Rollup.bucket_start >= bucket_start(window.start, resolution))
+        if window.end is not None:
+            query = query.filter(Rollup.bucket_start < window.end)
+
+        by_event: Dict[str, List[models.PriceRollup]] = {}
+        for rollup in query.order_by(Rollup.event_id, Rollup.bucket_start.asc()):
+            by_event.setdefault(rollup.event_id, []).append(rollup)
+        return by_event
+
+    def _upsert_native(self, rows: List[Dict], dialect: str):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        table = models.PriceRollup.__table__
+        # Rows as executemany parameters, so the chart cache's write hook sees their events
+        stmt = dialect_insert(table)
+        new = stmt.excluded
+        c = table.c
+        set_ = {
+            "open": case((new.first_at < c.first_at, new.open), else_=c.open),
+            "first_at": case((new.first_at < c.first_at, new.first_at), else_=c.first_at),
+            "close": case((new.last_at >= c.last_at, new.close), else_=c.close),
+            "last_at": case((new.last_at >= c.last_at, new.last_at), else_=c.last_at),
+            "high": case((new.high > c.high, new.high), else_=c.high),
+            "low": case((new.low < c.low, new.low), else_=c.low),
+            "count": c.count + new.count,
+            "sum": c.sum + new.sum,
+        }
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[c.event_id, c.resolution, c.bucket_start], set_=set_
+        ), rows)
+
+    def _upsert_generic(self, rows: List[Dict]):
+        # Fallback for other databases: merge with the stored buckets in Python
+        Rollup = models.PriceRollup
+        for row in rows:
+            existing = self.db.query(Rollup).filter(
+                Rollup.event_id == row["event_id"],
+                Rollup.resolution == row["resolution"],
+                Rollup.bucket_start == row["bucket_start"],
+            ).first()
+            if existing is None:
+                self.db.add(Rollup(**row))
+                continue
+            merged = {column: getattr(existing, column) for column in row}
+            _merge(merged, row)
+            for column, value in merged.items():
+                setattr(existing, column, value)
+        self.db.flush()
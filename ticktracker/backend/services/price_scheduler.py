@@ -0,0 +1,303 @@
+import asyncio
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import database
+import models
+from settings import settings
+from services.event_store import EventStore, ESTIMATE_MARKER
+from services.price_forecasts import refresh_forecasts
+from services.similarity import refresh_similar_events
+from utils import fetch_events, scraper
+from utils.circuit_breaker import CircuitBreaker
+
+# Refresh cadence by days to event: (max_days_out, refresh interval).
+# Prices move fastest right before the event, so those are re-priced most often.
+REFRESH_TIERS = [
+    (2, timedelta(minutes=30)),
+    (7, timedelta(hours=2)),
+    (30, timedelta(hours=6)),
+    (None, timedelta(hours=24)),
+]
+
+# Event id prefix -> provider that can re-price it
+ID_PREFIXES = {"tm_": "ticketmaster", "sg_": "seatgeek"}
+
+
+def refresh_interval(event_date: datetime, now: datetime) -> timedelta:
+    days_out = (event_date.replace(tzinfo=None) - now).days
+    for max_days, interval in REFRESH_TIERS:
+        if max_days is None or days_out <= max_days:
+            return interval
+    return REFRESH_TIERS[-1][1]
+
+
+def retry_interval(event_date: datetime, now: datetime, failures: int) -> timedelta:
+    """
+    refresh_interval, doubled for each attempt in a row that found no price
+    (capped at PRICE_SCHEDULER_MAX_BACKOFF_SECONDS).
+    """
+    interval = refresh_interval(event_date, now)
+    if not failures:
+        return interval
+    cap = max(interval, timedelta(seconds=settings.PRICE_SCHEDULER_MAX_BACKOFF_SECONDS))
+    return min(interval * 2 ** min(failures, 16), cap)
+
+
+def _provider_for(event_id: str) -> Optional[str]:
+    for prefix, provider in ID_PREFIXES.items():
+        if event_id.startswith(prefix):
+            return provider
+    return None
+
+
+class PriceIngestionScheduler:
+    """
+    Periodically re-prices tracked (upcoming) events through the provider
+    fetchers and the scraper, and records the results in PriceHistory.
+    Between passes it refreshes similar events and stored price forecasts
+    when they're due.
+
+    Runs inside the API process (started from the FastAPI lifespan when
+    PRICE_SCHEDULER_ENABLED is set) or standalone:
+        python -m services.price_scheduler
+    """
+
+    def __init__(self, session_factory=database.SessionLocal):
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._global_limit = asyncio.Semaphore(settings.PRICE_SCHEDULER_MAX_CONCURRENCY)
+        self._provider_limits = {
+            provider: asyncio.Semaphore(settings.PRICE_SCHEDULER_PROVIDER_CONCURRENCY)
+            for provider in list(ID_PREFIXES.values()) + ["scraper"]
+        }
+        self.runs = 0
+        self.observations = 0
+        self._similar_refreshed_at: Optional[datetime] = None
+        self._forecasts_refreshed_at: Optional[datetime] = None
+
+    # --- lifecycle ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            self._task = asyncio.create_task(self.run_forever())
+            print("Price scheduler started")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        print("Price scheduler stopped")
+
+    async def run_forever(self):
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Price scheduler: run failed: {e}")
+            try:
+                await self._maybe_refresh_similar()
+            except Exception as e:
+                print(f"Price scheduler: similar-events refresh failed: {e}")
+            try:
+                await self._maybe_refresh_forecasts()
+            except Exception as e:
+                print(f"Price scheduler: forecast refresh failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.PRICE_SCHEDULER_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _maybe_refresh_similar(self):
+        now = datetime.utcnow()
+        interval = timedelta(seconds=settings.SIMILAR_EVENTS_REFRESH_SECONDS)
+        if self._similar_refreshed_at is not None and now - self._similar_refreshed_at < interval:
+            return
+        self._similar_refreshed_at = now
+        await asyncio.to_thread(self._refresh_similar)
+
+    def _refresh_similar(self):
+        db: Session = self.session_factory()
+        try:
+            refresh_similar_events(db)
+        finally:
+            db.close()
+
+    async def _maybe_refresh_forecasts(self):
+        now = datetime.utcnow()
+        interval = timedelta(seconds=settings.PREDICTION_FORECAST_REFRESH_SECONDS)
+        if self._forecasts_refreshed_at is not None and now - self._forecasts_refreshed_at < interval:
+            return
+        self._forecasts_refreshed_at = now
+        await asyncio.to_thread(self._refresh_forecasts)
+
+    def _refresh_forecasts(self):
+        db: Session = self.session_factory()
+        try:
+            refresh_forecasts(db)
+        finally:
+            db.close()
+
+    # --- one pass ---
+
+    async def run_once(self) -> int:
+        """
+        Re-prices every event that is due and returns the number of observations written.
+        """
+        now = datetime.utcnow()
+        due = await asyncio.to_thread(self._load_due_events, now)
+        if not due:
+            return 0
+        print(f"Price scheduler: re-pricing {len(due)} events")
+
+        pending: List[Dict] = []
+        checks: List[Dict] = []
+        written = 0
+        for result in asyncio.as_completed([self._reprice(event) for event in due]):
+            event, update = await result
+            if event is None:
+                continue
+            checks.append({
+                "event_id": event["id"],
+                "checked_at": datetime.utcnow(),
+                "failures": 0 if update is not None else event["failures"] + 1,
+            })
+            if update is not None:
+                pending.append(update)
+            if len(checks) >= settings.PRICE_SCHEDULER_BATCH_SIZE:
+                written += await asyncio.to_thread(self._write_batch, pending, checks)
+                pending, checks = [], []
+        if checks:
+            written += await asyncio.to_thread(self._write_batch, pending, checks)
+
+        self.runs += 1
+        self.observations += written
+        return written
+
+    def _load_due_events(self, now: datetime) -> List[Dict]:
+        db: Session = self.session_factory()
+        try:
+            last_seen = db.query(
+                models.PriceHistory.event_id,
+                func.max(models.PriceHistory.timestamp).label("last_seen")
+            ).group_by(models.PriceHistory.event_id).subquery()
+
+            rows = db.query(models.Event.id, models.Event.url, models.Event.source, models.Event.date,
+                            last_seen.c.last_seen, models.PriceCheck.checked_at, models.PriceCheck.failures)\
+                .outerjoin(last_seen, last_seen.c.event_id == models.Event.id)\
+                .outerjoin(models.PriceCheck, models.PriceCheck.event_id == models.Event.id)\
+                .filter(models.Event.date >= now)\
+                .order_by(models.Event.date.asc())\
+                .all()
+        finally:
+            db.close()
+
+        due = []
+        for event_id, url, source, date, seen, checked, failures in rows:
+            if _provider_for(event_id) is None:
+                continue
+            # Due-ness follows the last attempt, so events that never yield a
+            # price don't come back every pass and crowd out the rest
+            last = checked or seen
+            if last is None or now - last >= retry_interval(date, now, failures or 0):
+                due.append({"id": event_id, "url": url, "source": source, "failures": failures or 0})
+                if len(due) >= settings.PRICE_SCHEDULER_MAX_EVENTS_PER_RUN:
+                    break
+        return due
+
+    def _write_batch(self, updates: List[Dict], checks: List[Dict]) -> int:
+        db: Session = self.session_factory()
+        try:
+            store = EventStore(db)
+            store.record_price_checks(checks)
+            if not updates:
+                db.commit()
+                return 0
+            return store.apply_price_updates(updates)
+        finally:
+            db.close()
+
+    # --- re-pricing ---
+
+    async def _reprice(self, event: Dict) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Returns (event, update); update is None when no price was found, and
+        event is None when the provider wasn't tried (its circuit is open).
+        """
+        provider = _provider_for(event["id"])
+        # Respect the search path's circuit breakers so a dead provider isn't hammered
+        breaker = fetch_events.breakers.get(provider)
+        if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+            return None, None
+
+        async with self._global_limit:
+            try:
+                price_low, price_high, data_source = await self._fetch_price(provider, event)
+            except Exception as e:
+                print(f"Price scheduler: {event['id']} failed: {e}")
+                return event, None
+
+        if price_low is None:
+            return event, None
+        return event, {
+            "event_id": event["id"],
+            "price_low": price_low,
+            "price_high": price_high,
+            "source": event["source"].replace(f" {ESTIMATE_MARKER}", ""),
+            "data_source": data_source,
+            "timestamp": datetime.utcnow(),
+        }
+
+    async def _fetch_price(self, provider: str, event: Dict):
+        provider_id = event["id"].split("_", 1)[1]
+        async with self._provider_limits[provider]:
+            if provider == "seatgeek":
+                fresh = await fetch_events.fetch_seatgeek_event(provider_id)
+            else:
+                fresh = await fetch_events.fetch_ticketmaster_event(provider_id)
+
+        if fresh is not None and fresh.price_low is not None:
+            return fresh.price_low, fresh.price_high, "api"
+
+        # Ticketmaster often omits priceRanges; fall back to the event page
+        if provider == "ticketmaster":
+            async with self._provider_limits["scraper"]:
+                low, high = await scraper.scrape_event_price(event["url"])
+            if low is not None:
+                return low, high, "scraper"
+        return None, None, None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "runs": self.runs,
+            "observations": self.observations,
+        }
+
+
+scheduler = PriceIngestionScheduler()
+
+
+async def _main():
+    import migrations
+    from utils import http_client
+    migrations.run_migrations(database.engine)
+    await http_client.startup()
+    try:
+        scheduler.start()
+        await scheduler._task
+    finally:
+        await http_client.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,169 @@
+import numpy as np
+from scipy.special import stdtr
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+SECONDS_PER_DAY = 86400.0
+
+# Trailing window for rolling min/max
+ROLLING_WINDOW_DAYS = 7.0
+
+# Percentile bands reported per event
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Trend slope must be significant at this level to count as a trend
+TREND_P_VALUE = 0.05
+
+
+def to_epoch_seconds(dates: Sequence[datetime]) -> np.ndarray:
+    # Stored timestamps are naive UTC
+    return np.asarray(dates, dtype="datetime64[us]").astype(np.int64) / 1e6
+
+
+def compute_statistics_batch(group_ids: np.ndarray, timestamps: np.ndarray, prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Price statistics for many series at once.
+
+    `group_ids`, `timestamps` (epoch seconds) and `prices` are parallel arrays
+    sorted by (group, timestamp); each group is one event's history. Every
+    statistic is a segment reduction (np.*.reduceat) over the same arrays, so
+    the cost is a few vectorized passes regardless of how many events there are.
+    Returns a dict of arrays with one entry per group, in group order.
+    """
+    group_ids = np.asarray(group_ids)
+    ts = np.asarray(timestamps, dtype=np.float64)
+    y = np.asarray(prices, dtype=np.float64)
+    n_total = len(y)
+    if n_total == 0:
+        return {"group": group_ids[:0], "count": np.zeros(0, dtype=np.int64)}
+
+    # Segment boundaries
+    boundary = np.empty(n_total, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = group_ids[1:] != group_ids[:-1]
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, n_total))
+    ends = starts + counts - 1
+    seg = np.repeat(np.arange(len(starts)), counts)
+    n = counts.astype(np.float64)
+
+    # Basic moments
+    price_sum = np.add.reduceat(y, starts)
+    mean = price_sum / n
+    dev = y - mean[seg]
+    std = np.sqrt(np.add.reduceat(dev * dev, starts) / n)
+    low = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+
+    # Least-squares trend of price on time (days), centered per group for precision
+    x = (ts - ts[starts][seg]) / SECONDS_PER_DAY
+    x_mean = np.add.reduceat(x, starts) / n
+    xc = x - x_mean[seg]
+    sxx = np.add.reduceat(xc * xc, starts)
+    sxy = np.add.reduceat(xc * dev, starts)
+    syy = np.add.reduceat(dev * dev, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        sse = np.maximum(syy - slope * sxy, 0.0)
+        dof = n - 2
+        se = np.sqrt(np.where((dof > 0) & (sxx > 0), sse / np.maximum(dof, 1) / sxx, np.nan))
+        t_stat = np.where(se > 0, slope / se, np.where(slope != 0, np.inf, 0.0))
+        p_value = np.where(dof > 0, 2.0 * stdtr(np.maximum(dof, 1), -np.abs(t_stat)), 1.0)
+        r_squared = np.where(syy > 0, 1.0 - sse / syy, 0.0)
+
+    # Realized volatility: std of log returns, scaled to one day by the mean sampling interval
+    valid_return = ~boundary[1:] & (y[1:] > 0) & (y[:-1] > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ret = np.where(valid_return, np.log(y[1:] / y[:-1]), 0.0)
+    ret_seg = seg[1:]
+    ret_count = np.bincount(ret_seg, weights=valid_return, minlength=len(starts))
+    ret_sum = np.bincount(ret_seg, weights=log_ret, minlength=len(starts))
+    ret_sumsq = np.bincount(ret_seg, weights=log_ret * log_ret, minlength=len(starts))
+    span = ts[ends] - ts[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret_var = np.where(ret_count > 1, (ret_sumsq - ret_sum * ret_sum / ret_count) / (ret_count - 1), 0.0)
+        mean_interval = np.where(counts > 1, span / (n - 1), 0.0)
+        per_day = np.where(mean_interval > 0, np.sqrt(SECONDS_PER_DAY / mean_interval), 0.0)
+    volatility = np.sqrt(np.maximum(ret_var, 0.0)) * per_day
+
+    # Drawdown from the running peak; groups are offset so the running max can't leak across groups
+    offset = (np.arange(len(starts), dtype=np.float64) * (high.max() - low.min() + 1.0))[seg]
+    running_peak = np.maximum.accumulate(y + offset) - offset
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(running_peak > 0, y / running_peak - 1.0, 0.0)
+    max_drawdown = np.minimum.reduceat(drawdown, starts)
+    current_drawdown = drawdown[ends]
+
+    # Rolling min/max over the trailing window ending at each group's last point
+    in_window = ts >= (ts[ends] - ROLLING_WINDOW_DAYS * SECONDS_PER_DAY)[seg]
+    rolling_min = np.minimum.reduceat(np.where(in_window, y, np.inf), starts)
+    rolling_max = np.maximum.reduceat(np.where(in_window, y, -np.inf), starts)
+
+    # Percentiles (linear interpolation) from one sort of all prices; the same
+    # group offset keeps each group's prices contiguous and in group order
+    sorted_y = y[np.argsort(y + offset)]
+    percentiles = {}
+    for q in PERCENTILES:
+        pos = (n - 1) * (q / 100.0)
+        lower = np.floor(pos).astype(np.int64)
+        upper = np.minimum(lower + 1, counts - 1)
+        frac = pos - lower
+        percentiles[q] = sorted_y[starts + lower] * (1 - frac) + sorted_y[starts + upper] * frac
+
+    return {
+        "group": group_ids[starts],
+        "count": counts,
+        "first": y[starts],
+        "current": y[ends],
+        "mean": mean,
+        "std": std,
+        "min": low,
+        "max": high,
+        "slope_per_day": slope,
+        "p_value": p_value,
+        "r_squared": r_squared,
+        "volatility": volatility,
+        "max_drawdown": max_drawdown,
+        "current_drawdown": current_drawdown,
+        "rolling_min": rolling_min,
+        "rolling_max": rolling_max,
+        **{f"p{q}": values for q, values in percentiles.items()},
+    }
+
+
+def classify_trend(slope: float, p_value: float) -> str:
+    if p_value < TREND_P_VALUE and slope > 0:
+        return "increasing"
+    if p_value < TREND_P_VALUE and slope < 0:
+        return "decreasing"
+    return "stable"
+
+
+def compute_statistics(dates: Sequence[datetime], prices: Sequence[float]) -> Optional[Dict]:
+    """
+    Statistics for a single time-ordered series as plain floats,
+    or None if there are no points.
+    """
+    if len(prices) == 0:
+        return None
+    stats = compute_statistics_batch(np.zeros(len(prices), dtype=np.int64), to_epoch_seconds(dates), np.asarray(prices))
+    result = {key: values[0].item() for key, values in stats.items() if key != "group"}
+    result["trend"] = classify_trend(result["slope_per_day"], result["p_value"])
+    return result
+
+
+def statistics_by_event(event_ids: List[str], dates: Sequence[datetime], prices: Sequence[float]) -> Dict[str, Dict]:
+    """
+    Batch helper for rows already ordered by (event_id, timestamp),
+    e.g. straight from a PriceHistory query.
+    """
+    if not event_ids:
+        return {}
+    stats = compute_statistics_batch(np.asarray(event_ids, dtype=object), to_epoch_seconds(dates), np.asarray(prices, dtype=np.float64))
+    keys = [key for key in stats if key != "group"]
+    results = {}
+    for i, event_id in enumerate(stats["group"]):
+        row = {key: stats[key][i].item() for key in keys}
+        row["trend"] = classify_trend(row["slope_per_day"], row["p_value"])
+        results[event_id] = row
+    return results
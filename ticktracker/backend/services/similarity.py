@@ -0,0 +1,225 @@
+import json
+import zlib
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import database
+import models
+from settings import settings
+from utils.pricing_heuristics import classify_event_type
+
+EVENT_TYPES = ["festival", "major_concert", "sports", "theatre", "symphony", "local_show", "default"]
+
+# City/venue names are embedded as fixed pseudo-random unit vectors: identical
+# names coincide, different names sit about sqrt(2) apart. Keeps the feature
+# matrix small and dense however many cities and venues there are.
+NAME_DIMS = 16
+
+# Relative weight of each feature group in the distance
+WEIGHTS = {
+    "type": 1.0,
+    "city": 0.8,
+    "venue": 0.5,
+    "weekday": 0.3,
+    "price": 1.5,   # per unit of log price
+    "days": 0.5,    # per 30 days to event
+}
+
+# Queries are scored against the whole index in blocks of this many rows
+QUERY_BLOCK = 512
+
+# Thresholds for reporting a numeric feature as "matching"
+PRICE_MATCH_RATIO = 1.25
+DAYS_MATCH = 14
+
+
+class EventFeatures(NamedTuple):
+    id: str
+    event_type: str
+    city: str
+    venue: str
+    weekday: int
+    price: Optional[float]
+    days_to_event: int
+
+
+def _normalize_name(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _name_vector(name: str) -> np.ndarray:
+    if not name:
+        return np.zeros(NAME_DIMS, dtype=np.float32)
+    v = np.random.default_rng(zlib.crc32(name.encode())).standard_normal(NAME_DIMS)
+    return (v / np.linalg.norm(v)).astype(np.float32)
+
+
+def extract_features(event, now: Optional[datetime] = None) -> EventFeatures:
+    now = now or datetime.utcnow()
+    date = event.date.replace(tzinfo=None) if event.date else now
+    price = event.price_low if event.price_low is not None else getattr(event, "price_median", None)
+    return EventFeatures(
+        id=event.id,
+        event_type=classify_event_type(event),
+        city=_normalize_name(event.city),
+        venue=_normalize_name(event.venue),
+        weekday=date.weekday(),
+        price=price if price and price > 0 else None,
+        days_to_event=max((date - now).days, 0),
+    )
+
+
+class Neighbor(NamedTuple):
+    event_id: str
+    score: float
+    matching_factors: List[str]
+
+
+class SimilarityIndex:
+    """
+    Brute-force nearest-neighbour index over event feature vectors.
+    Ranking a block of queries is one matrix product against the whole
+    index: with rows [x, -|x|^2/2] and queries [q, 1], the product is
+    q.x - |x|^2/2, which orders candidates exactly like -|q - x|^2. The top k
+    per row come from argpartition, so there is no per-pair Python work.
+    """
+
+    def __init__(self, features: Sequence[EventFeatures]):
+        self.features = list(features)
+        self.ids = [f.id for f in self.features]
+        self._row = {event_id: i for i, event_id in enumerate(self.ids)}
+        n = len(self.features)
+
+        self.type_codes = np.array([EVENT_TYPES.index(f.event_type) for f in self.features], dtype=np.int16)
+        city_names, self.city_codes = np.unique([f.city for f in self.features], return_inverse=True)
+        venue_names, self.venue_codes = np.unique([f.venue for f in self.features], return_inverse=True)
+        self.weekdays = np.array([f.weekday for f in self.features], dtype=np.int16)
+        self.days = np.array([f.days_to_event for f in self.features], dtype=np.float32)
+        prices = np.array([f.price if f.price is not None else np.nan for f in self.features], dtype=np.float64)
+        # Unknown prices sit at the median so they neither attract nor repel
+        known = prices[~np.isnan(prices)]
+        self.prices = np.where(np.isnan(prices), np.median(known) if len(known) else 1.0, prices)
+
+        city_vectors = np.stack([_name_vector(name) for name in city_names]) if n else np.zeros((0, NAME_DIMS))
+        venue_vectors = np.stack([_name_vector(name) for name in venue_names]) if n else np.zeros((0, NAME_DIMS))
+        angle = 2 * np.pi * self.weekdays / 7.0
+
+        self.matrix = np.hstack([
+            WEIGHTS["type"] * np.eye(len(EVENT_TYPES), dtype=np.float32)[self.type_codes] / np.sqrt(2),
+            WEIGHTS["city"] * city_vectors[self.city_codes] / np.sqrt(2),
+            WEIGHTS["venue"] * venue_vectors[self.venue_codes] / np.sqrt(2),
+            WEIGHTS["weekday"] * np.column_stack([np.cos(angle), np.sin(angle)]) / 2,
+            WEIGHTS["price"] * np.log(self.prices)[:, None],
+            WEIGHTS["days"] * (self.days / 30.0)[:, None],
+        ]) if n else np.zeros((0, 1))
+        # Centering doesn't change distances but keeps float32 norms small and precise
+        if n:
+            self.matrix = self.matrix - self.matrix.mean(axis=0)
+        self.matrix = self.matrix.astype(np.float32)
+        self.sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+        self._augmented = np.hstack([self.matrix, -0.5 * self.sq_norms[:, None]]).astype(np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def query(self, event_ids: Sequence[str], k: int) -> Dict[str, List[Neighbor]]:
+        """
+        Top-k most similar indexed events for each of `event_ids` (which must
+        be in the index), excluding the event itself.
+        """
+        rows = np.array([self._row[event_id] for event_id in event_ids], dtype=np.int64)
+        k = min(k, len(self) - 1)
+        results: Dict[str, List[Neighbor]] = {}
+        if k <= 0:
+            return {event_id: [] for event_id in event_ids}
+
+        for start in range(0, len(rows), QUERY_BLOCK):
+            block = rows[start:start + QUERY_BLOCK]
+            q = np.hstack([self.matrix[block], np.ones((len(block), 1), dtype=np.float32)])
+            closeness = q @ self._augmented.T
+            closeness[np.arange(len(block)), block] = -np.inf  # never match yourself
+            top = np.argpartition(closeness, -k, axis=1)[:, -k:]
+            order = np.argsort(-np.take_along_axis(closeness, top, axis=1), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            # Exact distances for the k survivors only
+            diff = self.matrix[top] - self.matrix[block][:, None, :]
+            scores = 1.0 / (1.0 + np.sqrt(np.einsum("ijk,ijk->ij", diff, diff)))
+
+            for i, row in enumerate(block):
+                results[self.ids[row]] = [
+                    Neighbor(self.ids[j], float(score), self._matching_factors(row, j))
+                    for j, score in zip(top[i], scores[i])
+                ]
+        return results
+
+    def _matching_factors(self, a: int, b: int) -> List[str]:
+        factors = []
+        if self.type_codes[a] == self.type_codes[b]:
+            factors.append("type")
+        if self.city_codes[a] == self.city_codes[b]:
+            factors.append("city")
+        if self.venue_codes[a] == self.venue_codes[b]:
+            factors.append("venue")
+        if self.weekdays[a] == self.weekdays[b]:
+            factors.append("weekday")
+        ratio = self.prices[a] / self.prices[b]
+        if 1 / PRICE_MATCH_RATIO <= ratio <= PRICE_MATCH_RATIO:
+            factors.append("price")
+        if abs(self.days[a] - self.days[b]) <= DAYS_MATCH:
+            factors.append("days_to_event")
+        return factors
+
+
+def refresh_similar_events(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Batch job: indexes every stored event and rewrites SimilarEventsCache for
+    upcoming events whose entries are missing or expired. Commits and
+    returns the number of events refreshed.
+    """
+    now = now or datetime.utcnow()
+    events = db.query(
+        models.Event.id, models.Event.name, models.Event.city, models.Event.venue,
+        models.Event.date, models.Event.price_low, models.Event.price_median,
+    ).all()
+    if len(events) < 2:
+        return 0
+
+    fresh = {event_id for (event_id,) in db.query(models.SimilarEventsCache.event_id)
+             .filter(models.SimilarEventsCache.expires_at > now).distinct()}
+    targets = [e.id for e in events if e.date is not None and e.date >= now and e.id not in fresh]
+    if not targets:
+        return 0
+
+    index = SimilarityIndex([extract_features(e, now) for e in events])
+    expires_at = now + timedelta(seconds=settings.SIMILAR_EVENTS_TTL_SECONDS)
+
+    for start in range(0, len(targets), settings.SIMILAR_EVENTS_BATCH_SIZE):
+        chunk = targets[start:start + settings.SIMILAR_EVENTS_BATCH_SIZE]
+        neighbors = index.query(chunk, settings.SIMILAR_EVENTS_K)
+        db.execute(delete(models.SimilarEventsCache).where(models.SimilarEventsCache.event_id.in_(chunk)))
+        rows = [{
+            "event_id": event_id,
+            "similar_event_id": n.event_id,
+            "similarity_score": n.score,
+            "matching_factors": json.dumps(n.matching_factors),
+            "cached_at": now,
+            "expires_at": expires_at,
+        } for event_id in chunk for n in neighbors[event_id]]
+        if rows:
+            db.execute(insert(models.SimilarEventsCache), rows)
+        db.commit()
+
+    print(f"Similar events: refreshed {len(targets)} events against {len(index)} indexed")
+    return len(targets)
+
+
+if __name__ == "__main__":
+    import migrations
+    migrations.run_migrations(database.engine)
+    session = database.SessionLocal()
+    try:
+        refresh_similar_events(session)
+    finally:
+        session.close()
@@ -9,6 +9,16 @@ class Settings(BaseSettings):
     # Should use os.getenv to allow overriding with a real DB URL (e.g. Postgres)
     DATABASE_URL: str = "sqlite:////tmp/ticktracker.db"
     
+    # Connection pools (sync engine for scripts/workers, async engine for the API handlers)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # SQLite tuning - WAL so readers don't serialize behind writers
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 20000
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         import os
@@ -32,7 +42,124 @@ class Settings(BaseSettings):
     
     # CORS Origins (comma-separated list for production)
     CORS_ORIGINS: str = "*"
-    
+
+    # Outbound HTTP - one pooled, keep-alive client per provider (see utils/http_client.py)
+    HTTP2_ENABLED: bool = True
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 3.0
+    TICKETMASTER_MAX_CONNECTIONS: int = 20
+    TICKETMASTER_TIMEOUT: float = 8.0
+    EVENTBRITE_MAX_CONNECTIONS: int = 10
+    EVENTBRITE_TIMEOUT: float = 6.0
+    SEATGEEK_MAX_CONNECTIONS: int = 20
+    SEATGEEK_TIMEOUT: float = 8.0
+    SCRAPER_MAX_CONNECTIONS: int = 10
+    SCRAPER_TIMEOUT: float = 10.0
+
+    # Provider pagination - pages after the first are fetched concurrently
+    PROVIDER_PAGE_SIZE: int = 50
+    PROVIDER_MAX_PAGES: int = 5
+    PROVIDER_PAGE_CONCURRENCY: int = 3
+
+    # Per-provider deadline budget (seconds) for a search; later pages are dropped
+    TICKETMASTER_DEADLINE: float = 3.0
+    EVENTBRITE_DEADLINE: float = 2.0
+    SEATGEEK_DEADLINE: float = 3.0
+    SCRAPER_DEADLINE: float = 4.0
+
+    # Scraper worker pool, per-host rate limit and result cache (utils/scraper.py)
+    SCRAPER_WORKERS: int = 6
+    SCRAPER_HOST_RATE: float = 2.0        # sustained requests per second per host
+    SCRAPER_HOST_BURST: float = 4.0
+    SCRAPER_CACHE_TTL_SECONDS: float = 1800.0
+    # Pages without a price (no offers, 404/410): short, so a page that gains a price shows it soon
+    SCRAPER_NEGATIVE_TTL_SECONDS: float = 300.0
+    SCRAPER_MAX_PER_SEARCH: int = 20
+
+    # Circuit breaker - skip a provider for a cooldown after repeated failures
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS: float = 60.0
+
+    # DB-first search: serve from our own events table when it has enough fresh matches
+    LOCAL_SEARCH_MIN_RESULTS: int = 10
+    LOCAL_SEARCH_MAX_AGE_MINUTES: int = 30
+    LOCAL_SEARCH_LIMIT: int = 200
+
+    # Background price ingestion (services/price_scheduler.py)
+    PRICE_SCHEDULER_ENABLED: bool = False
+    PRICE_SCHEDULER_INTERVAL_SECONDS: float = 300.0
+    PRICE_SCHEDULER_MAX_CONCURRENCY: int = 8
+    PRICE_SCHEDULER_PROVIDER_CONCURRENCY: int = 3
+    PRICE_SCHEDULER_BATCH_SIZE: int = 100
+    PRICE_SCHEDULER_MAX_EVENTS_PER_RUN: int = 1000
+    # Events that keep coming back without a price are retried at doubling intervals, up to this
+    PRICE_SCHEDULER_MAX_BACKOFF_SECONDS: float = 86400.0
+
+    # Chart resolution by span of the requested history: raw points, then hourly, then daily rollups
+    CHART_RAW_MAX_SPAN_HOURS: float = 48.0
+    CHART_HOURLY_MAX_SPAN_DAYS: float = 60.0
+
+    # Most events accepted by POST /api/events/chart-data/batch
+    CHART_BATCH_MAX_EVENTS: int = 100
+
+    # Upper bound for the max_points downsampling parameter (services/downsampling.py)
+    CHART_MAX_POINTS_LIMIT: int = 10000
+
+    # Similar events (services/similarity.py): neighbours stored per event, cache lifetime,
+    # how often the price scheduler re-runs the job, and how many the chart shows
+    SIMILAR_EVENTS_K: int = 10
+    SIMILAR_EVENTS_TTL_SECONDS: float = 86400.0
+    SIMILAR_EVENTS_BATCH_SIZE: int = 500
+    SIMILAR_EVENTS_REFRESH_SECONDS: float = 3600.0
+    SIMILAR_EVENTS_CHART_LIMIT: int = 5
+
+    # Per-event caps on relations returned by GET /events/{id} (services/event_loader.py)
+    EVENT_DETAIL_HISTORY_LIMIT: int = 500
+    EVENT_DETAIL_RELATION_LIMIT: int = 50
+
+    # Where trained model versions and the CURRENT pointer are stored (ml/registry.py).
+    # Unset: ml/models/price_model/ (ignored by git). Point every worker at the same directory.
+    ML_REGISTRY_DIR: Optional[str] = None
+
+    # How often the API checks the model registry for a new current version (0 disables)
+    ML_MODEL_WATCH_SECONDS: float = 30.0
+
+    # Serve the NumPy-compiled export of a model version when it has one (ml/compiled_model.py);
+    # off loads the pickled sklearn pipeline instead
+    ML_USE_COMPILED_MODEL: bool = True
+
+    # Training jobs run in a separate process (ml/jobs.py); 1 = fresh process per job
+    ML_JOBS_TASKS_PER_WORKER: int = 1
+
+    # Most events accepted by POST /ml/predict_price/batch
+    ML_PREDICT_BATCH_MAX_EVENTS: int = 1000
+
+    # Stored price forecasts (services/price_forecasts.py): days ahead, how long a forecast
+    # stays fresh, how often the price scheduler looks for stale ones, events per batch
+    PREDICTION_HORIZON_DAYS: int = 14
+    PREDICTION_FORECAST_TTL_SECONDS: float = 21600.0
+    PREDICTION_FORECAST_REFRESH_SECONDS: float = 900.0
+    PREDICTION_FORECAST_BATCH_SIZE: int = 500
+
+    # Search result cache (see utils/search_cache.py)
+    SEARCH_CACHE_TTL_SECONDS: float = 60.0
+    SEARCH_CACHE_STALE_SECONDS: float = 300.0
+    SEARCH_CACHE_MAX_ENTRIES: int = 512
+
+    # Prediction cache (see utils/prediction_cache.py); backed by PredictionHistory
+    PREDICTION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Chart payload cache (see utils/chart_cache.py); set CHART_CACHE_DISK_PATH to a
+    # SQLite file to keep entries across restarts and share them between workers
+    CHART_CACHE_TTL_SECONDS: float = 300.0
+    CHART_CACHE_MAX_ENTRIES: int = 2048
+    CHART_CACHE_DISK_PATH: Optional[str] = None
+
+    # Chart response compression (see utils/chart_encoding.py); br needs the brotli package
+    CHART_COMPRESS_MIN_BYTES: int = 1024
+    CHART_GZIP_LEVEL: int = 6
+    CHART_BROTLI_QUALITY: int = 5
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,123 @@
+"""
+Chart cache invalidation follows writes to chart inputs however they are made:
+ORM adds/changes/deletes, Query.delete(), bulk and Core statements through the
+session, and the services' own writers. Nothing is invalidated before commit
+or after a rollback.
+
+Run from the backend directory:
+    python -m pytest test_chart_cache.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, update
+from sqlalchemy.orm import sessionmaker
+
+import database
+import models
+from services.event_store import EventStore
+from services.price_rollups import PriceRollups
+from utils.chart_cache import chart_cache
+
+NOW = datetime(2027, 1, 1, 12)
+EVENT_IDS = ["evt_a", "evt_b", "evt_c"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'charts.db'}")
+    database.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for event_id in EVENT_IDS:
+        session.add(models.Event(id=event_id, name=event_id, venue="Arena", city="Chicago",
+                                 date=NOW + timedelta(days=30), url="https://example.com", source="Ticketmaster"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _bumped(write, db) -> set:
+    """Events whose chart generation changed across write(db) + commit."""
+    before = {event_id: chart_cache.generation(event_id) for event_id in EVENT_IDS}
+    write(db)
+    assert {e for e in EVENT_IDS if chart_cache.generation(e) != before[e]} == set(), "invalidated before commit"
+    db.commit()
+    return {e for e in EVENT_IDS if chart_cache.generation(e) != before[e]}
+
+
+def _milestone(event_id: str) -> models.EventMilestone:
+    return models.EventMilestone(event_id=event_id, milestone_type="presale", milestone_date=NOW, title="Presale")
+
+
+def _prediction_row(event_id: str, day: int = 1) -> dict:
+    return {"event_id": event_id, "prediction_date": NOW + timedelta(days=day), "predicted_price": 100.0,
+            "confidence_lower": 80.0, "confidence_upper": 130.0, "model_version": "test"}
+
+
+def test_orm_add_change_and_delete(db):
+    assert _bumped(lambda db: db.add(_milestone("evt_a")), db) == {"evt_a"}
+
+    milestone = db.query(models.EventMilestone).one()
+    def move(db):
+        milestone.event_id = "evt_b"
+    assert _bumped(move, db) == {"evt_a", "evt_b"}
+
+    assert _bumped(lambda db: db.delete(milestone), db) == {"evt_b"}
+
+
+def test_query_delete(db):
+    db.add_all([_milestone("evt_a"), _milestone("evt_b")])
+    db.commit()
+    write = lambda db: db.query(models.EventMilestone).filter(models.EventMilestone.event_id == "evt_a").delete()
+    assert _bumped(write, db) == {"evt_a"}
+
+
+def test_core_statements(db):
+    Prediction = models.PredictionHistory
+    write = lambda db: db.execute(insert(Prediction), [_prediction_row("evt_a"), _prediction_row("evt_b")])
+    assert _bumped(write, db) == {"evt_a", "evt_b"}
+
+    write = lambda db: db.execute(delete(Prediction).where(Prediction.event_id.in_(["evt_b"]), Prediction.prediction_date > NOW))
+    assert _bumped(write, db) == {"evt_b"}
+
+    write = lambda db: db.execute(update(Prediction).where(Prediction.event_id == "evt_a").values(predicted_price=90.0))
+    assert _bumped(write, db) == {"evt_a"}
+
+
+def test_statements_without_event_ids_clear_everything(db):
+    Prediction = models.PredictionHistory
+    db.execute(insert(Prediction), [_prediction_row("evt_a")])
+    db.commit()
+    write = lambda db: db.execute(delete(Prediction).where(Prediction.prediction_date > NOW))
+    assert _bumped(write, db) == set(EVENT_IDS)
+
+    write = lambda db: db.execute(insert(Prediction).values([_prediction_row("evt_a")]))
+    assert _bumped(write, db) == set(EVENT_IDS)
+
+
+def test_recorded_prices_and_rollup_rebuild(db):
+    observations = [{"event_id": "evt_c", "price": 50.0 + i, "timestamp": NOW + timedelta(hours=i),
+                     "is_outlier": False} for i in range(3)]
+    assert _bumped(lambda db: EventStore(db).record_prices(observations), db) == {"evt_c"}
+
+    # rebuild commits itself
+    before = {event_id: chart_cache.generation(event_id) for event_id in EVENT_IDS}
+    PriceRollups(db).rebuild(["evt_c"])
+    assert {e for e in EVENT_IDS if chart_cache.generation(e) != before[e]} == {"evt_c"}
+    assert db.query(models.PriceRollup).filter(models.PriceRollup.event_id == "evt_c").count() == 4
+
+
+def test_rollback_discards(db):
+    db.add(_milestone("evt_a"))
+    db.flush()
+    db.execute(insert(models.PredictionHistory), [_prediction_row("evt_b")])
+    db.rollback()
+    assert _bumped(lambda db: None, db) == set()
+
+
+def test_unrelated_writes_are_ignored(db):
+    def write(db):
+        db.get(models.Event, "evt_a").price_low = 10.0
+        db.add(models.PriceCheck(event_id="evt_a", checked_at=NOW))
+    assert _bumped(write, db) == set()
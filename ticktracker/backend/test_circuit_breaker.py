@@ -0,0 +1,64 @@
+"""
+Provider circuit breakers: a half-open trial that is cancelled must not
+leave the breaker refusing every later call.
+
+Run from the backend directory:
+    python -m pytest test_circuit_breaker.py
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils import fetch_events
+from utils.circuit_breaker import CircuitBreaker
+
+PROVIDER = "ticketmaster"
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(PROVIDER, failure_threshold=1, cooldown=60.0)
+    monkeypatch.setitem(fetch_events.breakers, PROVIDER, breaker)
+    return breaker
+
+
+def _half_open(breaker: CircuitBreaker):
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - breaker.cooldown
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_cancelled_half_open_trial_is_released(breaker, monkeypatch):
+    trial_started = asyncio.Event()
+
+    async def hanging_provider(*args):
+        trial_started.set()
+        await asyncio.sleep(3600)
+        yield []
+
+    monkeypatch.setitem(fetch_events.PROVIDER_ITERATORS, PROVIDER, hanging_provider)
+    _half_open(breaker)
+
+    async def run():
+        start = datetime.utcnow()
+        task = asyncio.create_task(fetch_events._run_provider(PROVIDER, "q", "", start, start + timedelta(days=1), lambda page: None))
+        await trial_started.wait()
+        assert breaker.trial_in_progress
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert not breaker.trial_in_progress
+    # The next call gets to make the trial
+    assert breaker.allow()
+
+
+def test_half_open_allows_a_single_trial(breaker):
+    _half_open(breaker)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,73 @@
+"""
+utils.dedup must keep exactly the events the original pairwise loop kept
+(benchmarks/bench_dedup.py: legacy_deduplicate), in the same order.
+
+Run from the backend directory:
+    python -m pytest test_dedup.py
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.bench_dedup import ARTISTS, SOURCES, SUFFIXES, VENUES, _event, legacy_deduplicate, make_fixture
+from utils import dedup
+
+
+def _typo(rng: random.Random, s: str) -> str:
+    # One dropped, doubled or swapped character: a near-duplicate spelling
+    if len(s) < 3:
+        return s
+    i = rng.randrange(len(s) - 1)
+    edit = rng.choice(["drop", "double", "swap"])
+    if edit == "drop":
+        return s[:i] + s[i + 1:]
+    if edit == "double":
+        return s[:i] + s[i] + s[i:]
+    return s[:i] + s[i + 1] + s[i] + s[i + 2:]
+
+
+def make_near_duplicates(n: int, seed: int):
+    """
+    Provider lists with typos in names and venues, unrelated venues for the
+    same name, and listings either side of midnight (the date tolerance is
+    the calendar day).
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 5, 1)
+    events = []
+    i = 0
+    while len(events) < n:
+        name = rng.choice(ARTISTS) + rng.choice(SUFFIXES)
+        _, spellings = rng.choice(VENUES)
+        day = start + timedelta(days=rng.randrange(5))
+        for source in rng.sample(SOURCES, rng.randint(1, 3)):
+            listed = _typo(rng, name) if rng.random() < 0.4 else name
+            venue = rng.choice(spellings)
+            if rng.random() < 0.2:
+                venue = _typo(rng, venue)
+            elif rng.random() < 0.1:
+                venue = rng.choice(VENUES)[0]
+            # 23:30 the day before, or 00:30 / 19:30 on the day
+            moment = day + rng.choice([timedelta(minutes=-30), timedelta(minutes=30), timedelta(hours=19, minutes=30)])
+            events.append(_event(i, listed, venue, moment, source))
+            i += 1
+    rng.shuffle(events)
+    return events
+
+
+def _ids(events):
+    return [e.id for e in events]
+
+
+# Dense (many same-day candidates) through sparse date ranges
+@pytest.mark.parametrize("seed,days", enumerate([3, 10, 30, 120, 540]))
+def test_matches_legacy_on_provider_lists(seed, days):
+    events = make_fixture(400, days, seed=seed)
+    assert _ids(dedup.deduplicate(events)) == _ids(legacy_deduplicate(events))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_legacy_on_near_duplicates(seed):
+    events = make_near_duplicates(300, seed)
+    assert _ids(dedup.deduplicate(events)) == _ids(legacy_deduplicate(events))
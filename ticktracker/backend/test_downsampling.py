@@ -0,0 +1,53 @@
+"""
+Downsampling never returns more than `max_points` points, whatever the
+mix of milestones (anchors), outliers and method.
+
+Run from the backend directory:
+    python -m pytest test_downsampling.py
+"""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from services.downsampling import METHODS, downsample_indices, minmax
+
+START = datetime(2026, 1, 1)
+
+
+def _series(n: int, rng: random.Random):
+    dates = [START + timedelta(minutes=i) for i in range(n)]
+    return dates, [rng.uniform(20, 200) for _ in range(n)]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_milestones_fit_in_the_budget(method):
+    dates, prices = _series(1000, random.Random(0))
+    milestones = [dates[100 * i + 50] for i in range(5)]
+    keep = downsample_indices(dates, prices, [False] * 1000, 10, milestones, method)
+    assert len(keep) == 10
+    assert keep[0] == 0 and keep[-1] == 999
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_never_exceeds_max_points(method):
+    rng = random.Random(1)
+    for _ in range(300):
+        n = rng.randint(5, 800)
+        dates, prices = _series(n, rng)
+        outlier_rate = rng.choice([0.0, 0.05, 0.5, 1.0])
+        is_outlier = [rng.random() < outlier_rate for _ in range(n)]
+        anchors = [START + timedelta(minutes=rng.randint(-10, n + 10)) for _ in range(rng.choice([0, 5, 40]))]
+        max_points = rng.randint(3, 60)
+        keep = downsample_indices(dates, prices, is_outlier, max_points, anchors, method)
+        assert len(keep) <= max_points
+        assert list(keep) == sorted(set(keep))
+        assert n <= max_points or (keep[0] == 0 and keep[-1] == n - 1)
+
+
+def test_minmax_respects_small_budgets():
+    x = np.arange(1000.0)
+    y = np.random.default_rng(2).random(1000)
+    for n_out in range(0, 12):
+        assert len(minmax(x, y, n_out)) <= n_out
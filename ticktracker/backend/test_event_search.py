@@ -0,0 +1,118 @@
+"""
+Local event search on SQLite: the FTS index follows inserts, updates and
+deletes through its triggers, survives VACUUM, indexes events stored before
+it existed, and queries it can't tokenize fall through to the providers.
+
+Run from the backend directory:
+    python -m pytest test_event_search.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import database
+import models
+from services.event_search import EventSearch, ensure_search_index
+from settings import settings
+
+EVENT_DATE = datetime(2027, 6, 1)
+SEARCH_FROM = datetime(2027, 1, 1)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    database.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _add(db, event_id: str, name: str, updated_at=None):
+    db.add(models.Event(id=event_id, name=name, venue="Arena", city="Chicago", date=EVENT_DATE,
+                        url="https://example.com", source="Ticketmaster", updated_at=updated_at or datetime.utcnow()))
+
+
+def _ids(db, query):
+    return sorted(e.id for e in EventSearch(db).search(query, None, SEARCH_FROM, None).events)
+
+
+def test_match_follows_inserts_updates_and_deletes(engine):
+    ensure_search_index(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(20):
+        _add(db, f"tm_{i:02d}", f"Band{i} World Tour")
+    db.commit()
+    assert _ids(db, "band7") == ["tm_07"]
+    assert len(_ids(db, "world tour")) == 20
+
+    db.query(models.Event).filter_by(id="tm_07").update({"name": "Jazz Night"})
+    db.query(models.Event).filter_by(id="tm_08").delete()
+    db.commit()
+    assert _ids(db, "band7") == []
+    assert _ids(db, "jazz") == ["tm_07"]
+    assert _ids(db, "band8") == []
+    # Price-only updates don't touch the index
+    db.query(models.Event).filter_by(id="tm_09").update({"price_low": 50.0})
+    db.commit()
+    assert _ids(db, "band9") == ["tm_09"]
+    db.close()
+
+
+def test_match_survives_vacuum(engine):
+    ensure_search_index(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(50):
+        _add(db, f"tm_{i:02d}", f"Show code{i:02d}")
+    db.commit()
+    db.query(models.Event).filter(models.Event.id.in_([f"tm_{i:02d}" for i in range(0, 50, 2)])).delete()
+    db.commit()
+    db.close()
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+
+    db = sessionmaker(bind=engine)()
+    for i in range(50):
+        assert _ids(db, f"code{i:02d}") == ([] if i % 2 == 0 else [f"tm_{i:02d}"])
+    db.close()
+
+
+def test_events_stored_before_the_index_are_backfilled(engine):
+    db = sessionmaker(bind=engine)()
+    _add(db, "tm_old", "Summer Festival")
+    db.commit()
+    ensure_search_index(engine)
+    assert _ids(db, "festival") == ["tm_old"]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT event_id FROM events_fts_ids")).scalars().all() == ["tm_old"]
+    db.close()
+
+
+@pytest.mark.parametrize("query", ["日本", "!!!"])
+def test_untokenizable_query_is_not_served_locally(engine, query):
+    ensure_search_index(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(settings.LOCAL_SEARCH_MIN_RESULTS + 5):
+        _add(db, f"tm_{i:02d}", f"Band{i} World Tour")
+    db.commit()
+    result = EventSearch(db).search(query, None, SEARCH_FROM, None)
+    assert result.events == [] and not result.fresh
+    db.close()
+
+
+def test_freshness_needs_enough_recently_confirmed_matches(engine):
+    ensure_search_index(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(settings.LOCAL_SEARCH_MIN_RESULTS):
+        _add(db, f"tm_{i:02d}", f"Band{i} World Tour")
+    db.commit()
+    assert EventSearch(db).search("tour", None, SEARCH_FROM, None).fresh
+
+    stale = datetime.utcnow() - timedelta(minutes=settings.LOCAL_SEARCH_MAX_AGE_MINUTES + 1)
+    db.query(models.Event).filter_by(id="tm_00").update({"updated_at": stale})
+    db.commit()
+    assert not EventSearch(db).search("tour", None, SEARCH_FROM, None).fresh
+    # Too few matches is never fresh
+    assert not EventSearch(db).search("band1", None, SEARCH_FROM, None).fresh
+    db.close()
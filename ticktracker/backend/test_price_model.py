@@ -0,0 +1,76 @@
+"""
+Batched price prediction must match the single-event path exactly: the bulk
+heuristics against compute_heuristic_price, and predict_prices_for_events
+against the original one-row DataFrame path (kept in
+benchmarks/bench_price_model.py as single_row_prediction).
+
+Run from the backend directory:
+    python -m pytest test_price_model.py
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_price_model import NAMES, make_events, single_row_prediction
+from ml import price_model
+from ml.data_schema import FEATURES
+from ml.registry import registry
+from ml.seed_data import build_seed_frame
+from ml.train_price_model import QUANTILES, build_pipeline
+from utils import pricing_heuristics
+
+NOW = datetime(2026, 10, 17, 0, 0, tzinfo=timezone.utc)
+
+# sklearn warns on every transform about the all-missing seed column
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _heuristic_events(rng: random.Random):
+    events = make_events(300, rng)
+    names = NAMES + ["Taylor Swift Live", "NBA Finals", "Wicked", "Local Open Mic"]
+    for event in events:
+        event.name = f"{rng.choice(names)} {rng.randint(0, 3)}"
+        # Whole days from NOW (band edges), past events, far-out events and aware dates
+        event.date = NOW.replace(tzinfo=None) + timedelta(days=rng.choice([0, 6, 7, 29, 30, 365, 366, 400, -3]),
+                                                         seconds=rng.choice([0, 0, -1, 1, 3600]))
+        if rng.random() < 0.3:
+            event.date = event.date.replace(tzinfo=timezone.utc)
+        if rng.random() < 0.1:
+            event.city = None
+    return events
+
+
+def test_bulk_heuristics_match_per_event():
+    events = _heuristic_events(random.Random(7))
+    assert pricing_heuristics.compute_heuristic_prices(events, NOW) == \
+        [pricing_heuristics.compute_heuristic_price(event, NOW) for event in events]
+
+
+@pytest.fixture(scope="module")
+def seed_models():
+    frame = build_seed_frame(500)
+    target = np.log1p(frame["observed_market_price_mid"])
+    point = build_pipeline().fit(frame[FEATURES], target)
+    quantiles = {name: build_pipeline(alpha).fit(frame[FEATURES], target) for name, alpha in QUANTILES.items()}
+    return point, quantiles
+
+
+@pytest.mark.parametrize("with_intervals", [False, True])
+def test_batched_predictions_match_single_row_path(seed_models, monkeypatch, with_intervals):
+    monkeypatch.setattr(registry, "_live", None)
+    point, quantiles = seed_models
+    registry.use(point, "seed", quantiles=quantiles if with_intervals else None)
+    live = price_model.get_live_model()
+
+    events = make_events(200, random.Random(11))
+    batched = price_model.predict_prices_for_events(events, NOW)
+    assert batched == [single_row_prediction(event, live, NOW) for event in events]
+    assert {result["source"] for result in batched} == {"ml+heuristic"}
+
+
+def test_heuristic_only_predictions_match_single_row_path(monkeypatch):
+    monkeypatch.setattr(price_model, "get_live_model", lambda: None)
+    events = make_events(50, random.Random(3))
+    assert price_model.predict_prices_for_events(events, NOW) == [single_row_prediction(event, None, NOW) for event in events]
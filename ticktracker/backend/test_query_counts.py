@@ -0,0 +1,168 @@
+"""
+Asserts how many SQL statements each read endpoint issues, so N+1 patterns
+and unbounded relation loads show up as test failures.
+
+Run from the backend directory:
+    python -m pytest test_query_counts.py
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event as sa_event
+
+import database
+import main
+import models
+from services.event_loader import EventLoader, RELATIONS
+from services.price_rollups import PriceRollups
+from settings import settings
+from utils.chart_cache import chart_cache
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _seed_event(db, event_id: str, history_points: int):
+    db.add(models.Event(
+        id=event_id, name=f"Event {event_id}", venue="Venue", city="Chicago",
+        date=datetime(2027, 6, 1), url="https://example.com", source="Ticketmaster",
+    ))
+    start = datetime(2026, 1, 1)
+    for i in range(history_points):
+        db.add(models.PriceHistory(event_id=event_id, price=100.0 + i % 7, timestamp=start + timedelta(hours=i)))
+    for i in range(3):
+        db.add(models.EventMilestone(event_id=event_id, milestone_type="Release", milestone_date=start + timedelta(days=i), title=f"M{i}"))
+        db.add(models.PredictionHistory(event_id=event_id, prediction_date=start + timedelta(days=i), predicted_price=110.0,
+                                        confidence_lower=100.0, confidence_upper=120.0, model_version="test"))
+        db.add(models.SimilarEventsCache(event_id=event_id, similar_event_id=f"other_{i}", similarity_score=0.5 + i / 10))
+
+
+@pytest.fixture(scope="module")
+def client():
+    # conftest.py points DATABASE_URL at a throwaway file before settings load
+    assert "ticktracker-tests-" in database.SQLALCHEMY_DATABASE_URL
+    db = database.SessionLocal()
+    _seed_event(db, "small", 10)
+    _seed_event(db, "large", settings.EVENT_DETAIL_HISTORY_LIMIT + 200)
+    db.commit()
+    PriceRollups(db).rebuild()
+    db.close()
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture
+def queries():
+    with count_queries(database.async_engine.sync_engine) as statements:
+        yield statements
+
+
+def test_event_detail_default_loads_history_only(client, queries):
+    response = client.get("/events/small")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["price_history"]) == 10
+    assert body["milestones"] == [] and body["predictions"] == [] and body["similar_events"] == []
+    # event + price_history
+    assert len(queries) == 2
+
+
+def test_event_detail_history_is_capped(client, queries):
+    body = client.get("/events/large").json()
+    history = body["price_history"]
+    assert len(history) == settings.EVENT_DETAIL_HISTORY_LIMIT
+    # The most recent points, oldest first
+    timestamps = [point["timestamp"] for point in history]
+    assert timestamps == sorted(timestamps)
+    assert len(queries) == 2
+
+
+def test_event_detail_include_all_relations(client, queries):
+    response = client.get("/events/large?include=" + ",".join(RELATIONS))
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["milestones"]) == 3
+    assert len(body["predictions"]) == 3
+    assert [s["similar_event_id"] for s in body["similar_events"]] == ["other_2", "other_1", "other_0"]
+    # event + one query per relation, independent of history size
+    assert len(queries) == 1 + len(RELATIONS)
+
+
+def test_event_detail_include_nothing(client, queries):
+    body = client.get("/events/large?include=").json()
+    assert body["price_history"] == []
+    assert len(queries) == 1
+
+
+def test_event_detail_rejects_unknown_include(client, queries):
+    assert client.get("/events/small?include=tickets").status_code == 400
+    assert len(queries) == 0
+
+
+def test_event_detail_missing_event(client, queries):
+    assert client.get("/events/nope?include=milestones").status_code == 404
+    assert len(queries) == 1
+
+
+def test_price_history_single_query(client, queries):
+    response = client.get("/price-history/large?time_range=all")
+    assert response.status_code == 200
+    assert len(queries) == 1
+
+
+def test_chart_data_query_count_independent_of_history(client):
+    counts = []
+    for event_id in ("small", "large"):
+        with count_queries(database.async_engine.sync_engine) as statements:
+            assert client.get(f"/api/events/{event_id}/chart-data").status_code == 200
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
+
+
+def test_chart_data_batch_uses_set_based_queries(client):
+    # events, span per event, raw + hourly + daily history, milestones,
+    # similar events and their daily closes, stored predictions: bounded
+    # whatever the batch size
+    max_queries = 9
+    for time_range, event_ids in (("1y", ["small"]), ("2y", ["small", "large", "nope"])):
+        with count_queries(database.async_engine.sync_engine) as statements:
+            response = client.post("/api/events/chart-data/batch", json={"event_ids": event_ids, "time_range": time_range})
+        assert response.status_code == 200
+        body = response.json()
+        assert sorted(body["charts"]) == sorted(e for e in event_ids if e != "nope")
+        assert body["missing"] == [e for e in event_ids if e == "nope"]
+        assert len(statements) <= max_queries
+
+    # Same payload as the single-event endpoint builds from scratch
+    chart_cache.clear()
+    single = client.get("/api/events/large/chart-data?time_range=2y").json()
+    batch = body["charts"]["large"]
+    # Buy windows are stamped with the current time
+    assert {k: v for k, v in batch.items() if k != "buy_windows"} == {k: v for k, v in single.items() if k != "buy_windows"}
+
+
+def test_loader_batches_relations_across_events(client):
+    db = database.SessionLocal()
+    try:
+        events = db.query(models.Event).filter(models.Event.id.in_(["small", "large"])).all()
+        with count_queries(database.engine) as statements:
+            EventLoader(db).load(events, list(RELATIONS))
+            # Attached collections are already loaded: touching them runs no SQL
+            assert sum(len(e.milestones) for e in events) == 6
+            assert max(len(e.price_history) for e in events) == settings.EVENT_DETAIL_HISTORY_LIMIT
+        assert len(statements) == len(RELATIONS)
+    finally:
+        db.close()
@@ -0,0 +1,51 @@
+"""
+Scraper result cache: misses are cached for much less time than prices,
+and statuses that usually mean "blocked for now" aren't cached at all.
+
+Run from the backend directory:
+    python -m pytest test_scraper_cache.py
+"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database
+import models
+from settings import settings
+from utils import scraper
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    database.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", factory)
+    return factory
+
+
+def _ttl(factory, url: str) -> timedelta:
+    db = factory()
+    try:
+        row = db.get(models.ScrapeResult, url)
+        return row.expires_at - row.fetched_at
+    finally:
+        db.close()
+
+
+def test_negative_ttl_is_shorter_than_positive_ttl():
+    assert settings.SCRAPER_NEGATIVE_TTL_SECONDS < settings.SCRAPER_CACHE_TTL_SECONDS
+
+
+def test_misses_expire_before_prices(session_factory):
+    scraper._store_result("https://example.com/priced", (50.0, 120.0))
+    scraper._store_result("https://example.com/unpriced", (None, None))
+    assert _ttl(session_factory, "https://example.com/unpriced") < _ttl(session_factory, "https://example.com/priced")
+    assert _ttl(session_factory, "https://example.com/unpriced") == timedelta(seconds=settings.SCRAPER_NEGATIVE_TTL_SECONDS)
+
+
+def test_forbidden_is_not_a_cached_miss():
+    assert 403 not in scraper.NEGATIVE_STATUSES
@@ -0,0 +1,76 @@
+"""
+Training-job lock: only one training job runs at a time, even when
+submits race each other, and a lock left by a dead process is taken over.
+
+Run from the backend directory:
+    python -m pytest test_training_jobs.py
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from ml import jobs
+from ml.jobs import JobConflict, TrainingJobs
+
+
+class _IdleExecutor:
+    # Accepts jobs but never runs them, so the lock stays held
+    def submit(self, *args, **kwargs):
+        return Future()
+
+
+@pytest.fixture
+def training_jobs(tmp_path, monkeypatch):
+    training_jobs = TrainingJobs(jobs_dir=str(tmp_path))
+    monkeypatch.setattr(training_jobs, "_executor", lambda: _IdleExecutor())
+    return training_jobs
+
+
+def test_concurrent_submits_start_one_job(training_jobs, tmp_path):
+    for attempt in range(20):
+        barrier = threading.Barrier(2)
+        started, conflicts = [], []
+
+        def submit():
+            barrier.wait()
+            try:
+                started.append(training_jobs.submit("basic"))
+            except JobConflict as e:
+                conflicts.append(e)
+
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(started) == 1 and len(conflicts) == 1, f"attempt {attempt}"
+        assert conflicts[0].running_job_id == started[0]["id"]
+        # The loser leaves no job behind
+        assert sorted(os.listdir(tmp_path)) == sorted([f"{started[0]['id']}.json", jobs.LOCK_FILE])
+
+        training_jobs._release_lock(started[0]["id"])
+        os.remove(tmp_path / f"{started[0]['id']}.json")
+
+
+def test_recent_unreadable_lock_is_held(training_jobs, tmp_path):
+    (tmp_path / jobs.LOCK_FILE).write_text("")
+    with pytest.raises(JobConflict):
+        training_jobs.submit("basic")
+    assert os.listdir(tmp_path) == [jobs.LOCK_FILE]
+
+
+def test_lock_of_dead_process_is_taken_over(training_jobs, tmp_path):
+    jobs._write_job(str(tmp_path), {"id": "abandoned", "status": "running"})
+    lock = tmp_path / jobs.LOCK_FILE
+    lock.write_text(json.dumps({"job_id": "abandoned", "owner_pid": 2 ** 22 + 1}))
+    old = time.time() - jobs.LOCK_GRACE_SECONDS - 1
+    os.utime(lock, (old, old))
+
+    job = training_jobs.submit("basic")
+    assert json.loads(lock.read_text())["job_id"] == job["id"]
+    assert jobs.read_job(str(tmp_path), "abandoned")["status"] == "failed"
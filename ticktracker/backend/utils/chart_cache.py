@@ -0,0 +1,312 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event as sa_event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+import models
+from settings import settings
+
+ChartKey = Tuple[str, str]  # (event_id, variant), variant = time_range
+
+# Rows whose writes change an event's chart payload
+CHART_SOURCE_MODELS = (models.PriceHistory, models.PriceRollup, models.EventMilestone,
+                       models.PredictionHistory, models.SimilarEventsCache)
+
+_DIRTY_KEY = "chart_cache_dirty"
+
+# Generation row bumped by clear(); it counts towards every event's generation
+_ALL_EVENTS = "__all__"
+
+DISK_DDL = [
+    "CREATE TABLE IF NOT EXISTS chart_cache ("
+    "event_id TEXT NOT NULL, variant TEXT NOT NULL, payload BLOB NOT NULL, "
+    "stored_at REAL NOT NULL, generation INTEGER NOT NULL, PRIMARY KEY (event_id, variant))",
+    "CREATE TABLE IF NOT EXISTS chart_cache_generations ("
+    "event_id TEXT PRIMARY KEY, generation INTEGER NOT NULL)",
+]
+
+
+class ChartCache:
+    """
+    Cache of serialized chart payloads per (event_id, variant).
+
+    - Memory tier: LRU bounded by `max_entries`, entries expire after `ttl`.
+    - Optional disk tier (a SQLite file at `disk_path`): survives restarts and
+      is shared by every worker process pointing at the same file.
+    - Writes to an event's chart data bump that event's generation. Entries
+      from an older generation are never served, so an invalidation in one
+      worker also retires the other workers' memory entries.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, disk_path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[ChartKey, Tuple[float, int, bytes]]" = OrderedDict()
+        self._variants: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute("PRAGMA busy_timeout=5000")
+            for ddl in DISK_DDL:
+                self._disk.execute(ddl)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, event_id: str) -> int:
+        """
+        Current generation of an event. Read it before computing a payload
+        and pass it to set(), so a write that lands meanwhile isn't masked.
+        """
+        with self._lock:
+            return self._generation(event_id)
+
+    def _generation(self, event_id: str) -> int:
+        # Both counters only ever grow, so any invalidation changes the sum
+        if self._disk is not None:
+            return self._disk.execute(
+                "SELECT COALESCE(SUM(generation), 0) FROM chart_cache_generations WHERE event_id IN (?, ?)",
+                (event_id, _ALL_EVENTS),
+            ).fetchone()[0]
+        return self._generations.get(event_id, 0) + self._generations.get(_ALL_EVENTS, 0)
+
+    def get(self, event_id: str, variant: str) -> Optional[bytes]:
+        key = (event_id, variant)
+        now = time.time()
+        with self._lock:
+            generation = self._generation(event_id)
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, entry_generation, payload = entry
+                if entry_generation == generation and now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                self._drop(key)
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT payload, stored_at FROM chart_cache WHERE event_id = ? AND variant = ? AND generation = ?",
+                    (event_id, variant, generation),
+                ).fetchone()
+                if row is not None and now - row[1] < self.ttl:
+                    self._remember(key, row[1], generation, row[0])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, event_id: str, variant: str, payload: bytes, generation: int):
+        now = time.time()
+        with self._lock:
+            if generation != self._generation(event_id):
+                # The event changed while this payload was being built
+                return
+            self._remember((event_id, variant), now, generation, payload)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO chart_cache (event_id, variant, payload, stored_at, generation) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (event_id, variant, payload, now, generation),
+                )
+
+    def invalidate(self, event_ids: Iterable[str]):
+        event_ids = list(dict.fromkeys(event_ids))
+        if not event_ids:
+            return
+        with self._lock:
+            for event_id in event_ids:
+                for variant in list(self._variants.get(event_id, ())):
+                    self._drop((event_id, variant))
+                self._generations[event_id] = self._generations.get(event_id, 0) + 1
+            if self._disk is not None:
+                rows = [(event_id,) for event_id in event_ids]
+                self._disk.execute("BEGIN")
+                self._disk.executemany(
+                    "INSERT INTO chart_cache_generations (event_id, generation) VALUES (?, 1) "
+                    "ON CONFLICT(event_id) DO UPDATE SET generation = generation + 1",
+                    rows,
+                )
+                self._disk.executemany("DELETE FROM chart_cache WHERE event_id = ?", rows)
+                self._disk.execute("COMMIT")
+            self.invalidations += len(event_ids)
+
+    def clear(self):
+        with self._lock:
+            # Bump the shared generation so in-flight builds aren't stored
+            self._generations[_ALL_EVENTS] = self._generations.get(_ALL_EVENTS, 0) + 1
+            self._entries.clear()
+            self._variants.clear()
+            if self._disk is not None:
+                self._disk.execute("BEGIN")
+                self._disk.execute(
+                    "INSERT INTO chart_cache_generations (event_id, generation) VALUES (?, 1) "
+                    "ON CONFLICT(event_id) DO UPDATE SET generation = generation + 1",
+                    (_ALL_EVENTS,),
+                )
+                self._disk.execute("DELETE FROM chart_cache")
+                self._disk.execute("COMMIT")
+
+    def _remember(self, key: ChartKey, stored_at: float, generation: int, payload: bytes):
+        self._entries[key] = (stored_at, generation, payload)
+        self._entries.move_to_end(key)
+        self._variants.setdefault(key[0], set()).add(key[1])
+        while len(self._entries) > self.max_entries:
+            oldest, _ = self._entries.popitem(last=False)
+            self._forget_variant(oldest)
+
+    def _drop(self, key: ChartKey):
+        if self._entries.pop(key, None) is not None:
+            self._forget_variant(key)
+
+    def _forget_variant(self, key: ChartKey):
+        variants = self._variants.get(key[0])
+        if variants is not None:
+            variants.discard(key[1])
+            if not variants:
+                del self._variants[key[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk": self._disk is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+chart_cache = ChartCache(
+    ttl=settings.CHART_CACHE_TTL_SECONDS,
+    max_entries=settings.CHART_CACHE_MAX_ENTRIES,
+    disk_path=settings.CHART_CACHE_DISK_PATH,
+)
+
+
+# --- write-through invalidation ---
+# Events whose chart inputs were written are collected on the session and
+# invalidated once the transaction commits, so a concurrent reader can't
+# re-cache the pre-commit state under the new generation. Two session hooks
+# see every write: after_flush for the ORM unit of work (db.add/delete and
+# attribute changes) and do_orm_execute for INSERT/UPDATE/DELETE statements
+# run through the session (bulk inserts, Core statements, Query.delete()).
+
+_SOURCE_TABLES = {model.__table__ for model in CHART_SOURCE_MODELS}
+
+# Set when a statement's events can't be told from it; the commit clears everything
+_ALL_DIRTY_KEY = "chart_cache_all_dirty"
+
+# Execution option for writes known not to change any chart payload
+SKIP_INVALIDATION = {"chart_cache_skip": True}
+
+# Other per-event caches fed by the same writes (see on_invalidate)
+_listeners: List[Callable[[Optional[Set[str]]], None]] = []
+
+
+def on_invalidate(listener: Callable[[Optional[Set[str]]], None]):
+    """
+    Calls `listener(event_ids)` after each commit that wrote chart inputs
+    (prices, milestones, predictions, similar events) for those events, or
+    `listener(None)` when the writes could have touched any event.
+    """
+    _listeners.append(listener)
+
+def mark_dirty(session: Session, event_ids: Iterable[str]):
+    """
+    For writes the session hooks can't see (raw SQL through session.connection()).
+    """
+    session.info.setdefault(_DIRTY_KEY, set()).update(e for e in event_ids if e)
+
+
+def _where_event_ids(clause) -> Optional[Set[str]]:
+    """
+    The event ids a WHERE clause limits rows to: an `event_id == x` or
+    `event_id IN (...)` term ANDed in at the top level. None if there isn't one.
+    """
+    if clause is None:
+        return None
+    if isinstance(clause, BooleanClauseList):
+        if clause.operator is not operators.and_:
+            return None
+        for term in clause.clauses:
+            ids = _where_event_ids(term)
+            if ids is not None:
+                return ids
+        return None
+    if not isinstance(clause, BinaryExpression) or getattr(clause.left, "key", None) != "event_id":
+        return None
+    if not isinstance(clause.right, BindParameter) or clause.right.value is None:
+        return None
+    if clause.operator is operators.in_op:
+        return set(clause.right.value)
+    if clause.operator is operators.eq:
+        return {clause.right.value}
+    return None
+
+
+@sa_event.listens_for(Session, "do_orm_execute")
+def _collect_statement_events(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    if getattr(state.statement, "table", None) not in _SOURCE_TABLES:
+        return
+    if state.execution_options.get("chart_cache_skip"):
+        return
+
+    params = state.parameters
+    rows = params if isinstance(params, list) else [params] if params else []
+    if state.is_insert:
+        # Multi-row VALUES clauses aren't inspected: pass rows as parameters instead
+        ids = {row["event_id"] for row in rows} if rows and all("event_id" in row for row in rows) else None
+    else:
+        ids = _where_event_ids(state.statement.whereclause)
+
+    if ids is None:
+        state.session.info[_ALL_DIRTY_KEY] = True
+    else:
+        state.session.info.setdefault(_DIRTY_KEY, set()).update(e for e in ids if e)
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _collect_dirty_events(session: Session, flush_context):
+    dirty = session.info.setdefault(_DIRTY_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, CHART_SOURCE_MODELS):
+            continue
+        # Both the old and the new event when a row is moved between events
+        history = sa_inspect(obj).attrs.event_id.history
+        dirty.update(e for e in (obj.event_id, *history.deleted) if e)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if session.info.pop(_ALL_DIRTY_KEY, False):
+        chart_cache.clear()
+        for listener in _listeners:
+            listener(None)
+    elif dirty:
+        chart_cache.invalidate(dirty)
+        for listener in _listeners:
+            listener(dirty)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_dirty(session: Session):
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_ALL_DIRTY_KEY, None)
@@ -0,0 +1,139 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+
+import chart_schemas as schemas
+from settings import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.ticktracker.columnar+json"
+FORMATS = ("json", "columnar")
+
+# Stored timestamps are naive UTC
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+# Per-point fields sent as plain parallel arrays when any point has them
+_VALUE_COLUMNS = ("price", "open", "high", "low", "mean", "count", "confidence")
+
+# Per-point fields that change rarely along a series, sent run-length encoded
+_RLE_COLUMNS = ("data_source", "is_outlier")
+
+
+def negotiate_format(format: Optional[str], accept: Optional[str]) -> str:
+    """
+    `?format=` wins over the Accept header; JSON is the default.
+    """
+    if format:
+        format = format.strip().lower()
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format '{format}', expected one of: {', '.join(FORMATS)}")
+        return format
+    if accept and COLUMNAR_MEDIA_TYPE in accept.lower():
+        return "columnar"
+    return "json"
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks br (when the brotli package is installed) or gzip from an
+    Accept-Encoding header, honouring q=0.
+    """
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def run_length_encode(values: Sequence[Any]) -> Dict[str, List]:
+    encoded = {"values": [], "runs": []}
+    for value, run in groupby(values):
+        encoded["values"].append(value)
+        encoded["runs"].append(len(list(run)))
+    return encoded
+
+
+def run_length_decode(encoded: Dict[str, List]) -> List:
+    return [value for value, run in zip(encoded["values"], encoded["runs"]) for _ in range(run)]
+
+
+def price_columns(points: Sequence[schemas.PriceDataPoint]) -> Dict[str, Any]:
+    """
+    Parallel arrays for a price series: epoch seconds (UTC), one array per
+    populated value field, and run-length encoded source/outlier flags.
+    Fields that are empty for every point are left out.
+    """
+    # Read field values straight from each model's __dict__; going through
+    # attribute access per field is most of the cost on long series
+    rows = [vars(p) for p in points]
+    columns: Dict[str, Any] = {"timestamp": [(row["date"] - _EPOCH) // _SECOND for row in rows]}
+    for field in _VALUE_COLUMNS + _RLE_COLUMNS:
+        values = [row[field] for row in rows]
+        if values.count(None) < len(values):
+            columns[field] = run_length_encode(values) if field in _RLE_COLUMNS else values
+    return columns
+
+
+def to_columnar(chart: schemas.EnhancedChartData) -> Dict[str, Any]:
+    payload = chart.model_dump(exclude={"historical_prices"})
+    payload["format"] = "columnar"
+    payload["historical_prices"] = price_columns(chart.historical_prices)
+    return payload
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), default=lambda o: o.isoformat()).encode()
+
+
+def encode_chart(chart: schemas.EnhancedChartData, format: str) -> bytes:
+    if format == "columnar":
+        return dumps(to_columnar(chart))
+    return chart.model_dump_json().encode()
+
+
+def media_type(format: str) -> str:
+    return COLUMNAR_MEDIA_TYPE if format == "columnar" else "application/json"
+
+
+def compress(payload: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    # Small bodies aren't worth the CPU or the framing overhead
+    if encoding is None or len(payload) < settings.CHART_COMPRESS_MIN_BYTES:
+        return payload, None
+    if encoding == "br":
+        return brotli.compress(payload, quality=settings.CHART_BROTLI_QUALITY), "br"
+    return gzip.compress(payload, compresslevel=settings.CHART_GZIP_LEVEL), "gzip"
+
+
+def chart_response(body: bytes, format: str, encoding: Optional[str]) -> Response:
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type(format), headers=headers)
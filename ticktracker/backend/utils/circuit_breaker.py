@@ -0,0 +1,66 @@
+import time
+from typing import Any, Dict
+
+
+class CircuitBreaker:
+    """
+    Skips a failing upstream for a cooldown period.
+
+    - closed: calls go through; consecutive failures are counted.
+    - open: after `failure_threshold` consecutive failures, calls are skipped
+      until `cooldown` seconds have passed.
+    - half-open: after the cooldown one trial call goes through; success closes
+      the breaker, failure opens it again for another cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self.trial_in_progress:
+            self.trial_in_progress = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+
+    def release_trial(self):
+        """
+        Ends a half-open trial without a verdict (the call was cancelled),
+        so the next call can make the trial instead.
+        """
+        self.trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_progress = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                print(f"Circuit breaker: {self.name} opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
@@ -0,0 +1,222 @@
+import difflib
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import schemas
+
+# Thresholds of the original pairwise matcher (see `are_duplicates`)
+VENUE_RATIO = 0.8
+VENUE_NAME_RATIO = 0.6
+STRICT_NAME_RATIO = 0.85
+
+_PARENS_RE = re.compile(r'\(.*?\)')
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+
+
+def normalize_string(s: str) -> str:
+    # Remove common suffixes/prefixes and non-alphanumeric chars
+    s = s.lower()
+    s = _PARENS_RE.sub('', s)  # Remove content in parens like (Touring)
+    s = _NON_ALNUM_RE.sub('', s)
+    return s.strip()
+
+
+def _ratio(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def are_duplicates(e1: schemas.Event, e2: schemas.Event) -> bool:
+    """
+    Pairwise duplicate test. This is the reference definition; `DedupIndex`
+    gives the same answers without comparing every pair.
+    """
+    # Check date (handle timezone differences by comparing YYYY-MM-DD)
+    if e1.date.strftime("%Y-%m-%d") != e2.date.strftime("%Y-%m-%d"):
+        return False
+
+    n1, n2 = normalize_string(e1.name), normalize_string(e2.name)
+    v1, v2 = normalize_string(e1.venue), normalize_string(e2.venue)
+
+    # If venues are very similar (or one is unknown), be more lenient with name
+    venue_match = (v1 == v2) or (v1 in v2) or (v2 in v1) or (_ratio(v1, v2) > VENUE_RATIO)
+
+    if venue_match:
+        # If venues match, we can trust substring matches even for short names
+        # e.g. "Six" in "Six the Musical"
+        if n1 in n2 or n2 in n1:
+            return True
+        # Or fuzzy match with lower threshold
+        if _ratio(n1, n2) > VENUE_NAME_RATIO:
+            return True
+
+    # If venues don't match (or are unknown), stick to strict name matching
+    if n1 == n2:
+        return True
+    if _ratio(n1, n2) > STRICT_NAME_RATIO:
+        return True
+
+    return False
+
+
+def _bigrams(s: str) -> Counter:
+    return Counter(s[i:i + 2] for i in range(len(s) - 1))
+
+
+def _length_bound(la: int, lb: int) -> float:
+    # Upper bound of SequenceMatcher.ratio(): matches can't exceed the shorter string
+    total = la + lb
+    return 2.0 * min(la, lb) / total if total else 1.0
+
+
+def _min_shared_bigrams(la: int, lb: int) -> int:
+    """
+    q-gram lemma for q=2: if ratio > 0.85 the indel distance D is below
+    0.15 * (la + lb), and each edit destroys at most 2 bigrams, so the strings
+    share at least max(la, lb) - 1 - 2 * D bigrams (counted with multiplicity).
+    A result <= 0 means the bigram index can't rule the pair out.
+    """
+    max_edits = int((1.0 - STRICT_NAME_RATIO) * (la + lb) + 1e-9)
+    return max(la, lb) - 1 - 2 * max_edits
+
+
+class _Entry:
+    __slots__ = ("event", "name", "venue", "counts", "bigrams")
+
+    def __init__(self, event: schemas.Event, name: str, venue: str):
+        self.event = event
+        self.name = name
+        self.venue = venue
+        self.counts: Optional[Counter] = None
+        self.bigrams = _bigrams(name)
+
+    def char_counts(self) -> Counter:
+        if self.counts is None:
+            self.counts = Counter(self.name)
+        return self.counts
+
+
+def _quick_bound(a: _Entry, b: _Entry) -> float:
+    # Multiset character overlap, i.e. SequenceMatcher.quick_ratio()
+    total = len(a.name) + len(b.name)
+    if not total:
+        return 1.0
+    matches = sum((a.char_counts() & b.char_counts()).values())
+    return 2.0 * matches / total
+
+
+class _DateBucket:
+    """
+    Kept events for one calendar date. Events on different dates are never
+    duplicates, so each bucket is searched independently.
+    """
+
+    def __init__(self):
+        self.names: Set[str] = set()
+        self.by_venue: Dict[str, List[_Entry]] = defaultdict(list)
+        self.by_length: Dict[int, List[_Entry]] = defaultdict(list)
+        self.bigram_index: Dict[str, List[Tuple[_Entry, int]]] = defaultdict(list)
+
+    def add(self, entry: _Entry):
+        self.names.add(entry.name)
+        self.by_venue[entry.venue].append(entry)
+        self.by_length[len(entry.name)].append(entry)
+        for gram, count in entry.bigrams.items():
+            self.bigram_index[gram].append((entry, count))
+
+
+class DedupIndex:
+    """
+    Incremental duplicate filter with the same semantics as running
+    `are_duplicates(new, kept)` against every kept event, but:
+
+    - each event is normalized once,
+    - candidates are blocked by event date and grouped by venue,
+    - strict name matches only score pairs that share enough bigrams,
+    - cheap upper bounds on the ratio are checked before difflib runs.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, _DateBucket] = defaultdict(_DateBucket)
+        self._venue_matches: Dict[Tuple[str, str], bool] = {}
+        self.comparisons = 0
+
+    def add(self, event: schemas.Event) -> bool:
+        """
+        Returns True if the event was kept, False if it duplicates a kept event.
+        """
+        entry = _Entry(event, normalize_string(event.name), normalize_string(event.venue))
+        bucket = self._buckets[event.date.strftime("%Y-%m-%d")]
+
+        if self._is_duplicate(entry, bucket):
+            return False
+        bucket.add(entry)
+        return True
+
+    def _venue_match(self, v1: str, v2: str) -> bool:
+        key = (v1, v2)
+        match = self._venue_matches.get(key)
+        if match is None:
+            match = (v1 == v2) or (v1 in v2) or (v2 in v1) or (_ratio(v1, v2) > VENUE_RATIO)
+            self._venue_matches[key] = match
+        return match
+
+    def _fuzzy_match(self, entry: _Entry, other: _Entry, threshold: float) -> bool:
+        if _length_bound(len(entry.name), len(other.name)) <= threshold:
+            return False
+        if _quick_bound(entry, other) <= threshold:
+            return False
+        self.comparisons += 1
+        return _ratio(entry.name, other.name) > threshold
+
+    def _is_duplicate(self, entry: _Entry, bucket: _DateBucket) -> bool:
+        name = entry.name
+
+        # Exact normalized name matches regardless of venue
+        if name in bucket.names:
+            return True
+
+        # Lenient path: same (or similar) venue
+        for venue, kept in bucket.by_venue.items():
+            if not self._venue_match(entry.venue, venue):
+                continue
+            for other in kept:
+                if name in other.name or other.name in name:
+                    return True
+                if self._fuzzy_match(entry, other, VENUE_NAME_RATIO):
+                    return True
+
+        # Strict path: near-identical names at any venue. Count shared bigrams
+        # through the index, then only score pairs that clear the q-gram bound.
+        la = len(name)
+        shared: Dict[int, int] = defaultdict(int)
+        others: Dict[int, _Entry] = {}
+        for gram, count in entry.bigrams.items():
+            for other, other_count in bucket.bigram_index.get(gram, ()):
+                shared[id(other)] += min(count, other_count)
+                others[id(other)] = other
+
+        for key, other in others.items():
+            lb = len(other.name)
+            required = _min_shared_bigrams(la, lb)
+            if required > 0 and shared[key] >= required:
+                if self._fuzzy_match(entry, other, STRICT_NAME_RATIO):
+                    return True
+
+        # Short names where the bound says nothing have to be scored directly
+        for lb, kept in bucket.by_length.items():
+            if _min_shared_bigrams(la, lb) > 0 or _length_bound(la, lb) <= STRICT_NAME_RATIO:
+                continue
+            for other in kept:
+                if self._fuzzy_match(entry, other, STRICT_NAME_RATIO):
+                    return True
+
+        return False
+
+
+def deduplicate(events: Iterable[schemas.Event]) -> List[schemas.Event]:
+    """
+    Keeps the first event of every duplicate group, in input order.
+    """
+    index = DedupIndex()
+    return [event for event in events if index.add(event)]
@@ -1,95 +1,228 @@
 import httpx
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
 import schemas
 from settings import settings
 import asyncio
-from utils import pricing_heuristics
+from utils import pricing_heuristics, http_client, dedup
+from utils.circuit_breaker import CircuitBreaker
 
-async def fetch_ticketmaster_events(query: str, location: str, start_date: datetime, end_date: datetime) -> List[schemas.Event]:
-    url = "https://app.ticketmaster.com/discovery/v2/events.json"
+TICKETMASTER_URL = "https://app.ticketmaster.com/discovery/v2/events.json"
+TICKETMASTER_EVENT_URL = "https://app.ticketmaster.com/discovery/v2/events"
+EVENTBRITE_URL = "https://www.eventbriteapi.com/v3/events/search/"
+SEATGEEK_URL = "https://api.seatgeek.com/2/events"
+
+# Ticketmaster's Discovery API refuses pages beyond the first 1000 results
+TICKETMASTER_MAX_RESULTS = 1000
+
+# A fetched page: the parsed events plus the total number of pages reported upstream
+Page = Tuple[List[schemas.Event], int]
+
+# Per-provider outcome of a search, reported back to clients
+STATUS_OK = "ok"
+STATUS_PARTIAL = "partial"      # deadline hit after some pages arrived
+STATUS_TIMEOUT = "timeout"      # deadline hit before any page arrived
+STATUS_ERROR = "error"
+STATUS_SKIPPED = "skipped"      # circuit breaker open
+STATUS_DISABLED = "disabled"    # not configured
+
+
+class ProviderError(Exception):
+    pass
+
+
+class SearchResult(NamedTuple):
+    events: List[schemas.Event]
+    providers: Dict[str, str]
+
+    def any_provider_answered(self) -> bool:
+        # An empty result is only worth caching if some provider actually answered
+        return any(status in (STATUS_OK, STATUS_PARTIAL) for status in self.providers.values())
+
+
+async def _paginate(provider: str, fetch_page: Callable[[int], Awaitable[Page]],
+                    first_page: int, max_pages: int) -> AsyncIterator[List[schemas.Event]]:
+    """
+    Yields one list of events per page.
+    The first page is fetched on its own to learn the page count (errors here
+    are raised to the caller), then the
+    remaining pages are fetched concurrently (bounded by
+    PROVIDER_PAGE_CONCURRENCY) and yielded in completion order.
+    """
+    # First-page failures propagate so callers can tell a dead provider from an empty result
+    events, total_pages = await fetch_page(first_page)
+    yield events
+
+    page_count = min(total_pages, max_pages)
+    if page_count <= 1:
+        return
+
+    semaphore = asyncio.Semaphore(settings.PROVIDER_PAGE_CONCURRENCY)
+
+    async def bounded_fetch(page: int) -> Page:
+        async with semaphore:
+            return await fetch_page(page)
+
+    tasks = [asyncio.ensure_future(bounded_fetch(page)) for page in range(first_page + 1, first_page + page_count)]
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            try:
+                events, _ = await next_page
+            except Exception as e:
+                print(f"Error fetching {provider} page: {e}")
+                continue
+            yield events
+    finally:
+        # The consumer may stop early (e.g. a streaming client disconnects)
+        for task in tasks:
+            task.cancel()
+
+
+async def _no_pages() -> AsyncIterator[List[schemas.Event]]:
+    return
+    yield
+
+
+async def _collect(provider: str, pages: AsyncIterator[List[schemas.Event]]) -> List[schemas.Event]:
+    events = []
+    try:
+        async for page in pages:
+            events.extend(page)
+    except Exception as e:
+        print(f"Error fetching {provider} events: {e}")
+    return events
+
+
+def _parse_ticketmaster_event(item: dict) -> schemas.Event:
+    price_ranges = item.get("priceRanges", [])
+    price_low = price_ranges[0].get("min") if price_ranges else None
+    price_high = price_ranges[0].get("max") if price_ranges else None
+    
+    # Safely extract venue and city
+    venue = "Unknown Venue"
+    city = "Unknown City"
+    if "_embedded" in item and "venues" in item["_embedded"] and len(item["_embedded"]["venues"]) > 0:
+        venue_data = item["_embedded"]["venues"][0]
+        venue = venue_data.get("name", "Unknown Venue")
+        if "city" in venue_data:
+            city = venue_data["city"].get("name", "Unknown City")
+    
+    # Safely extract date
+    event_date = datetime.utcnow()
+    if "dates" in item and "start" in item["dates"]:
+        if "dateTime" in item["dates"]["start"]:
+            event_date = datetime.fromisoformat(item["dates"]["start"]["dateTime"].replace("Z", "+00:00"))
+        elif "localDate" in item["dates"]["start"]:
+            # If only date is available, use it with midnight time
+            event_date = datetime.fromisoformat(item["dates"]["start"]["localDate"] + "T00:00:00+00:00")
+    
+    # Safely extract URL
+    event_url = item.get("url", f"https://www.ticketmaster.com/event/{item['id']}")
+
+    # Extract timezone
+    timezone = None
+    if "dates" in item and "timezone" in item["dates"]:
+        timezone = item["dates"]["timezone"]
+
+    return schemas.Event(
+        id=f"tm_{item['id']}",
+        name=item["name"],
+        venue=venue,
+        city=city,
+        date=event_date,
+        price_low=price_low,
+        price_high=price_high,
+        url=event_url,
+        source="ticketmaster",
+        timezone=timezone,
+        created_at=datetime.utcnow()
+    )
+
+
+def _parse_ticketmaster_page(data: dict) -> Page:
+    events = []
+    if "_embedded" in data and "events" in data["_embedded"]:
+        for item in data["_embedded"]["events"]:
+            try:
+                events.append(_parse_ticketmaster_event(item))
+            except Exception as e:
+                print(f"Error parsing Ticketmaster event {item.get('id', 'unknown')}: {e}")
+                continue
+    total_pages = data.get("page", {}).get("totalPages", 1)
+    return events, total_pages
+
+
+def iter_ticketmaster_events(query: str, location: str, start_date: datetime, end_date: datetime) -> AsyncIterator[List[schemas.Event]]:
+    page_size = settings.PROVIDER_PAGE_SIZE
     params = {
         "apikey": settings.TICKETMASTER_API_KEY,
         "keyword": query,
         "city": location,
         "startDateTime": start_date.strftime("%Y-%m-%dT%H:%M:%SZ") if start_date else None,
         "endDateTime": end_date.strftime("%Y-%m-%dT%H:%M:%SZ") if end_date else None,
-        "size": 50,
+        "size": page_size,
         "sort": "date,asc"
     }
     
     # Remove None values
     params = {k: v for k, v in params.items() if v is not None}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            events = []
-            if "_embedded" in data and "events" in data["_embedded"]:
-                for item in data["_embedded"]["events"]:
-                    try:
-                        price_ranges = item.get("priceRanges", [])
-                        price_low = price_ranges[0].get("min") if price_ranges else None
-                        price_high = price_ranges[0].get("max") if price_ranges else None
-                        
-                        # Safely extract venue and city
-                        venue = "Unknown Venue"
-                        city = "Unknown City"
-                        if "_embedded" in item and "venues" in item["_embedded"] and len(item["_embedded"]["venues"]) > 0:
-                            venue_data = item["_embedded"]["venues"][0]
-                            venue = venue_data.get("name", "Unknown Venue")
-                            if "city" in venue_data:
-                                city = venue_data["city"].get("name", "Unknown City")
-                        
-                        # Safely extract date
-                        event_date = datetime.utcnow()
-                        if "dates" in item and "start" in item["dates"]:
-                            if "dateTime" in item["dates"]["start"]:
-                                event_date = datetime.fromisoformat(item["dates"]["start"]["dateTime"].replace("Z", "+00:00"))
-                            elif "localDate" in item["dates"]["start"]:
-                                # If only date is available, use it with midnight time
-                                event_date = datetime.fromisoformat(item["dates"]["start"]["localDate"] + "T00:00:00+00:00")
-                        
-                        # Safely extract URL
-                        event_url = item.get("url", f"https://www.ticketmaster.com/event/{item['id']}")
-
-                        # Extract timezone
-                        timezone = None
-                        if "dates" in item and "timezone" in item["dates"]:
-                            timezone = item["dates"]["timezone"]
-
-                        events.append(schemas.Event(
-                            id=f"tm_{item['id']}",
-                            name=item["name"],
-                            venue=venue,
-                            city=city,
-                            date=event_date,
-                            price_low=price_low,
-                            price_high=price_high,
-                            url=event_url,
-                            source="ticketmaster",
-                            timezone=timezone,
-                            created_at=datetime.utcnow()
-                        ))
-                    except Exception as e:
-                        print(f"Error parsing Ticketmaster event {item.get('id', 'unknown')}: {e}")
-                        continue
-            return events
-        except Exception as e:
-            print(f"Error fetching Ticketmaster events: {e}")
-            return []
+    client = http_client.get_client("ticketmaster")
 
-async def fetch_eventbrite_events(query: str, location: str, start_date: datetime, end_date: datetime) -> List[schemas.Event]:
+    async def fetch_page(page: int) -> Page:
+        response = await client.get(TICKETMASTER_URL, params={**params, "page": page})
+        response.raise_for_status()
+        return _parse_ticketmaster_page(response.json())
+
+    max_pages = min(settings.PROVIDER_MAX_PAGES, TICKETMASTER_MAX_RESULTS // page_size)
+    return _paginate("Ticketmaster", fetch_page, first_page=0, max_pages=max_pages)
+
+
+async def fetch_ticketmaster_events(query: str, location: str, start_date: datetime, end_date: datetime) -> List[schemas.Event]:
+    return await _collect("Ticketmaster", iter_ticketmaster_events(query, location, start_date, end_date))
+
+
+async def fetch_ticketmaster_event(provider_id: str) -> Optional[schemas.Event]:
+    """
+    Re-fetches a single Ticketmaster event by its Discovery API id (without the "tm_" prefix).
+    """
+    client = http_client.get_client("ticketmaster")
+    response = await client.get(f"{TICKETMASTER_EVENT_URL}/{provider_id}.json",
+                                params={"apikey": settings.TICKETMASTER_API_KEY})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return _parse_ticketmaster_event(response.json())
+
+
+def _parse_eventbrite_page(data: dict) -> Page:
+    events = []
+    if "events" in data:
+        for item in data["events"]:
+            events.append(schemas.Event(
+                id=f"eb_{item['id']}",
+                name=item["name"]["text"],
+                venue="Unknown Venue", # Requires separate call usually
+                city="Unknown City",
+                date=datetime.fromisoformat(item["start"]["utc"].replace("Z", "+00:00")),
+                price_low=None, # Often hidden
+                price_high=None,
+                url=item["url"],
+                source="eventbrite",
+                timezone=item["start"].get("timezone"),
+                created_at=datetime.utcnow()
+            ))
+    total_pages = data.get("pagination", {}).get("page_count", 1)
+    return events, total_pages
+
+
+def iter_eventbrite_events(query: str, location: str, start_date: datetime, end_date: datetime) -> AsyncIterator[List[schemas.Event]]:
     # Eventbrite API requires organization ID for events usually, or search endpoint which is deprecated/restricted.
     # Assuming we have access to a search endpoint or similar.
     # For this implementation, we will mock it if the API key doesn't work for public search directly without more setup.
     # However, let's try to use the /v3/events/search/ if available or similar.
     # Note: Eventbrite Public API for search is often restricted.
     
-    url = "https://www.eventbriteapi.com/v3/events/search/" 
     headers = {"Authorization": f"Bearer {settings.EVENTBRITE_PRIVATE_TOKEN}"}
     params = {
         "q": query,
@@ -99,37 +232,65 @@ async def fetch_eventbrite_events(query: str, location: str, start_date: datetim
     }
     params = {k: v for k, v in params.items() if v is not None}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, params=params)
-            # response.raise_for_status() # Eventbrite might return 403 if not allowed
-            if response.status_code != 200:
-                print(f"Eventbrite API returned {response.status_code}")
-                return []
-                
-            data = response.json()
-            events = []
-            if "events" in data:
-                for item in data["events"]:
-                    events.append(schemas.Event(
-                        id=f"eb_{item['id']}",
-                        name=item["name"]["text"],
-                        venue="Unknown Venue", # Requires separate call usually
-                        city="Unknown City",
-                        date=datetime.fromisoformat(item["start"]["utc"].replace("Z", "+00:00")),
-                        price_low=None, # Often hidden
-                        price_high=None,
-                        url=item["url"],
-                        source="eventbrite",
-                        timezone=item["start"].get("timezone"),
-                        created_at=datetime.utcnow()
-                    ))
-            return events
-        except Exception as e:
-            print(f"Error fetching Eventbrite events: {e}")
-            return []
+    client = http_client.get_client("eventbrite")
 
-async def fetch_seatgeek_events(query: str, location: str, start_date: datetime, end_date: datetime) -> List[schemas.Event]:
+    async def fetch_page(page: int) -> Page:
+        response = await client.get(EVENTBRITE_URL, headers=headers, params={**params, "page": page})
+        # response.raise_for_status() # Eventbrite might return 403 if not allowed
+        if response.status_code != 200:
+            raise ProviderError(f"Eventbrite API returned {response.status_code}")
+        return _parse_eventbrite_page(response.json())
+
+    return _paginate("Eventbrite", fetch_page, first_page=1, max_pages=settings.PROVIDER_MAX_PAGES)
+
+
+async def fetch_eventbrite_events(query: str, location: str, start_date: datetime, end_date: datetime) -> List[schemas.Event]:
+    return await _collect("Eventbrite", iter_eventbrite_events(query, location, start_date, end_date))
+
+
+def _parse_seatgeek_event(item: dict) -> schemas.Event:
+    # SeatGeek provides excellent price data!
+    stats = item.get("stats", {})
+    price_low = stats.get("lowest_price")
+    price_high = stats.get("highest_price")
+    
+    # Extract venue info
+    venue_data = item.get("venue", {})
+    venue = venue_data.get("name", "Unknown Venue")
+    city = venue_data.get("city", "Unknown City")
+    timezone = venue_data.get("timezone")
+    
+    return schemas.Event(
+        id=f"sg_{item['id']}",
+        name=item["title"],
+        venue=venue,
+        city=city,
+        date=datetime.fromisoformat(item["datetime_utc"].replace("Z", "+00:00")),
+        price_low=price_low,
+        price_high=price_high,
+        url=item["url"],
+        source="seatgeek",
+        timezone=timezone,
+        created_at=datetime.utcnow()
+    )
+
+
+def _parse_seatgeek_page(data: dict) -> Page:
+    events = []
+    if "events" in data:
+        for item in data["events"]:
+            try:
+                events.append(_parse_seatgeek_event(item))
+            except Exception as e:
+                print(f"Error parsing SeatGeek event {item.get('id', 'unknown')}: {e}")
+                continue
+    meta = data.get("meta", {})
+    per_page = meta.get("per_page") or settings.PROVIDER_PAGE_SIZE
+    total_pages = -(-meta.get("total", 0) // per_page)
+    return events, total_pages
+
+
+def iter_seatgeek_events(query: str, location: str, start_date: datetime, end_date: datetime) -> AsyncIterator[List[schemas.Event]]:
     """
     Fetch events from SeatGeek API.
     SeatGeek provides better price data than Ticketmaster!
@@ -137,65 +298,114 @@ async def fetch_seatgeek_events(query: str, location: str, start_date: datetime,
     """
     if not settings.SEATGEEK_CLIENT_ID:
         print("SeatGeek client ID not configured. Skipping SeatGeek API.")
-        return []
-    
-    url = "https://api.seatgeek.com/2/events"
+        return _no_pages()
+
     params = {
         "client_id": settings.SEATGEEK_CLIENT_ID,
         "q": query,
         "venue.city": location,
         "datetime_utc.gte": start_date.strftime("%Y-%m-%dT%H:%M:%S") if start_date else None,
         "datetime_utc.lte": end_date.strftime("%Y-%m-%dT%H:%M:%S") if end_date else None,
-        "per_page": 50,
+        "per_page": settings.PROVIDER_PAGE_SIZE,
         "sort": "datetime_utc.asc"
     }
     params = {k: v for k, v in params.items() if v is not None}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params)
-            if response.status_code != 200:
-                print(f"SeatGeek API returned {response.status_code}: {response.text}")
-                return []
-                
-            data = response.json()
-            events = []
-            if "events" in data:
-                for item in data["events"]:
-                    try:
-                        # SeatGeek provides excellent price data!
-                        stats = item.get("stats", {})
-                        price_low = stats.get("lowest_price")
-                        price_high = stats.get("highest_price")
-                        
-                        # Extract venue info
-                        venue_data = item.get("venue", {})
-                        venue = venue_data.get("name", "Unknown Venue")
-                        city = venue_data.get("city", "Unknown City")
-                        timezone = venue_data.get("timezone")
-                        
-                        events.append(schemas.Event(
-                            id=f"sg_{item['id']}",
-                            name=item["title"],
-                            venue=venue,
-                            city=city,
-                            date=datetime.fromisoformat(item["datetime_utc"].replace("Z", "+00:00")),
-                            price_low=price_low,
-                            price_high=price_high,
-                            url=item["url"],
-                            source="seatgeek",
-                            timezone=timezone,
-                            created_at=datetime.utcnow()
-                        ))
-                    except Exception as e:
-                        print(f"Error parsing SeatGeek event {item.get('id', 'unknown')}: {e}")
-                        continue
-            return events
-        except Exception as e:
-            print(f"Error fetching SeatGeek events: {e}")
-            return []
+    client = http_client.get_client("seatgeek")
 
-async def search_all_events(query: str, location: str, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[schemas.Event]:
+    async def fetch_page(page: int) -> Page:
+        response = await client.get(SEATGEEK_URL, params={**params, "page": page})
+        if response.status_code != 200:
+            raise ProviderError(f"SeatGeek API returned {response.status_code}: {response.text}")
+        return _parse_seatgeek_page(response.json())
+
+    return _paginate("SeatGeek", fetch_page, first_page=1, max_pages=settings.PROVIDER_MAX_PAGES)
+
+
+async def fetch_seatgeek_events(query: str, location: str, start_date: datetime, end_date: datetime) -> List[schemas.Event]:
+    return await _collect("SeatGeek", iter_seatgeek_events(query, location, start_date, end_date))
+
+
+async def fetch_seatgeek_event(provider_id: str) -> Optional[schemas.Event]:
+    """
+    Re-fetches a single SeatGeek event by its id (without the "sg_" prefix).
+    """
+    client = http_client.get_client("seatgeek")
+    response = await client.get(f"{SEATGEEK_URL}/{provider_id}", params={"client_id": settings.SEATGEEK_CLIENT_ID})
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise ProviderError(f"SeatGeek API returned {response.status_code}: {response.text}")
+    return _parse_seatgeek_event(response.json())
+
+
+PROVIDER_ITERATORS = {
+    "ticketmaster": iter_ticketmaster_events,
+    "eventbrite": iter_eventbrite_events,
+    "seatgeek": iter_seatgeek_events,
+}
+
+breakers: Dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(name, settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD, settings.CIRCUIT_BREAKER_COOLDOWN_SECONDS)
+    for name in PROVIDER_ITERATORS
+}
+
+
+def _provider_enabled(name: str) -> bool:
+    if name == "seatgeek":
+        return bool(settings.SEATGEEK_CLIENT_ID)
+    return True
+
+
+def _provider_deadline(name: str) -> float:
+    return getattr(settings, f"{name.upper()}_DEADLINE")
+
+
+async def _run_provider(name: str, query: str, location: str, start_date: datetime, end_date: datetime,
+                        on_page: Callable[[List[schemas.Event]], Awaitable[None]]) -> str:
+    """
+    Feeds a provider's pages to `on_page` until it finishes or its deadline
+    budget runs out, and updates the provider's circuit breaker.
+    Pages that arrived before the deadline are kept (partial results).
+    """
+    if not _provider_enabled(name):
+        return STATUS_DISABLED
+    breaker = breakers[name]
+    if not breaker.allow():
+        return STATUS_SKIPPED
+
+    received = 0
+
+    async def consume():
+        nonlocal received
+        async for page in PROVIDER_ITERATORS[name](query, location, start_date, end_date):
+            received += 1
+            await on_page(page)
+
+    try:
+        await asyncio.wait_for(consume(), timeout=_provider_deadline(name))
+    except asyncio.TimeoutError:
+        print(f"{name} hit its {_provider_deadline(name)}s deadline after {received} page(s)")
+        if received:
+            breaker.record_success()
+            return STATUS_PARTIAL
+        breaker.record_failure()
+        return STATUS_TIMEOUT
+    except Exception as e:
+        print(f"Error fetching {name} events: {e}")
+        breaker.record_failure()
+        return STATUS_ERROR
+    except BaseException:
+        # Cancelled (a streaming client went away, a coalesced search was
+        # dropped): says nothing about the provider, but frees the trial slot
+        breaker.release_trial()
+        raise
+
+    breaker.record_success()
+    return STATUS_OK
+
+
+def _default_date_range(start_date: Optional[datetime], end_date: Optional[datetime]) -> Tuple[datetime, datetime]:
     # Default to upcoming events if no date provided
     if not start_date:
         start_date = datetime.utcnow()
@@ -203,94 +413,55 @@ async def search_all_events(query: str, location: str, start_date: Optional[date
     # Limit to 18 months if not specified
     if not end_date:
         end_date = start_date + timedelta(days=18*30)
+    return start_date, end_date
 
-    # Fetch from all APIs concurrently
-    tm_task = fetch_ticketmaster_events(query, location, start_date, end_date)
-    eb_task = fetch_eventbrite_events(query, location, start_date, end_date)
-    sg_task = fetch_seatgeek_events(query, location, start_date, end_date)
-    
-    results = await asyncio.gather(tm_task, eb_task, sg_task)
-    print(f"DEBUG: TM found {len(results[0])}, EB found {len(results[1])}, SG found {len(results[2])}")
-    all_events = results[0] + results[1] + results[2]
+
+def event_priority(e: schemas.Event) -> int:
+    # Priority: Has Price > SeatGeek > Ticketmaster > Eventbrite
+    score = 0
+    if e.price_low is not None: score += 100
+    if e.source == "seatgeek": score += 10
+    elif e.source == "ticketmaster": score += 5
+    return score
+
+
+async def search_all_events(query: str, location: str, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[schemas.Event]:
+    result = await search_all_events_detailed(query, location, start_date, end_date)
+    return result.events
+
+async def search_all_events_detailed(query: str, location: str, start_date: Optional[datetime], end_date: Optional[datetime]) -> SearchResult:
+    start_date, end_date = _default_date_range(start_date, end_date)
+
+    # Fetch from all APIs concurrently; each provider is bounded by its own deadline
+    collected: Dict[str, List[schemas.Event]] = {name: [] for name in PROVIDER_ITERATORS}
+
+    def collector(name: str):
+        async def on_page(page: List[schemas.Event]):
+            collected[name].extend(page)
+        return on_page
+
+    names = list(PROVIDER_ITERATORS)
+    statuses = await asyncio.gather(*[
+        _run_provider(name, query, location, start_date, end_date, collector(name)) for name in names
+    ])
+    providers = dict(zip(names, statuses))
+    print(f"DEBUG: " + ", ".join(f"{name} found {len(collected[name])} ({providers[name]})" for name in names))
+    all_events = [event for name in names for event in collected[name]]
     
     # Deduplication with fuzzy matching
-    unique_events = []
-    
     # Sort events to prioritize those with real prices first
-    # Priority: Has Price > SeatGeek > Ticketmaster > Eventbrite
-    def event_priority(e):
-        score = 0
-        if e.price_low is not None: score += 100
-        if e.source == "seatgeek": score += 10
-        elif e.source == "ticketmaster": score += 5
-        return score
-        
     all_events.sort(key=event_priority, reverse=True)
-    
-    import difflib
-    import re
-
-    def normalize_string(s: str) -> str:
-        # Remove common suffixes/prefixes and non-alphanumeric chars
-        s = s.lower()
-        s = re.sub(r'\(.*?\)', '', s) # Remove content in parens like (Touring)
-        s = re.sub(r'[^a-z0-9\s]', '', s)
-        return s.strip()
-
-    def are_duplicates(e1: schemas.Event, e2: schemas.Event) -> bool:
-        # Check date (handle timezone differences by comparing YYYY-MM-DD)
-        d1 = e1.date.strftime("%Y-%m-%d")
-        d2 = e2.date.strftime("%Y-%m-%d")
-        if d1 != d2:
-            return False
-            
-        # Normalize names
-        n1 = normalize_string(e1.name)
-        n2 = normalize_string(e2.name)
-        
-        # Normalize venues
-        v1 = normalize_string(e1.venue)
-        v2 = normalize_string(e2.venue)
-        
-        # If venues are very similar (or one is unknown), be more lenient with name
-        venue_match = (v1 == v2) or (v1 in v2) or (v2 in v1) or (difflib.SequenceMatcher(None, v1, v2).ratio() > 0.8)
-        
-        if venue_match:
-            # If venues match, we can trust substring matches even for short names
-            # e.g. "Six" in "Six the Musical"
-            if n1 in n2 or n2 in n1:
-                return True
-            # Or fuzzy match with lower threshold
-            if difflib.SequenceMatcher(None, n1, n2).ratio() > 0.6:
-                return True
-        
-        # If venues don't match (or are unknown), stick to strict name matching
-        if n1 == n2:
-            return True
-        if difflib.SequenceMatcher(None, n1, n2).ratio() > 0.85:
-            return True
-            
-        return False
-
-    for event in all_events:
-        is_dup = False
-        for existing in unique_events:
-            if are_duplicates(event, existing):
-                is_dup = True
-                break
-        
-        if not is_dup:
-            unique_events.append(event)
+    unique_events = dedup.deduplicate(all_events)
             
     # --- Real-time Enrichment Step ---
-    # Identify top 5 events that are missing prices and try to scrape them
+    # Identify the top events that are missing prices and try to scrape them
     from utils import scraper
     
     events_to_scrape = []
     indices_to_update = []
     
     for i, event in enumerate(unique_events):
-        if len(events_to_scrape) >= 5:
+        if len(events_to_scrape) >= settings.SCRAPER_MAX_PER_SEARCH:
             break
         # Ticketmaster events without price are good candidates
         if event.price_low is None and "ticketmaster" in event.source:
@@ -299,8 +470,8 @@ async def search_all_events(query: str, location: str, start_date: Optional[date
              
     if events_to_scrape:
         print(f"Scraping prices for {len(events_to_scrape)} events...")
-        tasks = [scraper.scrape_event_price(e.url) for e in events_to_scrape]
-        results = await asyncio.gather(*tasks)
+        # Scrapes still running at the deadline fall back to estimates (and finish into the cache)
+        results = await scraper.scrape_event_prices([e.url for e in events_to_scrape], timeout=settings.SCRAPER_DEADLINE)
         
         for idx, (low, high) in zip(indices_to_update, results):
             if low is not None:
@@ -313,7 +484,49 @@ async def search_all_events(query: str, location: str, start_date: Optional[date
         if event.price_low is None:
             event = generate_mock_price(event)
             
-    return unique_events
+    return SearchResult(unique_events, providers)
+
+async def stream_all_events(query: str, location: str, start_date: Optional[datetime], end_date: Optional[datetime],
+                            providers: Optional[Dict[str, str]] = None) -> AsyncIterator[schemas.Event]:
+    """
+    Streaming variant of `search_all_events`.
+    Pages from every provider are consumed as soon as they arrive and each
+    new, non-duplicate event is yielded immediately. Priority ordering only
+    applies within a page, and there is no scraping step: unpriced events get
+    the heuristic estimate straight away.
+    If `providers` is given it is filled with each provider's status as it finishes.
+    """
+    start_date, end_date = _default_date_range(start_date, end_date)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    if providers is None:
+        providers = {}
+
+    async def drain(name: str):
+        try:
+            providers[name] = await _run_provider(name, query, location, start_date, end_date, queue.put)
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.ensure_future(drain(name)) for name in PROVIDER_ITERATORS]
+    index = dedup.DedupIndex()
+    remaining = len(tasks)
+    try:
+        while remaining:
+            page = await queue.get()
+            if page is done:
+                remaining -= 1
+                continue
+            for event in sorted(page, key=event_priority, reverse=True):
+                if not index.add(event):
+                    continue
+                if event.price_low is None:
+                    event = generate_mock_price(event)
+                yield event
+    finally:
+        for task in tasks:
+            task.cancel()
 
 def generate_mock_price(event: schemas.Event) -> schemas.Event:
     """
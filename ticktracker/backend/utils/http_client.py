@@ -0,0 +1,79 @@
+import httpx
+from typing import Dict
+from settings import settings
+
+# One pooled client per upstream so each provider gets its own connection
+# limits and timeouts, while connections are kept alive across searches.
+PROVIDERS = ("ticketmaster", "eventbrite", "seatgeek", "scraper")
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    if not settings.HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401 - httpx needs the h2 package for HTTP/2
+        return True
+    except ImportError:
+        return False
+
+
+def _provider_config(provider: str) -> Dict[str, float]:
+    """
+    Reads the per-provider pool size and timeout from settings.
+    """
+    prefix = provider.upper()
+    return {
+        "max_connections": getattr(settings, f"{prefix}_MAX_CONNECTIONS"),
+        "timeout": getattr(settings, f"{prefix}_TIMEOUT"),
+    }
+
+
+def _build_client(provider: str) -> httpx.AsyncClient:
+    config = _provider_config(provider)
+    limits = httpx.Limits(
+        max_connections=config["max_connections"],
+        max_keepalive_connections=config["max_connections"],
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(config["timeout"], connect=settings.HTTP_CONNECT_TIMEOUT)
+
+    # The scraper hits ticketing pages that redirect to regional sites
+    follow_redirects = provider == "scraper"
+
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        limits=limits,
+        timeout=timeout,
+        follow_redirects=follow_redirects,
+    )
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """
+    Returns the shared client for a provider.
+    Clients are normally created in `startup()` from the FastAPI lifespan, but
+    scripts that call the fetchers directly get one lazily on first use.
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown HTTP provider: {provider}")
+
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _build_client(provider)
+        _clients[provider] = client
+    return client
+
+
+async def startup():
+    for provider in PROVIDERS:
+        get_client(provider)
+    print(f"HTTP clients ready (http2={_http2_available()})")
+
+
+async def shutdown():
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
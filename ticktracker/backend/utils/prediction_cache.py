@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from settings import settings
+from utils.chart_cache import on_invalidate
+
+# (event_id, model_version, observation date (ISO day, UTC), latest price)
+PredictionKey = Tuple[str, str, str, Optional[float]]
+
+
+class PredictionCache:
+    """
+    In-process LRU of blended price predictions (see services/prediction_store.py,
+    which backs it with PredictionHistory).
+
+    - A key names everything a prediction depends on, so an entry is never
+      stale: a new model version, a new day or a new price is a new key.
+    - Invalidation only frees memory early: entries of an event are dropped
+      when its prices are written, and everything is dropped the first time a
+      key carries a different model version (i.e. after a reload).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[PredictionKey, Dict[str, Any]]" = OrderedDict()
+        self._keys: Dict[str, Set[PredictionKey]] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: PredictionKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._check_version(key[1])
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: PredictionKey, value: Dict[str, Any]):
+        with self._lock:
+            if key[1] != self._version:
+                # Computed by a model that has since been replaced
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._keys.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._forget(oldest)
+
+    def invalidate(self, event_ids: Optional[Iterable[str]]):
+        # None: the writes could have touched any event
+        if event_ids is None:
+            self.clear()
+            return
+        with self._lock:
+            for event_id in event_ids:
+                for key in self._keys.pop(event_id, ()):
+                    self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+
+    def _check_version(self, version: str):
+        # Lookups carry the live model's version; once it changes, older entries are unreachable
+        if version != self._version:
+            self._entries.clear()
+            self._keys.clear()
+            self._version = version
+
+    def _forget(self, key: PredictionKey):
+        keys = self._keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[key[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "model_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+prediction_cache = PredictionCache(max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES)
+
+# Price writes (and the forecast job's rewrites) go through the chart cache's commit hook
+on_invalidate(prediction_cache.invalidate)
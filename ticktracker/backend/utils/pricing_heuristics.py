@@ -1,6 +1,7 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import random
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
+import numpy as np
 
 # --- Configuration ---
 
@@ -39,6 +40,10 @@ HEURISTIC_CURVES: Dict[str, List[Tuple[int, int, float]]] = {
 WEEKEND_MULTIPLIER = 1.1  # Fri/Sat/Sun
 WEEKDAY_MULTIPLIER = 1.0
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
 # --- Helper Functions ---
 
 def classify_event_type(event) -> str:
@@ -46,8 +51,9 @@ def classify_event_type(event) -> str:
     Return one of: 'festival', 'major_concert', 'sports', 'theatre', 'symphony', 'local_show', 'default'
     Use event.name, event.category (if available), and tags.
     """
-    name_lower = event.name.lower()
-    
+    return classify_event_name(event.name.lower())
+
+def classify_event_name(name_lower: str) -> str:
     if "festival" in name_lower:
         return "festival"
     if any(k in name_lower for k in ["nba", "nfl", "mlb", "nhl", "football", "basketball", "soccer", "baseball"]):
@@ -61,12 +67,12 @@ def classify_event_type(event) -> str:
         
     return "default"
 
-def compute_days_to_event(event_datetime_utc: datetime) -> int:
+def compute_days_to_event(event_datetime_utc: datetime, now: Optional[datetime] = None) -> int:
     # Ensure event_datetime_utc is timezone-aware if possible, or assume UTC
     if event_datetime_utc.tzinfo is None:
         event_datetime_utc = event_datetime_utc.replace(tzinfo=timezone.utc)
         
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
     delta = event_datetime_utc - now
     return max(delta.days, 0)
 
@@ -95,7 +101,9 @@ def get_demand_multiplier(event) -> float:
     # Placeholder for demand signals from API
     # If we had 'status' or 'inventory_level', we'd use it here.
     # For now, return 1.0 or small random boost if name implies high demand
-    name_lower = event.name.lower()
+    return get_name_demand_multiplier(event.name.lower())
+
+def get_name_demand_multiplier(name_lower: str) -> float:
     if any(k in name_lower for k in ["taylor swift", "beyonce", "super bowl", "finals"]):
         return 1.3
     return 1.0
@@ -133,9 +141,10 @@ def get_city_multiplier(city: Optional[str]) -> float:
         return 1.4
     return 1.0
 
-def compute_heuristic_price(event) -> dict:
+def compute_heuristic_price(event, now: Optional[datetime] = None) -> dict:
     """
-    Input: Event object with metadata and event datetime.
+    Input: Event object with metadata and event datetime, and optionally the
+    (UTC-aware) time to measure days-to-event from.
     Output: {
         "heuristic_low": float,
         "heuristic_high": float,
@@ -147,7 +156,7 @@ def compute_heuristic_price(event) -> dict:
     base_price = infer_base_price_from_name(name_lower)
     
     city_mult = get_city_multiplier(event.city)
-    days_to_event = compute_days_to_event(event.date)
+    days_to_event = compute_days_to_event(event.date, now)
     event_type = classify_event_type(event)
     time_mult = get_time_multiplier(event_type, days_to_event)
     
@@ -194,3 +203,108 @@ def compute_heuristic_price(event) -> dict:
             "event_type": event_type
         }
     }
+
+def _utc_microseconds(moment: datetime) -> int:
+    # Naive datetimes are UTC, as in compute_days_to_event
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _MICROSECOND
+
+def _time_multipliers(event_types: List[str], days: np.ndarray) -> np.ndarray:
+    # get_time_multiplier over arrays: first matching band wins, 1.0 outside all bands
+    multipliers = np.ones(len(days))
+    types = np.array(event_types, dtype=object)
+    for event_type in set(event_types):
+        rows = types == event_type
+        type_days = days[rows]
+        type_multipliers = np.ones(len(type_days))
+        matched = np.zeros(len(type_days), dtype=bool)
+        for min_days, max_days, mult in HEURISTIC_CURVES.get(event_type, HEURISTIC_CURVES["default"]):
+            hit = ~matched & (type_days >= min_days) & (type_days <= max_days)
+            type_multipliers[hit] = mult
+            matched |= hit
+        multipliers[rows] = type_multipliers
+    return multipliers
+
+def compute_heuristic_columns(events, now: Optional[datetime] = None) -> Dict[str, List[Any]]:
+    """
+    compute_heuristic_price for many events, as columns (one list per output
+    and component). Name- and city-derived values are computed once per
+    distinct name or city; days to event and the multipliers are computed
+    over arrays. Values are identical to compute_heuristic_price's.
+    """
+    events = list(events)
+    now = now or datetime.now(timezone.utc)
+
+    by_name: Dict[str, Tuple[float, str, float]] = {}
+    by_city: Dict[Optional[str], float] = {}
+    base_prices, event_types, demand_mults, city_mults = [], [], [], []
+    for event in events:
+        name_lower = event.name.lower()
+        parts = by_name.get(name_lower)
+        if parts is None:
+            parts = by_name[name_lower] = (infer_base_price_from_name(name_lower), classify_event_name(name_lower),
+                                           get_name_demand_multiplier(name_lower))
+        base_prices.append(parts[0])
+        event_types.append(parts[1])
+        demand_mults.append(parts[2])
+        city_mult = by_city.get(event.city)
+        if city_mult is None:
+            city_mult = by_city[event.city] = get_city_multiplier(event.city)
+        city_mults.append(city_mult)
+
+    event_times = np.array([_utc_microseconds(event.date) for event in events], dtype=np.int64)
+    days = np.maximum((event_times - _utc_microseconds(now)) // _MICROSECONDS_PER_DAY, 0)
+    time_mults = _time_multipliers(event_types, days)
+    venue_mults = np.array([get_venue_multiplier(getattr(event, "venue_capacity", None)) for event in events], dtype=float)
+    weekdays = np.array([event.date.weekday() for event in events], dtype=np.int64)
+    dow_mults = np.where(weekdays >= 4, WEEKEND_MULTIPLIER, WEEKDAY_MULTIPLIER)
+
+    # Same operand order as compute_heuristic_price, so the float products match exactly
+    deterministic = (np.array(base_prices, dtype=float) * np.array(city_mults, dtype=float) * time_mults
+                     * venue_mults * dow_mults * np.array(demand_mults, dtype=float))
+    # Python's round(), not np.round(): the two disagree on some halfway cases
+    mids = [round(price, 2) for price in deterministic.tolist()]
+
+    return {
+        "heuristic_low": [round(mid * 0.8, 2) for mid in mids],
+        "heuristic_high": [round(mid * 1.3, 2) for mid in mids],
+        "heuristic_mid": mids,
+        "base_price": base_prices,
+        "city_mult": city_mults,
+        "time_mult": time_mults.tolist(),
+        "venue_mult": venue_mults.tolist(),
+        "dow_mult": dow_mults.tolist(),
+        "demand_mult": demand_mults,
+        "days_to_event": days.tolist(),
+        "event_type": event_types,
+    }
+
+def compute_heuristic_prices(events, now: Optional[datetime] = None) -> List[dict]:
+    """
+    compute_heuristic_price for many events against one clock reading, so a
+    batch never straddles a day boundary. Computed in bulk by
+    compute_heuristic_columns, then split into one dict per event.
+    """
+    columns = compute_heuristic_columns(events, now or datetime.now(timezone.utc))
+    return [
+        {
+            "heuristic_low": low,
+            "heuristic_high": high,
+            "heuristic_mid": mid,
+            "components": {
+                "base_price": base_price,
+                "city_mult": city_mult,
+                "time_mult": time_mult,
+                "venue_mult": venue_mult,
+                "dow_mult": dow_mult,
+                "demand_mult": demand_mult,
+                "days_to_event": days_to_event,
+                "event_type": event_type
+            }
+        }
+        for low, high, mid, base_price, city_mult, time_mult, venue_mult, dow_mult, demand_mult, days_to_event, event_type
+        in zip(columns["heuristic_low"], columns["heuristic_high"], columns["heuristic_mid"], columns["base_price"],
+               columns["city_mult"], columns["time_mult"], columns["venue_mult"], columns["dow_mult"],
+               columns["demand_mult"], columns["days_to_event"], columns["event_type"])
+    ]
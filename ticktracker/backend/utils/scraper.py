@@ -1,71 +1,237 @@
-import httpx
-from bs4 import BeautifulSoup
+import html as html_lib
 import json
 import re
 import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import database
+import models
+from settings import settings
+from utils import http_client
+from utils.rate_limit import TokenBucket
 
-async def scrape_event_price(url: str, source: str = "ticketmaster"):
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com/"
+}
+
+# Pulled straight out of the raw HTML; building a DOM just to find these is the slow part
+_JSON_LD_RE = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+_META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_OG_DESCRIPTION_RE = re.compile(r'\bproperty\s*=\s*["\']og:description["\']', re.IGNORECASE)
+_CONTENT_RE = re.compile(r'\bcontent\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE | re.DOTALL)
+
+# Statuses that mean "this page has no price for us" rather than "try again later".
+# 403 isn't one: it is usually bot protection or rate limiting, so it isn't cached.
+NEGATIVE_STATUSES = {404, 410}
+
+PriceRange = Tuple[Optional[float], Optional[float]]
+
+
+def extract_json_ld_blocks(html: str) -> List[str]:
+    return [block.strip() for block in _JSON_LD_RE.findall(html)]
+
+
+def extract_og_description(html: str) -> Optional[str]:
+    for tag in _META_TAG_RE.findall(html):
+        if _OG_DESCRIPTION_RE.search(tag):
+            match = _CONTENT_RE.search(tag)
+            if match:
+                return html_lib.unescape(match.group(1) if match.group(1) is not None else match.group(2))
+            return ""
+    return None
+
+
+def parse_price_from_html(html: str) -> PriceRange:
     """
-    Attempts to scrape the price from a given event URL.
-    Returns (price_low, price_high) or (None, None) if failed.
+    Returns (price_low, price_high) from an event page, or (None, None).
     """
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://www.google.com/"
-    }
-    
-    async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
+    # Strategy 1: Look for JSON-LD (Schema.org)
+    # This is the most reliable way as it's structured data
+    for block in extract_json_ld_blocks(html):
         try:
-            response = await client.get(url, headers=headers)
-            if response.status_code != 200:
-                print(f"Scraper: Failed to fetch {url} - Status {response.status_code}")
-                return None, None
+            data = json.loads(block)
+            # Handle both single object and list of objects
+            if isinstance(data, list):
+                items = data
+            else:
+                items = [data]
                 
-            html = response.text
-            soup = BeautifulSoup(html, 'lxml')
-            
-            # Strategy 1: Look for JSON-LD (Schema.org)
-            # This is the most reliable way as it's structured data
-            scripts = soup.find_all('script', type='application/ld+json')
-            for script in scripts:
-                try:
-                    data = json.loads(script.string)
-                    # Handle both single object and list of objects
-                    if isinstance(data, list):
-                        items = data
-                    else:
-                        items = [data]
-                        
-                    for item in items:
-                        if item.get('@type') == 'Event':
-                            offers = item.get('offers')
-                            if offers:
-                                return extract_price_from_offers(offers)
-                except:
-                    continue
-                    
-            # Strategy 2: Look for common meta tags (OpenGraph, Twitter)
-            # Sometimes price is in description
-            og_desc = soup.find("meta", property="og:description")
-            if og_desc:
-                content = og_desc.get("content", "")
-                prices = extract_prices_from_text(content)
-                if prices:
-                    return prices
-                    
-            # Strategy 3: Regex on visible text (Fallback/Risky)
-            # Look for "$XX.XX" patterns
-            text = soup.get_text()
-            # Simple heuristic: find "Price" or "Tickets" context
-            # This is very prone to errors, so maybe skip for now to be safe
-            
-            return None, None
+            for item in items:
+                if item.get('@type') == 'Event':
+                    offers = item.get('offers')
+                    if offers:
+                        return extract_price_from_offers(offers)
+        except:
+            continue
             
-        except Exception as e:
-            print(f"Scraper: Error scraping {url}: {e}")
-            return None, None
+    # Strategy 2: Look for common meta tags (OpenGraph, Twitter)
+    # Sometimes price is in description
+    content = extract_og_description(html)
+    if content:
+        prices = extract_prices_from_text(content)
+        if prices:
+            return prices
+
+    return None, None
+
+
+# --- persisted result cache ---
+
+def _load_cached(urls: List[str]) -> Dict[str, PriceRange]:
+    db = database.SessionLocal()
+    try:
+        rows = db.query(models.ScrapeResult)\
+            .filter(models.ScrapeResult.url.in_(urls))\
+            .filter(models.ScrapeResult.expires_at > datetime.utcnow())\
+            .all()
+        return {row.url: (row.price_low, row.price_high) for row in rows}
+    finally:
+        db.close()
+
+
+def _store_result(url: str, price: PriceRange):
+    # Pages without a price are cached too (negative caching), for a few minutes only
+    ttl = settings.SCRAPER_CACHE_TTL_SECONDS if price[0] is not None else settings.SCRAPER_NEGATIVE_TTL_SECONDS
+    now = datetime.utcnow()
+    db = database.SessionLocal()
+    try:
+        db.merge(models.ScrapeResult(
+            url=url,
+            price_low=price[0],
+            price_high=price[1],
+            fetched_at=now,
+            expires_at=now + timedelta(seconds=ttl),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+# --- fetching ---
+
+class _TransientError(Exception):
+    pass
+
+
+_host_buckets: Dict[str, TokenBucket] = {}
+
+
+def _bucket_for(url: str) -> TokenBucket:
+    host = urlsplit(url).hostname or ""
+    bucket = _host_buckets.get(host)
+    if bucket is None:
+        bucket = TokenBucket(settings.SCRAPER_HOST_RATE, settings.SCRAPER_HOST_BURST)
+        _host_buckets[host] = bucket
+    return bucket
+
+
+async def _fetch_price(url: str) -> PriceRange:
+    await _bucket_for(url).acquire()
+
+    client = http_client.get_client("scraper")
+    response = await client.get(url, headers=HEADERS)
+    if response.status_code in NEGATIVE_STATUSES:
+        print(f"Scraper: Failed to fetch {url} - Status {response.status_code}")
+        return None, None
+    if response.status_code != 200:
+        raise _TransientError(f"Status {response.status_code}")
+    return parse_price_from_html(response.text)
+
+
+class ScraperPool:
+    """
+    Fixed number of worker tasks draining a queue of URLs. Concurrent requests
+    for the same URL share one job, and finished results are written to the
+    persisted cache.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._inflight = {}
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, url: str) -> asyncio.Future:
+        self._ensure_started()
+        future = self._inflight.get(url)
+        if future is None:
+            future = self._loop.create_future()
+            self._inflight[url] = future
+            self._queue.put_nowait((url, future))
+        return future
+
+    async def _worker(self):
+        while True:
+            url, future = await self._queue.get()
+            result: PriceRange = (None, None)
+            try:
+                result = await _fetch_price(url)
+                await asyncio.to_thread(_store_result, url, result)
+            except Exception as e:
+                print(f"Scraper: Error scraping {url}: {e}")
+            finally:
+                self._inflight.pop(url, None)
+                if not future.done():
+                    future.set_result(result)
+                self._queue.task_done()
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+
+pool = ScraperPool(settings.SCRAPER_WORKERS)
+
+
+async def scrape_event_prices(urls: List[str], timeout: Optional[float] = None) -> List[PriceRange]:
+    """
+    Scrapes many event pages through the worker pool, serving cached results
+    (including cached misses) without a request. With a `timeout`, pages that
+    haven't finished come back as (None, None); their jobs keep running and
+    land in the cache for the next caller.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    results = await asyncio.to_thread(_load_cached, unique_urls) if unique_urls else {}
+
+    pending = {url: pool.submit(url) for url in unique_urls if url not in results}
+    if pending:
+        await asyncio.wait(
+            [asyncio.shield(f) for f in pending.values()], timeout=timeout
+        )
+        for url, future in pending.items():
+            if future.done():
+                results[url] = future.result()
+
+    return [results.get(url, (None, None)) for url in urls]
+
+
+async def scrape_event_price(url: str, source: str = "ticketmaster"):
+    """
+    Attempts to scrape the price from a given event URL.
+    Returns (price_low, price_high) or (None, None) if failed.
+    """
+    results = await scrape_event_prices([url])
+    return results[0]
 
 def extract_price_from_offers(offers):
     if isinstance(offers, dict):
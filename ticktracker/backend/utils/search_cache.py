@@ -0,0 +1,138 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from settings import settings
+
+SearchKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = _WHITESPACE_RE.sub(" ", value.strip().lower())
+    return value or None
+
+
+def _normalize_date(value: Optional[datetime]) -> Optional[str]:
+    # Minute resolution so "now"-ish timestamps from clients still share entries
+    if value is None:
+        return None
+    return value.replace(second=0, microsecond=0).isoformat()
+
+
+def make_search_key(query: Optional[str], location: Optional[str],
+                    start_date: Optional[datetime], end_date: Optional[datetime]) -> SearchKey:
+    return (
+        _normalize_text(query),
+        _normalize_text(location),
+        _normalize_date(start_date),
+        _normalize_date(end_date),
+    )
+
+
+class SearchCache:
+    """
+    In-process LRU cache for upstream search results.
+
+    - Entries younger than `ttl` are served as fresh hits.
+    - Entries older than `ttl` but within `ttl + stale_ttl` are served stale
+      while a single background refresh runs (stale-while-revalidate).
+    - Concurrent misses for the same key share one in-flight upstream fetch.
+    - Results rejected by the caller's `cacheable` check (e.g. every provider
+      failed) are returned to the waiting callers but not stored, and don't
+      replace a stale entry.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[SearchKey, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[SearchKey, asyncio.Future] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_fetch(self, key: SearchKey, fetch: Callable[[], Awaitable[Any]],
+                           cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = now - stored_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch, cacheable)
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = self._start_fetch(key, fetch, cacheable)
+        # shield() so a disconnecting client doesn't cancel the fetch others wait on
+        return await asyncio.shield(future)
+
+    def _start_fetch(self, key: SearchKey, fetch: Callable[[], Awaitable[Any]],
+                     cacheable: Optional[Callable[[Any], bool]]) -> asyncio.Future:
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+
+        def _done(t: asyncio.Future):
+            self._inflight.pop(key, None)
+            if t.cancelled():
+                return
+            if t.exception() is not None:
+                print(f"Search cache: refresh failed for {key}: {t.exception()}")
+                return
+            if cacheable is not None and not cacheable(t.result()):
+                print(f"Search cache: not caching result for {key}")
+                return
+            self._store(key, t.result())
+
+        task.add_done_callback(_done)
+        return task
+
+    def _store(self, key: SearchKey, value: Any):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+search_cache = SearchCache(
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+    stale_ttl=settings.SEARCH_CACHE_STALE_SECONDS,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+)
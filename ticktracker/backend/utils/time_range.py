@@ -0,0 +1,75 @@
+import re
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+# Relative ranges as used by the chart controls: '24h', '7d', '1w', '1m', '3m', '1y'
+_RELATIVE_RE = re.compile(r"^(\d+)\s*([hdwmy])$")
+_UNITS = {
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+    "m": timedelta(days=30),
+    "y": timedelta(days=365),
+}
+# Custom ranges of plain dates may use ':' ('2026-01-01:2026-02-01');
+# ranges with times must use '..' since ISO times contain ':'
+_DATE_RANGE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})?:(\d{4}-\d{2}-\d{2})?$")
+
+
+class TimeWindow(NamedTuple):
+    start: Optional[datetime]  # inclusive
+    end: Optional[datetime]    # exclusive
+
+
+def _parse_bound(value: str, is_end: bool) -> Optional[datetime]:
+    value = value.strip()
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    if is_end and len(value) == 10:
+        # A date-only end includes that whole day
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_time_range(time_range: Optional[str], now: Optional[datetime] = None) -> TimeWindow:
+    """
+    Turns a time_range query value into a (start, end) window.
+    Accepts 'all', relative ranges like '7d', '30d', '3m' or '1y', and custom
+    ranges 'start..end' (ISO dates or datetimes, either side may be empty).
+    Raises ValueError for anything else.
+    """
+    value = (time_range or "all").strip()
+    if value.lower() == "all":
+        return TimeWindow(None, None)
+
+    match = _RELATIVE_RE.match(value.lower())
+    if match:
+        now = now or datetime.utcnow()
+        return TimeWindow(now - int(match.group(1)) * _UNITS[match.group(2)], None)
+
+    if ".." in value:
+        start, end = value.split("..", 1)
+    elif _DATE_RANGE_RE.match(value):
+        start, end = value.split(":", 1)
+    else:
+        raise ValueError(f"Invalid time_range '{time_range}'")
+
+    try:
+        window = TimeWindow(_parse_bound(start, False), _parse_bound(end, True))
+    except ValueError:
+        raise ValueError(f"Invalid time_range '{time_range}'")
+    if window.start and window.end and window.start >= window.end:
+        raise ValueError(f"Invalid time_range '{time_range}': start must be before end")
+    return window
+
+
+def apply_time_window(query, column, window: TimeWindow):
+    if window.start is not None:
+        query = query.filter(column >= window.start)
+    if window.end is not None:
+        query = query.filter(column < window.end)
+    return query